@@ -0,0 +1,7 @@
+"""Benchmarks for the hot paths of the restaurant manager.
+
+Run from the repository root:
+    python -m benchmarks --output results.json
+    python -m benchmarks --baseline results.json
+
+"""
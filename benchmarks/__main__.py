@@ -0,0 +1,45 @@
+import argparse
+import json
+import sys
+
+from . import runner
+from . import bench_business, bench_inventory, bench_io, bench_loans, bench_restaurant
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description='Benchmark the hot paths of the restaurant manager.')
+    parser.add_argument('--scale', choices=runner.SCALES, default='small',
+                        help='"full" adds the largest inputs (default: small)')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='the number of runs per benchmark (default: 5)')
+    parser.add_argument('--select',
+                        help='only run benchmarks whose name contains this')
+    parser.add_argument('--output', help='write the results to a JSON file')
+    parser.add_argument('--baseline',
+                        help='compare the results against a previous output')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='the relative slowdown counted as a regression '
+                             '(default: 0.2)')
+    args = parser.parse_args(argv)
+
+    results = runner.run(args.scale, repeat=args.repeat, select=args.select)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=4)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f'\nCompared to {args.baseline}:')
+        regressions = runner.compare(results, baseline, args.threshold)
+        if regressions:
+            print(f'{len(regressions)} regression(s) found.')
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
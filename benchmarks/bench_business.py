@@ -0,0 +1,76 @@
+import random
+
+from src import Item, LoanMenu
+
+from .fixtures import SEED, ledger_restaurant, restaurant
+from .runner import benchmark
+
+TRANSACTIONS = dict(small=(1000, 10000, 100000), full=(1000000,))
+
+
+@benchmark('Business.step', small=(10, 100, 1000), full=(10000,))
+def step(n, timer):
+    r = restaurant(n).fork()
+    with timer:
+        r.step(weeks=4)
+
+
+def _restock_items(r):
+    """Return items restocking every ingredient of a restaurant."""
+    return [Item(i.name, 1000, i.unit, 1) for i in r.inventory]
+
+
+@benchmark('Business.buy_item', small=(10, 100, 1000))
+def buy_item(n, timer):
+    r = restaurant(n).fork()
+    items = _restock_items(r)
+    with timer:
+        for item in items:
+            r.buy_item(item)
+
+
+@benchmark('Business.buy_items', small=(10, 100, 1000))
+def buy_items(n, timer):
+    r = restaurant(n).fork()
+    items = _restock_items(r)
+    with timer:
+        r.buy_items(items)
+
+
+@benchmark('Business.get_transactions', **TRANSACTIONS)
+def get_transactions(n, timer):
+    r = restaurant(10, n)
+    with timer:
+        r.get_transactions(20)
+
+
+@benchmark('Business.get_monthly_revenue', **TRANSACTIONS)
+def get_monthly_revenue(n, timer):
+    r = restaurant(10, n)
+    with timer:
+        r.get_monthly_revenue()
+
+
+@benchmark('Ledger.get_transactions', **TRANSACTIONS)
+def ledger_get_transactions(n, timer):
+    r = ledger_restaurant(10, n)
+    with timer:
+        r.get_transactions(20)
+
+
+@benchmark('Ledger.get_monthly_revenue', **TRANSACTIONS)
+def ledger_get_monthly_revenue(n, timer):
+    r = ledger_restaurant(10, n)
+    with timer:
+        r.get_monthly_revenue()
+
+
+@benchmark('Business.refresh_loan_menu', small=(100, 1000, 10000))
+def refresh_loan_menu(n, timer):
+    r = restaurant(10).fork()
+    menu = LoanMenu.from_random(n, random.Random(SEED))
+    r.metadata['loan_menu'] = menu
+    r.enable_loan_menu_refresh(SEED)
+    menu.requirement_index
+    with timer:
+        r.refresh_loan_menu()
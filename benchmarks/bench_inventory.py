@@ -0,0 +1,21 @@
+from .fixtures import inventory_item
+from .runner import benchmark
+
+LOTS = dict(small=(10, 100, 1000), full=(10000,))
+
+
+@benchmark('InventoryItem.subtract', **LOTS)
+def subtract(n, timer):
+    item = inventory_item(n)
+    # Consume half of the lots
+    quantity = item.quantity // 2
+    with timer:
+        item.subtract(quantity)
+
+
+@benchmark('InventoryItem.cost_of', **LOTS)
+def cost_of(n, timer):
+    item = inventory_item(n)
+    quantity = item.quantity // 2
+    with timer:
+        item.cost_of(quantity)
@@ -0,0 +1,44 @@
+import io
+
+from src import ManagerServer, Restaurant, RestaurantManager
+
+from .fixtures import ledger_restaurant, restaurant
+from .runner import benchmark
+
+TRANSACTIONS = dict(small=(1000, 10000, 100000), full=(1000000,))
+
+
+@benchmark('Business.to_file', **TRANSACTIONS)
+def to_file(n, timer):
+    r = restaurant(100, n)
+    f = io.StringIO()
+    with timer:
+        r.to_file(f)
+
+
+@benchmark('Business.from_file', **TRANSACTIONS)
+def from_file(n, timer):
+    f = io.StringIO()
+    restaurant(100, n).to_file(f)
+    f.seek(0)
+    with timer:
+        Restaurant.from_file(f)
+
+
+@benchmark('Ledger.to_file', **TRANSACTIONS)
+def ledger_to_file(n, timer):
+    r = ledger_restaurant(100, n)
+    f = io.StringIO()
+    with timer:
+        r.to_file(f)
+
+
+@benchmark('ManagerServer.handle_get', **TRANSACTIONS)
+def server_handle_get(n, timer):
+    # Port 0 binds any free port; the server is never started
+    with ManagerServer(RestaurantManager(ledger_restaurant(100, n)),
+                       ('127.0.0.1', 0)) as server:
+        with timer:
+            for path in ('/balance', '/inventory', '/dishes', '/loans'):
+                server.handle_get(path, {})
+            server.handle_get('/transactions', {'limit': '1000'})
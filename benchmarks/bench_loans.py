@@ -0,0 +1,78 @@
+import random
+
+from src import LoanMenu, LoanPaybackType, Manager
+
+from .fixtures import SEED, restaurant
+from .runner import benchmark
+
+
+@benchmark('LoanMenu.from_random', small=(8, 15))
+def from_random(n, timer):
+    random.seed(SEED)
+    with timer:
+        LoanMenu.from_random(n)
+
+
+@benchmark('Loan.check', small=(1000, 10000, 100000), full=(1000000,))
+def check(n, timer):
+    r = restaurant(10, n)
+    loans = list(r.metadata['loan_menu'])
+    with timer:
+        for loan in loans:
+            loan.check(r)
+
+
+@benchmark('Loan.get_next_payment', small=(100, 1000, 10000))
+def get_next_payment(n, timer):
+    # Negotiable terms are filled in like the manager does when applying
+    loans = [loan.copy(term=loan.term or 5,
+                       payback_type=loan.payback_type or LoanPaybackType.WEEKLY)
+             for loan in restaurant(10).metadata['loan_menu']]
+    with timer:
+        for _ in range(n):
+            for loan in loans:
+                loan.get_next_payment()
+
+
+@benchmark('Manager.describe_loan_options', small=(8, 15))
+def describe_loan_options(n, timer):
+    random.seed(SEED)
+    menu = LoanMenu.from_random(n)
+    with timer:
+        Manager.describe_loan_options(
+            menu, (1, 2, 3, 5, 10),
+            (LoanPaybackType.MONTHLY, LoanPaybackType.ANNUALLY))
+
+
+@benchmark('LoanMenu.evaluate', small=(1000, 10000, 100000), full=(1000000,))
+def evaluate(n, timer):
+    r = restaurant(10, n)
+    menu = r.metadata['loan_menu']
+    with timer:
+        menu.evaluate(r)
+
+
+@benchmark('LoanMenu.qualifying', small=(100, 1000, 10000), full=(100000,))
+def qualifying(n, timer):
+    random.seed(SEED)
+    menu = LoanMenu.from_random(n)
+    r = restaurant(10, 1000)
+    # Build the index outside of the timed section
+    menu.requirement_index
+    with timer:
+        menu.qualifying(r)
+
+
+@benchmark('LoanMenu.project_cash_flow', small=(10, 100, 1000), full=(10000,))
+def project_cash_flow(n, timer):
+    rng = random.Random(SEED)
+    payback_types = list(LoanPaybackType)
+    loans = [loan.copy(term=loan.term or rng.randint(1, 10),
+                       payback_type=rng.choice(payback_types))
+             for loan in LoanMenu.from_random(n, rng) if not loan.is_subsidy]
+    for loan in loans:
+        loan.reset_remaining_weeks()
+        loan.remaining_weeks = rng.randint(0, loan.remaining_weeks)
+    menu = LoanMenu(loans)
+    with timer:
+        menu.project_cash_flow(48, current_week=rng.randrange(48))
@@ -0,0 +1,53 @@
+from src import BillOfMaterials
+
+from .fixtures import restaurant
+from .runner import benchmark
+
+DISHES = dict(small=(10, 100, 1000), full=(10000,))
+
+
+@benchmark('Restaurant.update_sales', **DISHES)
+def update_sales(n, timer):
+    r = restaurant(n).fork()
+    with timer:
+        r.update_sales()
+
+
+@benchmark('Restaurant.update_expenses', **DISHES)
+def update_expenses(n, timer):
+    r = restaurant(n).fork()
+    with timer:
+        r.update_expenses()
+
+
+@benchmark('DishMenu.requirements', **DISHES)
+def requirements(n, timer):
+    menu = restaurant(n).fork().dishes
+    with timer:
+        menu.requirements()
+
+
+@benchmark('BillOfMaterials.max_producible', **DISHES)
+def max_producible(n, timer):
+    r = restaurant(n)
+    bom = r.dishes.fork().bill_of_materials
+    stock = {i.name: i.quantity for i in r.inventory.fork()}
+    with timer:
+        bom.max_producible(stock)
+
+
+@benchmark('Restaurant.producible_table', **DISHES)
+def producible_table(n, timer):
+    r = restaurant(n).fork()
+    r.producible_table()
+    # Only the dishes using the changed ingredient are recomputed
+    r.inventory[r.dishes.bill_of_materials.ingredients[0]].subtract(1)
+    with timer:
+        r.producible_table()
+
+
+@benchmark('BillOfMaterials.components', **DISHES)
+def components(n, timer):
+    bom = BillOfMaterials(restaurant(n).dishes.fork())
+    with timer:
+        bom.components()
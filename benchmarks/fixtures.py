@@ -0,0 +1,43 @@
+"""Synthetic inputs shared by the benchmarks.
+
+Built restaurants are cached, so benchmarks should work on a fork()
+of them instead of modifying them directly."""
+import decimal
+import functools
+
+from src import (InventoryItem, InventoryItemEntry, Ledger, Restaurant,
+                 RestaurantGenerator)
+
+__all__ = ['SEED', 'inventory_item', 'ledger_restaurant', 'restaurant']
+
+SEED = 2020
+PURCHASES_PER_MONTH = 10
+
+
+def inventory_item(lots: int) -> InventoryItem:
+    """Create an inventory item with some number of price lots."""
+    return InventoryItem('Flour', 'gram', [
+        InventoryItemEntry(quantity=1000, price=decimal.Decimal(i + 1) / 1000)
+        for i in range(lots)
+    ])
+
+
+@functools.lru_cache(maxsize=None)
+def ledger_restaurant(dishes: int = 10, transactions: int = 0) -> Restaurant:
+    """Create the same restaurant as restaurant() with its transactions
+    stored in a Ledger."""
+    r = restaurant(dishes, transactions).fork()
+    r.transactions = Ledger(r.transactions)
+    return r
+
+
+@functools.lru_cache(maxsize=None)
+def restaurant(dishes: int = 10, transactions: int = 0) -> Restaurant:
+    """Create a restaurant with some number of dishes and
+    roughly some number of historical transactions."""
+    # Each month of history has the purchases and one sales deposit
+    weeks = 4 * transactions // (PURCHASES_PER_MONTH + 1)
+    return RestaurantGenerator(
+        seed=SEED, dishes=dishes, history_weeks=weeks,
+        purchases_per_month=PURCHASES_PER_MONTH
+    ).generate()
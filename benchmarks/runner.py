@@ -0,0 +1,136 @@
+"""This provides a small harness for registering, running and comparing
+benchmarks."""
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, NamedTuple, Sequence
+
+__all__ = ['Benchmark', 'Timer', 'benchmark', 'compare', 'run']
+
+SCALES = ('small', 'full')
+
+# All registered benchmarks in the order they were defined
+BENCHMARKS: List['Benchmark'] = []
+
+
+class Timer:
+    """A context manager measuring the time spent inside it.
+
+    Benchmarks use this to exclude their setup from the measurement:
+        >>> with timer:
+        ...     restaurant.step(weeks=4)
+
+    """
+
+    def __init__(self):
+        self.elapsed = 0.
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.elapsed += time.perf_counter() - self._start
+
+
+class Benchmark(NamedTuple):
+    name: str
+    func: Callable
+    params: Dict[str, Sequence]
+
+    def keys(self, scale: str):
+        """Return the result keys and parameters to run at a given scale."""
+        for n in self.params[scale]:
+            yield f'{self.name}[{n}]', n
+
+
+def benchmark(name: str, *, small: Sequence, full: Sequence = ()):
+    """Register a benchmark.
+
+    The decorated function is called with a parameter and a Timer,
+    once per repetition, and must time its workload using the Timer.
+
+    Args:
+        name (str): The name of the benchmark.
+        small (Sequence): The parameters used for the default scale.
+        full (Sequence): The additional parameters used for the full scale.
+
+    """
+    def decorator(func):
+        params = {'small': tuple(small), 'full': tuple(small) + tuple(full)}
+        BENCHMARKS.append(Benchmark(name, func, params))
+        return func
+    return decorator
+
+
+def run(scale='small', *, repeat=5, select=None, verbose=True) -> dict:
+    """Run the registered benchmarks.
+
+    Args:
+        scale (str): Either 'small' or 'full'.
+        repeat (int): The number of times to run each benchmark.
+        select (Optional[str]): If provided, only benchmarks containing
+            this substring in their name are run.
+        verbose (bool): Print each result as it finishes.
+
+    Returns:
+        dict: The machine-readable results.
+
+    """
+    if scale not in SCALES:
+        raise ValueError(f'Unknown scale: {scale!r}')
+
+    results = {}
+    for bench in BENCHMARKS:
+        if select is not None and select not in bench.name:
+            continue
+        for key, n in bench.keys(scale):
+            times = []
+            for _ in range(repeat):
+                timer = Timer()
+                bench.func(n, timer)
+                times.append(timer.elapsed)
+            results[key] = {
+                'min': min(times),
+                'median': statistics.median(times),
+                'repeat': repeat
+            }
+            if verbose:
+                print(f'{key:<50} {min(times) * 1000:>12.3f} ms', flush=True)
+
+    return {
+        'meta': {
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'scale': scale,
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S')
+        },
+        'results': results
+    }
+
+
+def compare(results: dict, baseline: dict, threshold=0.2) -> List[str]:
+    """Compare results against a baseline.
+
+    Args:
+        results (dict): The output of run().
+        baseline (dict): A previous output of run().
+        threshold (float): The relative slowdown of the minimum time
+            that counts as a regression.
+
+    Returns:
+        List[str]: The names of the regressed benchmarks.
+
+    """
+    regressions = []
+    old = baseline['results']
+    for key, new in results['results'].items():
+        if key not in old or old[key]['min'] <= 0:
+            continue
+        ratio = new['min'] / old[key]['min']
+        if ratio > 1 + threshold:
+            regressions.append(key)
+        print(f'{key:<50} {ratio:>8.2f}x'
+              + ('  REGRESSION' if ratio > 1 + threshold else ''))
+    return regressions
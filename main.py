@@ -1,15 +1,119 @@
+import argparse
 import json
 from pathlib import Path
+import random
+import sys
+import time
 
-from src import Restaurant, RestaurantManager
+from src import (CommandProfiler, ForecastPolicy, JSONEncoder,
+                 ManagerServer, ReorderPointPolicy, Restaurant,
+                 RestaurantGenerator, RestaurantManager, Simulation)
 from src import InventoryItem, Item
 from src import utils
 
 SAVE_BUSINESS = 'business.sav'
 COMPRESSED = True
+RESTOCK_POLICIES = {policy.NAME: policy
+                    for policy in (ForecastPolicy, ReorderPointPolicy)}
 
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description='The Spaghetto Restaurant Manager. '
+                    'Runs the interactive manager if no command is given.')
+    parser.add_argument('--profile', nargs='?', const='spaghetto.pstats',
+                        metavar='FILE',
+                        help='profile the interactive session and write the '
+                             'stats to FILE (default: spaghetto.pstats)')
+    parser.add_argument('--profile-top', type=int, default=15, metavar='N',
+                        help='the number of commands and functions to show '
+                             'in the profile summary (default: 15)')
+    commands = parser.add_subparsers(dest='command')
+
+    simulate = commands.add_parser(
+        'simulate', help='step a saved restaurant forward without user input')
+    simulate.add_argument('--months', type=int, default=12,
+                          help='the number of months to step (default: 12)')
+    simulate.add_argument('--save', default=SAVE_BUSINESS,
+                          help=f'the save file to load (default: {SAVE_BUSINESS})')
+    simulate.add_argument('--report',
+                          help='the file to write the JSON summary to '
+                               '(default: standard output)')
+    simulate.add_argument('--seed', type=int,
+                          help='seed the random number generator')
+    simulate.add_argument('--no-restock', dest='restock', action='store_false',
+                          help='do not restock ingredients every month')
+    simulate.add_argument('--restock-policy', choices=sorted(RESTOCK_POLICIES),
+                          help="how to restock ingredients (default: the save's "
+                               'policy, or reorder_point if it has none)')
+    simulate.add_argument('--write', action='store_true',
+                          help='write the stepped restaurant back to the save '
+                               'file, keeping its own restock policy')
+    simulate.add_argument('--columnar-ledger', action='store_true',
+                          help='store transactions in compact arrays')
+
+    script = commands.add_parser(
+        'script', help='run a file of commands against a restaurant '
+                       'without prompts')
+    script.add_argument('file',
+                        help='the script to run, or - to read standard input')
+    script.add_argument('--save', default=SAVE_BUSINESS,
+                        help='the save file to load and write, which is '
+                             f'created if it does not exist (default: {SAVE_BUSINESS})')
+    script.add_argument('--seed', type=int,
+                        help='seed the random number generator')
+    script.add_argument('--dry-run', action='store_true',
+                        help='run the script without saving the restaurant')
+
+    serve = commands.add_parser(
+        'serve', help='serve a saved restaurant as a local JSON API')
+    serve.add_argument('--save', default=SAVE_BUSINESS,
+                       help=f'the save file to load (default: {SAVE_BUSINESS}). '
+                            'Changes are only written by POST /save')
+    serve.add_argument('--host', default='127.0.0.1',
+                       help='the address to listen on (default: 127.0.0.1)')
+    serve.add_argument('--port', type=int, default=8000,
+                       help='the port to listen on (default: 8000)')
+    serve.add_argument('--columnar-ledger', action='store_true',
+                       help='store transactions in compact arrays')
+    serve.add_argument('--verbose', action='store_true',
+                       help='log every request')
+
+    generate = commands.add_parser(
+        'generate', help='generate a synthetic restaurant for load testing')
+    generate.add_argument('save', help='the save file to write')
+    generate.add_argument('--seed', type=int,
+                          help='seed the random number generator')
+    generate.add_argument('--dishes', type=int, default=20,
+                          help='the number of dishes (default: 20)')
+    generate.add_argument('--ingredients', type=int,
+                          help='the number of distinct ingredients')
+    generate.add_argument('--ingredients-per-dish', type=int, default=4,
+                          help='the number of ingredients per dish (default: 4)')
+    generate.add_argument('--lots', type=int, default=3,
+                          help='the number of price lots per item (default: 3)')
+    generate.add_argument('--loans', type=int, default=0,
+                          help='the number of active loans (default: 0)')
+    generate.add_argument('--history', type=int, default=0,
+                          help='the weeks of transaction history (default: 0)')
+
+    return parser.parse_args(argv)
+
+
+def generate(args):
+    RestaurantGenerator(
+        seed=args.seed,
+        dishes=args.dishes,
+        ingredients=args.ingredients,
+        ingredients_per_dish=args.ingredients_per_dish,
+        lots_per_item=args.lots,
+        loans=args.loans,
+        history_weeks=args.history
+    ).save(args.save, compressed=COMPRESSED)
+    return 0
+
+
+def interactive(args):
     if Path(SAVE_BUSINESS).is_file():
         try:
             manager = RestaurantManager.from_filepath(SAVE_BUSINESS, compressed=COMPRESSED)
@@ -21,9 +125,121 @@ def main():
         manager = RestaurantManager(Restaurant(), filepath=SAVE_BUSINESS,
                                     compressed=COMPRESSED)
 
+    if args.profile:
+        manager.profiler = CommandProfiler()
+
     with manager.start_transaction():
-        manager.run()
+        if manager.profiler is None:
+            manager.run()
+        else:
+            try:
+                manager.profiler.runcall(manager.run)
+            finally:
+                manager.profiler.dump(args.profile)
+                print(manager.profiler.summary(args.profile_top))
+                print(f'Profile written to {args.profile}')
+
+
+def script(args):
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    if Path(args.save).is_file():
+        manager = RestaurantManager.from_filepath(args.save, compressed=COMPRESSED)
+        manager.business.generate_metadata()
+    else:
+        manager = RestaurantManager(Restaurant(), filepath=args.save,
+                                    compressed=COMPRESSED)
+
+    start = time.perf_counter()
+    try:
+        if args.file == '-':
+            count = manager.run_script(sys.stdin)
+        else:
+            with open(args.file, encoding='utf-8') as f:
+                count = manager.run_script(f)
+    except (OSError, ValueError) as e:
+        print(f'{args.file}: {e}', file=sys.stderr)
+        return 1
+
+    # The restaurant is only saved once every command has succeeded
+    if not args.dry_run:
+        manager.save_business()
+    print('Ran {:,} {} in {:.3f} seconds.'.format(
+        count, utils.plural('command', count), time.perf_counter() - start))
+    return 0
+
+
+def serve(args):
+    if not Path(args.save).is_file():
+        print(f'Save file {args.save!r} does not exist.', file=sys.stderr)
+        return 1
+
+    manager = RestaurantManager.from_filepath(
+        args.save, compressed=COMPRESSED, columnar_ledger=args.columnar_ledger)
+    manager.business.generate_metadata()
+
+    with ManagerServer(manager, (args.host, args.port),
+                       verbose=args.verbose) as server:
+        host, port = server.server_address[:2]
+        print(f'Serving {args.save} on http://{host}:{port}/ '
+              '(press Ctrl+C to stop)')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+def simulate(args):
+    if not Path(args.save).is_file():
+        print(f'Save file {args.save!r} does not exist.', file=sys.stderr)
+        return 1
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    start = time.perf_counter()
+    restaurant = Restaurant.from_file(args.save,
+                                      columnar_ledger=args.columnar_ledger)
+    restaurant.generate_metadata()
+    load_time = time.perf_counter() - start
+
+    policy = None
+    if args.restock_policy is not None:
+        policy = RESTOCK_POLICIES[args.restock_policy]()
+    sim = Simulation(restaurant, restock=args.restock, policy=policy)
+    sim.timings['load'] = load_time
+    sim.run(args.months)
+
+    if args.write:
+        with sim.time('save'):
+            restaurant.to_file(args.save, compressed=COMPRESSED)
+
+    report = sim.summary()
+    report['save'] = args.save
+    report['timings']['total'] = time.perf_counter() - start
+
+    text = json.dumps(report, cls=JSONEncoder, indent=4)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == 'simulate':
+        return simulate(args)
+    elif args.command == 'generate':
+        return generate(args)
+    elif args.command == 'script':
+        return script(args)
+    elif args.command == 'serve':
+        return serve(args)
+    interactive(args)
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
@@ -1,4 +1,7 @@
+from . import billofmaterials
 from . import business
+from . import businessmetrics
+from . import commandprofiler
 from . import dish
 from . import dishmenu
 from . import inventory
@@ -6,20 +9,31 @@ from . import inventorybase
 from . import inventoryitem
 from . import inventoryitementry
 from . import item
+from . import journal
 from . import jsonencoder
+from . import ledger
 from . import loan
 from . import loanmenu
 from . import loaninteresttype
 from . import loanpaybacktype
 from . import loanrequirement
+from . import loanrequirementindex
 from . import loanrequirementtype
+from . import loanschedule
 from . import manager
+from . import managerserver
 from . import restaurant
+from . import restaurantgenerator
 from . import restaurantmanager
+from . import restockpolicy
+from . import simulation
 from . import transaction
 from . import transactiontype
 from . import utils
+from .billofmaterials import *
 from .business import *
+from .businessmetrics import *
+from .commandprofiler import *
 from .dish import *
 from .dishmenu import *
 from .inventory import *
@@ -27,16 +41,24 @@ from .inventorybase import *
 from .inventoryitem import *
 from .inventoryitementry import *
 from .item import *
+from .journal import *
 from .jsonencoder import *
+from .ledger import *
 from .loan import *
 from .loanmenu import *
 from .loaninteresttype import *
 from .loanpaybacktype import *
 from .loanrequirement import *
+from .loanrequirementindex import *
 from .loanrequirementtype import *
+from .loanschedule import *
 from .manager import *
+from .managerserver import *
 from .restaurant import *
+from .restaurantgenerator import *
 from .restaurantmanager import *
+from .restockpolicy import *
+from .simulation import *
 from .transaction import *
 from .transactiontype import *
 from .utils import *
@@ -0,0 +1,391 @@
+"""This provides a sparse matrix of the ingredients used by each dish
+on a menu."""
+import array
+import decimal
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .dish import Dish
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+__all__ = ['BillOfMaterials']
+
+
+class BillOfMaterials:
+    """A sparse ingredient × dish matrix of recipe quantities.
+
+    Each dish is stored as a column of ingredient ids and quantities,
+    so adding, replacing or removing a dish only rebuilds its column.
+    Menu-wide operations use a compiled coordinate (COO) form of the
+    matrix which is cached until the next change, and are vectorized
+    with NumPy if it is installed.
+
+    Vectors are given and returned as mappings by name, where missing
+    names count as 0.
+
+    Usage:
+        >>> bom = BillOfMaterials(restaurant.dishes)
+        >>> bom.requirements({'Latte': 20})
+        {'Beans': 400, 'Milk': 4000}
+        >>> bom.max_producible({'Beans': 1000, 'Milk': 1000})
+        {'Latte': 5}
+
+    Args:
+        dishes (Iterable[Dish])
+
+    """
+
+    def __init__(self, dishes: Iterable[Dish] = ()):
+        self.ingredients: List[str] = []
+        self._ingredient_ids: Dict[str, int] = {}
+        # Dish names mapped to their ingredient ids and quantities
+        self._columns: Dict[str, Tuple[Tuple[int, ...], Tuple[int, ...]]] = {}
+        self._compiled = None
+        self._using = None
+        self._components = None
+        # Incremented on every change so results computed from
+        # the matrix can tell when they are out of date
+        self.version = 0
+        for dish in dishes:
+            self.set_dish(dish)
+
+    def __contains__(self, name: str):
+        return name in self._columns
+
+    def __len__(self):
+        return len(self._columns)
+
+    def __repr__(self):
+        return '{}({:,} dishes, {:,} ingredients)'.format(
+            self.__class__.__name__, len(self._columns), len(self.ingredients))
+
+    def _changed(self):
+        self._compiled = None
+        self._using = None
+        self._components = None
+        self.version += 1
+
+    def column(self, name: str) -> Dict[str, int]:
+        """Return the quantity of each ingredient used by a dish.
+
+        Raises:
+            KeyError: The dish is not in the matrix.
+
+        """
+        ids, quantities = self._columns[name]
+        column = {}
+        for i, q in zip(ids, quantities):
+            ingredient = self.ingredients[i]
+            column[ingredient] = column.get(ingredient, 0) + q
+        return column
+
+    def _compile(self):
+        """Return the matrix in coordinate form, compiling it if needed.
+
+        Entries are grouped by dish in the order of `dishes`, and
+        `starts` holds the index of each dish's first entry.
+
+        Returns:
+            Tuple[List[str], array.array, array.array, array.array,
+                  array.array]: dishes, starts, rows, cols and quantities.
+
+        """
+        if self._compiled is not None:
+            return self._compiled
+
+        dishes = list(self._columns)
+        starts = array.array('q')
+        rows = array.array('q')
+        cols = array.array('q')
+        data = array.array('q')
+        for j, (ids, quantities) in enumerate(self._columns.values()):
+            starts.append(len(rows))
+            rows.extend(ids)
+            cols.extend([j] * len(ids))
+            data.extend(quantities)
+
+        self._compiled = (dishes, starts, rows, cols, data)
+        return self._compiled
+
+    def components(self) -> List[List[str]]:
+        """Return groups of dishes linked by shared ingredients.
+
+        Dishes in different groups never compete for the same stock,
+        so they can be made independently of each other. Dishes without
+        ingredients are in a group of their own. Groups and the dishes
+        in them are in the order the dishes were added.
+
+        Returns:
+            List[List[str]]: The names of the dishes in each group.
+
+        """
+        if self._components is not None:
+            return [c.copy() for c in self._components]
+
+        dishes = list(self._columns)
+        index = {name: j for j, name in enumerate(dishes)}
+        # Union-find over dish indices
+        parent = list(range(len(dishes)))
+
+        def find(j):
+            while parent[j] != j:
+                parent[j] = parent[parent[j]]
+                j = parent[j]
+            return j
+
+        for users in self._dishes_using().values():
+            root = find(index[users[0]])
+            for name in users[1:]:
+                other = find(index[name])
+                if other != root:
+                    # Keep the earliest dish as the root
+                    if other < root:
+                        root, other = other, root
+                    parent[other] = root
+
+        groups: Dict[int, List[str]] = {}
+        for j, name in enumerate(dishes):
+            groups.setdefault(find(j), []).append(name)
+        self._components = list(groups.values())
+        return [c.copy() for c in self._components]
+
+    def copy(self):
+        """Return a copy that can be changed independently."""
+        new = self.__class__()
+        new.ingredients = self.ingredients.copy()
+        new._ingredient_ids = self._ingredient_ids.copy()
+        # Columns are immutable and can be shared
+        new._columns = self._columns.copy()
+        new._compiled = self._compiled
+        new._using = self._using
+        new._components = self._components
+        new.version = self.version
+        return new
+
+    def costs(self, unit_prices: Mapping[str, decimal.Decimal]) \
+            -> Dict[str, Optional[decimal.Decimal]]:
+        """Return the cost of making one of each dish.
+
+        Costs are kept as Decimals, so this is not vectorized.
+
+        Args:
+            unit_prices (Mapping[str, decimal.Decimal]):
+                The price of one unit of each ingredient.
+
+        Returns:
+            Dict[str, Optional[decimal.Decimal]]: The cost of each dish,
+                or None if one of its ingredients has no price.
+
+        """
+        prices = [unit_prices.get(name) for name in self.ingredients]
+        costs = {}
+        for dish, (ids, quantities) in self._columns.items():
+            cost = decimal.Decimal()
+            for i, q in zip(ids, quantities):
+                price = prices[i]
+                if price is None:
+                    cost = None
+                    break
+                cost += price * q
+            costs[dish] = cost
+        return costs
+
+    def dishes_using(self) -> Dict[str, List[str]]:
+        """Return the dishes using each ingredient, which are the dishes
+        competing for that ingredient's stock."""
+        return {k: v.copy() for k, v in self._dishes_using().items()}
+
+    def _dishes_using(self) -> Dict[str, List[str]]:
+        """Return dishes_using() without copying, caching it until
+        the next change."""
+        if self._using is not None:
+            return self._using
+        using = {}
+        for dish, (ids, _) in self._columns.items():
+            for i in ids:
+                dishes = using.setdefault(self.ingredients[i], [])
+                if not dishes or dishes[-1] != dish:
+                    dishes.append(dish)
+        self._using = using
+        return using
+
+    def feasible(self, stock: Mapping[str, int],
+                 sales: Mapping[str, int]) -> bool:
+        """Check if some number of each dish can be made from
+        the stock of ingredients."""
+        return not self.shortages(stock, sales)
+
+    def _id(self, ingredient: str) -> int:
+        i = self._ingredient_ids.get(ingredient)
+        if i is None:
+            i = self._ingredient_ids[ingredient] = len(self.ingredients)
+            self.ingredients.append(ingredient)
+        return i
+
+    def max_producible(self, stock: Mapping[str, int],
+                       dishes: Iterable[str] = None) \
+            -> Dict[str, Optional[int]]:
+        """Return the number of each dish that could be made from
+        the stock of ingredients if it was the only dish made.
+
+        Args:
+            stock (Mapping[str, int]): The quantity of each ingredient.
+            dishes (Optional[Iterable[str]]): Only compute these dishes.
+                Defaults to every dish in the matrix.
+
+        Returns:
+            Dict[str, Optional[int]]: The number of each dish, or None
+                for dishes without ingredients.
+
+        """
+        if dishes is not None:
+            ingredients = self.ingredients
+            result = {}
+            for name in dishes:
+                column = self._columns[name]
+                result[name] = self._producible(
+                    column, [stock.get(ingredients[i], 0) for i in column[0]])
+            return result
+
+        dishes, starts, rows, cols, data = self._compile()
+        result = dict.fromkeys(dishes)
+        if not rows:
+            return result
+        stock_vector = [stock.get(name, 0) for name in self.ingredients]
+
+        if numpy is not None:
+            data_ = numpy.frombuffer(data, 'i8')
+            counts = numpy.asarray(stock_vector, 'i8')[
+                numpy.frombuffer(rows, 'i8')]
+            # Clamp negative stock to 0 and ignore entries without a quantity
+            counts = numpy.maximum(counts, 0)
+            counts = numpy.where(data_ > 0,
+                                 counts // numpy.maximum(data_, 1),
+                                 numpy.iinfo('i8').max)
+            del data_
+            starts_ = numpy.frombuffer(starts, 'i8')
+            nonempty = numpy.diff(numpy.append(starts_, len(rows))) > 0
+            minimums = numpy.minimum.reduceat(counts, starts_[nonempty])
+            del starts_
+            limit = numpy.iinfo('i8').max
+            for j, n in zip(numpy.flatnonzero(nonempty).tolist(),
+                            minimums.tolist()):
+                result[dishes[j]] = None if n == limit else n
+            return result
+
+        for dish, column in self._columns.items():
+            result[dish] = self._producible(
+                column, [stock_vector[i] for i in column[0]])
+        return result
+
+    @staticmethod
+    def _producible(column, stock: List[int]) -> Optional[int]:
+        """Return the number of a dish that can be made from the stock
+        of each of its ingredients in column order."""
+        n = None
+        for have, q in zip(stock, column[1]):
+            if q <= 0:
+                continue
+            count = max(have, 0) // q
+            if n is None or count < n:
+                n = count
+        return n
+
+    def remove_dish(self, name: str):
+        """Remove a dish from the matrix if it exists."""
+        if self._columns.pop(name, None) is not None:
+            self._changed()
+
+    def requirements(self, sales: Mapping[str, int]) -> Dict[str, int]:
+        """Return the total quantity of each ingredient needed to make
+        some number of each dish.
+
+        Args:
+            sales (Mapping[str, int]): The number of each dish by name.
+
+        Returns:
+            Dict[str, int]: The quantity of each ingredient that is needed.
+                Ingredients that are not needed are omitted.
+
+        """
+        dishes, starts, rows, cols, data = self._compile()
+
+        # The vectorized version always works on the whole matrix,
+        # so it is only used when most of the dishes are included
+        if numpy is not None and rows and len(sales) * 4 >= len(dishes):
+            sales_vector = numpy.asarray(
+                [sales.get(name) or 0 for name in dishes], 'i8')
+            weights = (numpy.frombuffer(data, 'i8')
+                       * sales_vector[numpy.frombuffer(cols, 'i8')])
+            # bincount sums in floating point, which is exact for totals
+            # below 2 ** 53
+            needed = numpy.rint(numpy.bincount(
+                numpy.frombuffer(rows, 'i8'), weights=weights,
+                minlength=len(self.ingredients))).astype('i8')
+            ingredients = self.ingredients
+            return {ingredients[i]: n
+                    for i, n in zip(numpy.flatnonzero(needed).tolist(),
+                                    needed[needed != 0].tolist())}
+
+        needed = [0] * len(self.ingredients)
+        for dish, n in sales.items():
+            column = self._columns.get(dish)
+            if not n or column is None:
+                continue
+            for i, q in zip(*column):
+                needed[i] += q * n
+        ingredients = self.ingredients
+        return {ingredients[i]: n for i, n in enumerate(needed) if n}
+
+    def set_dish(self, dish: Dish):
+        """Add a dish to the matrix or replace an existing dish's column."""
+        column: Dict[int, int] = {}
+        for item in dish.items:
+            i = self._id(item.name)
+            # Items listed more than once are made from the same stock
+            column[i] = column.get(i, 0) + item.quantity
+        self._columns[dish.name] = (tuple(column), tuple(column.values()))
+        self._changed()
+
+    def shortages(self, stock: Mapping[str, int],
+                  sales: Mapping[str, int]) -> Dict[str, int]:
+        """Return how much of each ingredient is missing from the stock
+        to make some number of each dish.
+
+        Returns:
+            Dict[str, int]: The missing quantity of each ingredient.
+                Ingredients with enough stock are omitted.
+
+        """
+        missing = {}
+        for name, needed in self.requirements(sales).items():
+            n = needed - stock.get(name, 0)
+            if n > 0:
+                missing[name] = n
+        return missing
+
+    def update_producible(self, table: Dict[str, Optional[int]],
+                          stock: Mapping[str, int],
+                          changed: Iterable[str]):
+        """Update a table made by max_producible() in place after
+        the stock of some ingredients changed.
+
+        Only the dishes using the changed ingredients are recomputed.
+        The table must have been made since the last change to
+        the matrix (see `version`).
+
+        Args:
+            table (Dict[str, Optional[int]]): The table to update.
+            stock (Mapping[str, int]): The new quantity of each ingredient.
+            changed (Iterable[str]): The ingredients whose stock changed.
+
+        """
+        using = self._dishes_using()
+        dishes = set()
+        for name in changed:
+            dishes.update(using.get(name, ()))
+        if dishes:
+            table.update(self.max_producible(stock, dishes))
@@ -2,20 +2,26 @@
 and provides an interface for saving and loading from disk."""
 import base64
 import zlib
-from dataclasses import asdict, dataclass, field
+from dataclasses import dataclass, field, fields, replace
 import decimal
 import json
-from typing import List, ClassVar
+import random
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, ClassVar, Optional, Tuple, Union
 
+from . import utils
 from .inventory import Inventory
 from .item import Item
 from .jsonencoder import *
+from .ledger import Ledger
 from .loan import Loan
 from .loanmenu import LoanMenu
 from .loanpaybacktype import LoanPaybackType
 from .transaction import Transaction
 from .transactiontype import TransactionType
-from .utils import round_dollars
+from .utils import deep_sizeof, round_dollars
 
 __all__ = ['Business']
 
@@ -26,8 +32,11 @@ class Business:
     Args:
         balance (Optional[decimal.Decimal]): The business's balance in dollars.
         inventory (Optional[Inventory]): The inventory of the business.
-        transactions (Optional[List[Transaction]]):
+        transactions (Optional[Union[List[Transaction], Ledger]]):
             The list of transactions the business has done.
+            If COLUMNAR_LEDGER is True, this is converted into a Ledger.
+            After a fork, call own_transactions() before changing them
+            directly.
         employee_count (Optional[int]): The number of employees.
         loans (LoanMenu): A list of loans the business is currently under.
         metadata (Optional[dict]): Some info about the business itself
@@ -43,7 +52,25 @@ class Business:
     metadata: dict = field(default_factory=dict)
 
     RANDOM_LOAN_COUNT: ClassVar[int] = 8
+    # The fraction of loan offers replaced every month once
+    # enable_loan_menu_refresh() has been called
+    LOAN_MENU_TURNOVER: ClassVar[float] = 0.125
+    # Store transactions in a columnar Ledger instead of a list
+    COLUMNAR_LEDGER: ClassVar[bool] = False
     NSF_FEE: ClassVar[decimal.Decimal] = decimal.Decimal('45')
+    # The methods timed when stats are enabled, which can be extended
+    # by subclasses
+    STATS_PHASES: ClassVar[Tuple[str, ...]] = (
+        'step', 'on_next_week', 'on_next_month', 'on_next_year',
+        'pay_loan', 'deposit', 'withdraw', 'buy_items'
+    )
+
+    # Whether the transactions are shared with a fork (see fork())
+    _transactions_shared = False
+
+    def __post_init__(self):
+        if self.COLUMNAR_LEDGER and not isinstance(self.transactions, Ledger):
+            self.transactions = Ledger(self.transactions)
 
     @property
     def month(self):
@@ -71,12 +98,9 @@ class Business:
             Transaction
 
         """
-        t = Transaction(
-            title=title,
-            dollars=round_dollars(dollars),
-            week=self.total_weeks,
-            transaction_type=type_
-        )
+        t = self._create_transaction(title, dollars, type_)
+        if self._transactions_shared:
+            self.own_transactions()
         self.transactions.append(t)
         return t
 
@@ -100,18 +124,107 @@ class Business:
             bool: The withdrawal's success.
 
         """
-        success = self.withdraw(f'{item}', -item.price, type_=TransactionType.PURCHASE)
+        return bool(self.buy_items([item]))
+
+    def buy_items(self, items: List[Item], *, all_or_nothing=True,
+                  consolidate=False) -> List[Item]:
+        """Buy several items at once and add them to the inventory.
 
-        if success:
-            inv_item = self.inventory.get(item.name)
+        The balance is checked and updated once for the whole purchase
+        and its transactions are appended to the ledger together.
+        If the balance cannot cover the items, the bank declines them
+        with a single NSF fee like withdraw() does.
+
+        Args:
+            items (List[Item]): The items to buy. Their prices are
+                the total cost of each item.
+            all_or_nothing (bool): If True, nothing is bought unless
+                every item can be paid for. Otherwise items are bought
+                in order, skipping the ones that cannot be paid for.
+            consolidate (bool): If True, a single purchase transaction
+                listing every item is recorded instead of one per item.
+
+        Returns:
+            List[Item]: The items that were bought.
+
+        Raises:
+            ValueError: An item's unit does not match the unit
+                of the same item in the inventory or in `items`.
+                Nothing is bought in that case.
+
+        """
+        units = {}
+        for item in items:
+            unit = units.get(item.name)
+            if unit is None:
+                inv_item = self.inventory.get(item.name)
+                unit = units[item.name] = (
+                    item.unit if inv_item is None else inv_item.unit)
+            if item.unit != unit:
+                raise ValueError(
+                    f'Cannot add item using {item.unit!r} units '
+                    f'to another in {unit!r} units')
+
+        # Item prices are already rounded to the nearest cent
+        total = sum(item.price for item in items)
+        if self.balance >= total or total <= 0:
+            bought, declined = list(items), []
+        elif all_or_nothing:
+            bought, declined = [], list(items)
+            total = 0
+        else:
+            bought, declined = [], []
+            balance = self.balance
+            for item in items:
+                if balance >= item.price or item.price <= 0:
+                    balance -= item.price
+                    bought.append(item)
+                else:
+                    declined.append(item)
+            total = sum(item.price for item in bought)
+
+        create = self._create_transaction
+        purchase = TransactionType.PURCHASE
+        if consolidate and bought:
+            batch = [create(f'Purchase of {utils.human_join(bought)}',
+                            -total, purchase)]
+        else:
+            batch = [create(str(item), -item.price, purchase)
+                     for item in bought]
+        if declined:
+            title = (str(declined[0]) if len(declined) == 1 else
+                     f"{len(declined):,} {utils.plural('item', len(declined))}")
+            batch.append(create(f'Declined transaction with NSF fee: {title}',
+                                -self.NSF_FEE, TransactionType.DEFAULT))
+            total += self.NSF_FEE
+
+        self.balance -= total
+        if self._transactions_shared:
+            self.own_transactions()
+        self.transactions.extend(batch)
+
+        inventory = self.inventory
+        for item in bought:
+            inv_item = inventory.get(item.name)
             if inv_item is not None:
-                # Update item
                 inv_item += item
             else:
-                # Add new item
-                self.inventory.add(item)
-
-        return success
+                inventory.add(item)
+
+        return bought
+
+    def _create_transaction(self, title: str, dollars: decimal.Decimal,
+                            type_=TransactionType.DEFAULT) -> Transaction:
+        """Create a transaction for the current week without
+        recording it (see add_transaction())."""
+        return Transaction(
+            # Titles like "Dish Sales" repeat often, so equal titles
+            # share one string
+            title=sys.intern(title),
+            dollars=round_dollars(dollars),
+            week=self.total_weeks,
+            transaction_type=type_
+        )
 
     def deposit(self, title: str, dollars: decimal.Decimal,
                 type_: TransactionType = None, log=True) -> bool:
@@ -143,6 +256,139 @@ class Business:
 
         return True
 
+    def _fork_fields(self) -> dict:
+        """Return the fields that fork() replaces with copy-on-write copies.
+        This can be extended by subclasses."""
+        metadata = {k: v.fork() if hasattr(v, 'fork') else v
+                    for k, v in self.metadata.items()}
+        # Both sides copy the transactions before changing them
+        # (see own_transactions())
+        self._transactions_shared = True
+        return {
+            'inventory': None if self.inventory is None else self.inventory.fork(),
+            'transactions': self.transactions,
+            'loans': self.loans.fork(),
+            'metadata': metadata
+        }
+
+    def _own_fork_fields(self):
+        """Replace everything a fork shares with its business
+        (see _fork_fields()) by private copies.
+        This can be extended by subclasses."""
+        if self.inventory is not None:
+            self.inventory._own_all()
+        self.own_transactions()
+        self.loans._own_all()
+        for v in self.metadata.values():
+            if hasattr(v, '_own_all'):
+                v._own_all()
+
+    def enable_stats(self, enabled=True):
+        """Enable or disable recording the number of calls and time spent
+        in each phase of step().
+
+        The methods listed in STATS_PHASES are wrapped on this instance
+        only while stats are enabled, so there is no overhead otherwise.
+        Enabling stats again does not reset them.
+
+        """
+        if not enabled:
+            for name in self.STATS_PHASES:
+                self.__dict__.pop(name, None)
+            self.__dict__.pop('_stats', None)
+            return
+        elif '_stats' in self.__dict__:
+            return
+
+        stats: Dict[str, list] = {}
+        self._stats = stats
+        perf_counter = time.perf_counter
+
+        def timed(phase, func):
+            def wrapper(*args, **kwargs):
+                start = perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    record = stats.get(phase)
+                    if record is None:
+                        record = stats[phase] = [0, 0.]
+                    record[0] += 1
+                    record[1] += perf_counter() - start
+            return wrapper
+
+        for name in self.STATS_PHASES:
+            setattr(self, name, timed(name, getattr(self, name)))
+
+    @property
+    def stats_enabled(self) -> bool:
+        return '_stats' in self.__dict__
+
+    def fork(self):
+        """Return a lightweight copy of the business for what-if analysis.
+
+        Inventory items, dishes and loans are shared with this business
+        and only copied once either side accesses them, and the transactions
+        are only copied once either side adds to them, so forking is cheap
+        even for large businesses. Changes made to the fork never affect
+        this business and vice versa.
+
+        Usage:
+            >>> what_if = business.fork()
+            >>> what_if.step(weeks=48)
+            >>> what_if.balance - business.balance
+
+        """
+        new = replace(self, **self._fork_fields())
+        new._transactions_shared = True
+        return new
+
+    def forecast_shortfall(self, weeks: int) \
+            -> Optional[Tuple[int, decimal.Decimal, decimal.Decimal]]:
+        """Find the first loan payment that is likely to be declined
+        within some number of weeks.
+
+        The balance is projected from the scheduled loan payments
+        (see LoanMenu.project_cash_flow()) and projected_income().
+        Loan payments are made before the income of the same week,
+        as they are in step().
+
+        Args:
+            weeks (int): The number of weeks to look ahead.
+
+        Returns:
+            Tuple[int, decimal.Decimal, decimal.Decimal]: The week the
+                payments are due in (see total_weeks), the payments due
+                and the projected balance before them.
+            None: Every payment can be made.
+
+        """
+        payments = self.loans.project_cash_flow(
+            weeks, current_week=self.total_weeks)
+        if not any(payments):
+            return None
+
+        balance = self.balance
+        for week, (payment, income) in enumerate(
+                zip(payments, self.projected_income(weeks)),
+                start=self.total_weeks + 1):
+            if payment > balance:
+                return week, payment, balance
+            balance += income - payment
+        return None
+
+    def enable_loan_menu_refresh(self, seed: int):
+        """Start replacing some of the loan offers every month
+        (see refresh_loan_menu()).
+
+        Args:
+            seed (int): The seed the new offers are generated from.
+                It is kept in the 'loan_menu_seed' metadata, so saved
+                games and forks see the same offers.
+
+        """
+        self.metadata['loan_menu_seed'] = seed
+
     def generate_metadata(self):
         """Generate some metadata for the business based on its current info.
         This can be extended by subclasses."""
@@ -161,24 +407,22 @@ class Business:
 
         """
         after = max(0, self.total_weeks - 48)
-        transactions = self.get_transactions(
-            after=after, type_=TransactionType.PURCHASE)
+        count, total = self._sum_transactions(after, TransactionType.PURCHASE)
 
-        if not transactions:
+        if not count:
             return decimal.Decimal()
-        return sum(-t.dollars for t in transactions) / max(1, decimal.Decimal(after) / 4)
+        return -total / max(1, decimal.Decimal(after) / 4)
 
     def get_monthly_revenue(self) -> decimal.Decimal:
         """Calculate the average monthly revenue using sales
         within one year."""
         after = max(0, self.total_weeks - 48)
-        transactions = self.get_transactions(
-            after=after, type_=TransactionType.SALES)
+        count, total = self._sum_transactions(after, TransactionType.SALES)
 
-        if not transactions:
+        if not count:
             return decimal.Decimal()
         time_span = decimal.Decimal(self.total_weeks - after)
-        return sum(t.dollars for t in transactions) / max(1, time_span / 4)
+        return total / max(1, time_span / 4)
 
     def get_transactions(self, limit: int = None, after: int = None,
                          type_=None, key=None) \
@@ -199,6 +443,9 @@ class Business:
                 the transaction should be included or not.
 
         """
+        if isinstance(self.transactions, Ledger):
+            return self._get_ledger_transactions(limit, after, type_, key)
+
         transactions = sorted(self.transactions, key=lambda t: t.week)
 
         query = []
@@ -217,11 +464,104 @@ class Business:
 
         return query[skip:]
 
+    def _get_ledger_transactions(self, limit, after, type_, key) \
+            -> List[Transaction]:
+        """Implement get_transactions() for a Ledger, only creating
+        the transactions that are needed."""
+        ledger = self.transactions
+        query = ledger.select(after=after, type_=type_)
+        if key is not None:
+            query = [t for t in map(ledger.__getitem__, query) if key(t)]
+
+        skip = 0
+        if limit is not None:
+            skip = len(query) - min(len(query), limit)
+        query = query[skip:]
+
+        if key is None:
+            return [ledger[i] for i in query]
+        return query
+
+    def _memory_components(self) -> dict:
+        """Return the components measured by memory_report().
+        This can be extended by subclasses."""
+        return {
+            'ledger': self.transactions,
+            'inventory': self.inventory,
+            'loans': self.loans,
+            'metadata': self.metadata
+        }
+
+    def memory_report(self, step_weeks: Optional[int] = None,
+                      top: int = 10) -> dict:
+        """Measure the memory used by each component of the business.
+
+        Objects referenced by multiple components are only counted
+        in the first component that references them.
+
+        Args:
+            step_weeks (Optional[int]): If provided, a fork of the business
+                is stepped by this many weeks while tracing allocations
+                with tracemalloc. This business is not affected.
+                The copies the fork makes of this business's data are
+                made before tracing, so they are not counted.
+            top (int): The number of allocation sites to include
+                when tracing a step.
+
+        Returns:
+            dict: A mapping with the 'components' and their 'total',
+                each having 'bytes' and 'objects' keys. If `step_weeks`
+                is provided, a 'step' key contains the net bytes allocated
+                and the `top` allocation sites.
+
+        """
+        seen = set()
+        components = {}
+        total_bytes = total_objects = 0
+        for name, component in self._memory_components().items():
+            size, count = deep_sizeof(component, seen)
+            components[name] = {'bytes': size, 'objects': count}
+            total_bytes += size
+            total_objects += count
+
+        report = {
+            'components': components,
+            'total': {'bytes': total_bytes, 'objects': total_objects}
+        }
+
+        if step_weeks is not None:
+            fork = self.fork()
+            fork._own_fork_fields()
+            tracing = tracemalloc.is_tracing()
+            if not tracing:
+                tracemalloc.start()
+            try:
+                before = tracemalloc.take_snapshot()
+                fork.step(weeks=step_weeks)
+                after = tracemalloc.take_snapshot()
+            finally:
+                if not tracing:
+                    tracemalloc.stop()
+
+            diff = after.compare_to(before, 'lineno')
+            report['step'] = {
+                'weeks': step_weeks,
+                'bytes': sum(d.size_diff for d in diff),
+                'top': [
+                    {'location': str(d.traceback), 'bytes': d.size_diff,
+                     'objects': d.count_diff}
+                    for d in diff[:top]
+                ]
+            }
+
+        return report
+
     def on_next_month(self):
         """Called by step() when a new month occurs."""
         for loan in self.loans:
             if loan.payback_type == LoanPaybackType.MONTHLY:
                 self.pay_loan(loan, in_inventory=True)
+        self.refresh_loan_menu()
 
     def on_next_week(self):
         """Called by step() when a new week occurs."""
@@ -239,6 +579,17 @@ class Business:
             if loan.payback_type == LoanPaybackType.ANNUALLY:
                 self.pay_loan(loan, in_inventory=True)
 
+    def own_transactions(self):
+        """Replace the transactions shared with a fork by a private copy.
+
+        add_transaction() and buy_items() do this automatically, so this
+        only needs to be called before changing the transactions directly.
+
+        """
+        if self._transactions_shared:
+            self.transactions = self.transactions.copy()
+            self._transactions_shared = False
+
     def pay_loan(self, loan: Loan, *, in_inventory=False) -> bool:
         """Pay a given loan according to its remaining weeks.
 
@@ -271,6 +622,83 @@ class Business:
 
         return success
 
+    def projected_income(self, weeks: int) -> List[decimal.Decimal]:
+        """Return the expected change in balance in each of the next
+        weeks, not counting loan payments.
+
+        The base business has no regular income, so this is all zeros.
+        This can be extended by subclasses.
+
+        Args:
+            weeks (int): The number of weeks to project.
+
+        Returns:
+            List[decimal.Decimal]
+
+        """
+        return [decimal.Decimal()] * weeks
+
+    def refresh_loan_menu(self) -> List[Loan]:
+        """Replace some of the offers in the loan menu with new ones.
+
+        A LOAN_MENU_TURNOVER fraction of the offers expire each month.
+        The offers are generated from the 'loan_menu_seed' metadata and
+        the current week, so forks of the business see the same offers.
+
+        This is called every month, but the loan menu only changes
+        after enable_loan_menu_refresh() is called.
+
+        Returns:
+            List[Loan]: The new offers.
+
+        """
+        loan_menu = self.metadata.get('loan_menu')
+        seed = self.metadata.get('loan_menu_seed')
+        if loan_menu is None or seed is None or not self.LOAN_MENU_TURNOVER:
+            return []
+        rng = random.Random(f'{seed}:{self.total_weeks}')
+        # New offers must not share a name with a loan already taken
+        taken = [loan.name for loan in self.loans.iter_readonly()]
+        return loan_menu.refresh(self.LOAN_MENU_TURNOVER, rng, taken=taken)
+
+    def _sum_transactions(self, after: int, type_: TransactionType) \
+            -> Tuple[int, decimal.Decimal]:
+        """Return the number and total dollars of transactions of a type
+        past a given week (inclusive)."""
+        if isinstance(self.transactions, Ledger):
+            return self.transactions.total(after=after, type_=type_)
+        # The order doesn't matter for a sum, so this skips sorting
+        count = 0
+        total = decimal.Decimal()
+        for t in self.transactions:
+            if t.week >= after and t.transaction_type == type_:
+                count += 1
+                total += t.dollars
+        return count, total
+
+    def reset_stats(self):
+        """Reset the recorded stats if they are enabled."""
+        if self.stats_enabled:
+            self._stats.clear()
+
+    def stats(self) -> Dict[str, dict]:
+        """Return the number of calls and cumulative wall time in seconds
+        of each phase since stats were enabled.
+
+        Times are inclusive, so the time of on_next_month also includes
+        the loan payments and deposits it makes.
+
+        Returns:
+            Dict[str, dict]: A mapping of phase names to dictionaries
+                with 'calls' and 'seconds' keys. This is empty if stats
+                are not enabled.
+
+        """
+        if not self.stats_enabled:
+            return {}
+        return {phase: {'calls': calls, 'seconds': seconds}
+                for phase, (calls, seconds) in self._stats.items()}
+
     def step(self, *, weeks: int):
         """Step the business by N weeks.
 
@@ -328,7 +756,20 @@ class Business:
             return False
 
     def to_dict(self):
-        return asdict(self)
+        """Return the fields of the business for saving.
+
+        Nested objects are left for JSONEncoder to serialize, except for
+        the transactions which are stored as a table of columns
+        (see Transaction.to_table()).
+
+        """
+        d = {f.name: getattr(self, f.name) for f in fields(self)}
+        transactions = self.transactions
+        if isinstance(transactions, Ledger):
+            d['transactions'] = transactions.to_table()
+        else:
+            d['transactions'] = Transaction.to_table(transactions)
+        return d
 
     def to_file(self, f, *, compressed=False):
         """Save the business data to a file-like object or filepath.
@@ -354,14 +795,26 @@ class Business:
             # File-like object
             f.write(text)
 
-    @staticmethod
-    def _from_dict_deserialize(d: dict):
+    @classmethod
+    def _from_dict_deserialize(cls, d: dict, *, columnar_ledger=None):
+        if columnar_ledger is None:
+            columnar_ledger = cls.COLUMNAR_LEDGER
         inventory = d.get('inventory')
         if inventory is not None:
             d['inventory'] = Inventory.from_list(inventory)
         transactions = d.get('transactions')
-        if transactions is not None:
-            d['transactions'] = [Transaction.from_dict(d) for d in transactions]
+        if isinstance(transactions, dict):
+            if columnar_ledger:
+                d['transactions'] = Ledger.from_table(transactions)
+            else:
+                d['transactions'] = Transaction.from_table(transactions)
+        elif transactions is not None:
+            # Saves before transaction tables were introduced
+            if columnar_ledger:
+                d['transactions'] = Ledger.from_list(transactions)
+            else:
+                d['transactions'] = [Transaction.from_dict(d)
+                                     for d in transactions]
         loans = d.get('loans')
         if loans is not None:
             d['loans'] = LoanMenu.from_list(loans)
@@ -374,13 +827,20 @@ class Business:
         return d
 
     @classmethod
-    def from_dict(cls, d: dict):
-        return cls(**cls._from_dict_deserialize(d))
+    def from_dict(cls, d: dict, *, columnar_ledger=None):
+        return cls(**cls._from_dict_deserialize(
+            d, columnar_ledger=columnar_ledger))
 
     @classmethod
-    def from_file(cls, f):
+    def from_file(cls, f, *, columnar_ledger=None):
         """Create a business from either a file or filepath.
 
+        Args:
+            f (Union[str, TextIO]): The filepath or file to read.
+            columnar_ledger (Optional[bool]): If True, the transactions
+                are loaded into a Ledger, and if False, into a list.
+                Defaults to COLUMNAR_LEDGER.
+
         Raises:
             binascii.Error
             json.JSONDecodeError
@@ -391,7 +851,8 @@ class Business:
         def decrypt(encoded):
             encoded = zlib.decompress(encoded)
             text = base64.b64decode(encoded).decode('utf-8')
-            return cls.from_dict(json.loads(text, cls=JSONDecoder))
+            return cls.from_dict(json.loads(text, cls=JSONDecoder),
+                                 columnar_ledger=columnar_ledger)
 
         if isinstance(f, str):
             try:
@@ -402,12 +863,14 @@ class Business:
                     text = file.read()
 
             try:
-                return cls.from_dict(json.loads(text, cls=JSONDecoder))
+                return cls.from_dict(json.loads(text, cls=JSONDecoder),
+                                     columnar_ledger=columnar_ledger)
             except Exception:
                 return decrypt(text)
 
         text = f.read()
         try:
-            return cls.from_dict(json.loads(text, cls=JSONDecoder))
+            return cls.from_dict(json.loads(text, cls=JSONDecoder),
+                                 columnar_ledger=columnar_ledger)
         except Exception:
             return decrypt(text)
@@ -0,0 +1,62 @@
+"""This provides a snapshot of the business metrics used by
+loan requirements."""
+import decimal
+import functools
+
+from .loanrequirementtype import LoanRequirementType
+
+__all__ = ['BusinessMetrics']
+
+
+class BusinessMetrics:
+    """The metrics of a business that loan requirements are checked
+    against.
+
+    Each metric is calculated from the business the first time it is
+    used and then kept, so checking many requirements against the same
+    metrics only scans the transactions once per metric. Create a new
+    instance after the business changes.
+
+    Usage:
+        >>> metrics = BusinessMetrics(business)
+        >>> all(req.check_metrics(metrics) for req in loan.requirements)
+
+    Args:
+        business (Business)
+
+    """
+
+    def __init__(self, business):
+        self.business = business
+
+    def __repr__(self):
+        return '{}(monthly_revenue={}, monthly_expenses={}, employees={})'.format(
+            self.__class__.__name__, self.monthly_revenue,
+            self.monthly_expenses, self.employee_count)
+
+    @functools.cached_property
+    def employee_count(self) -> int:
+        return self.business.employee_count
+
+    @functools.cached_property
+    def monthly_expenses(self) -> decimal.Decimal:
+        return self.business.get_monthly_expenses()
+
+    @functools.cached_property
+    def monthly_revenue(self) -> decimal.Decimal:
+        return self.business.get_monthly_revenue()
+
+    def get(self, loan_type: LoanRequirementType):
+        """Return the metric checked by a type of loan requirement.
+
+        Raises:
+            ValueError: The requirement type is unknown.
+
+        """
+        if loan_type == LoanRequirementType.MONTHLY_REVENUE:
+            return self.monthly_revenue
+        elif loan_type == LoanRequirementType.MONTHLY_EXPENSE:
+            return self.monthly_expenses
+        elif loan_type == LoanRequirementType.EMPLOYEES:
+            return self.employee_count
+        raise ValueError(f'Unknown requirement type: {loan_type!r}')
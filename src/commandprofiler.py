@@ -0,0 +1,88 @@
+"""This provides a profiler for capturing real sessions of the
+manager's command line interface."""
+import collections
+import cProfile
+import io
+import pstats
+import time
+from typing import Dict, List, Tuple
+
+__all__ = ['CommandProfiler']
+
+
+class CommandProfiler:
+    """Profiles a manager's interface and records the latency of each command.
+
+    Commands entered inside a sub-shell are recorded under the command
+    that opened it, such as "finances balance". The latency of a command
+    opening a sub-shell includes the entire time spent inside it.
+
+    Usage:
+        >>> profiler = CommandProfiler()
+        >>> manager.profiler = profiler
+        >>> profiler.runcall(manager.run)
+        >>> profiler.dump('session.pstats')
+        >>> print(profiler.summary())
+
+    """
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self.latencies: Dict[str, List[float]] = collections.defaultdict(list)
+        self._stack: List[Tuple[str, float]] = []
+
+    def dump(self, filepath: str):
+        """Write the collected profile to a file readable by pstats."""
+        self.profile.dump_stats(filepath)
+
+    def runcall(self, func, *args, **kwargs):
+        """Call a function while profiling it."""
+        return self.profile.runcall(func, *args, **kwargs)
+
+    def start_command(self, line: str):
+        """Start timing a command."""
+        name = line.strip().split(' ', 1)[0]
+        if self._stack:
+            name = f'{self._stack[-1][0]} {name}'
+        self._stack.append((name, time.perf_counter()))
+
+    def stop_command(self):
+        """Stop timing the last started command."""
+        if not self._stack:
+            return
+        name, start = self._stack.pop()
+        self.latencies[name].append(time.perf_counter() - start)
+
+    def summary(self, top: int = 10) -> str:
+        """Return a summary of the slowest commands and functions.
+
+        Args:
+            top (int): The number of commands and functions to include.
+
+        """
+        lines = [f'Slowest commands (top {top} by maximum latency):']
+        commands = sorted(self.latencies.items(), key=lambda x: -max(x[1]))
+        if commands:
+            name_longest = max(len(name) for name, _ in commands[:top])
+            lines.append('{:<{}} : {:>6} : {:>12} : {:>12}'.format(
+                'Command', name_longest, 'Calls', 'Mean (ms)', 'Max (ms)'))
+        for name, times in commands[:top]:
+            lines.append('{:<{}} : {:>6,} : {:>12,.3f} : {:>12,.3f}'.format(
+                name, name_longest, len(times),
+                sum(times) / len(times) * 1000, max(times) * 1000
+            ))
+        if not commands:
+            lines.append('No commands were recorded.')
+
+        stream = io.StringIO()
+        try:
+            stats = pstats.Stats(self.profile, stream=stream)
+        except TypeError:
+            # Nothing was profiled
+            return '\n'.join(lines)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+        lines.append('')
+        lines.append(f'Slowest functions (top {top} by cumulative time):')
+        lines.append(stream.getvalue().strip())
+
+        return '\n'.join(lines)
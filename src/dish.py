@@ -1,12 +1,14 @@
 import decimal
-from dataclasses import asdict, dataclass, field
+from dataclasses import asdict, dataclass, field, replace
 from typing import List
 
 from .item import Item
+from .utils import add_slots
 
 __all__ = ['Dish']
 
 
+@add_slots
 @dataclass
 class Dish:
     """A named dish consisting of items.
@@ -44,6 +46,12 @@ class Dish:
     def revenue(self):
         return self.price * self.sales
 
+    def copy(self, **kwargs):
+        kwargs.setdefault('items', [i.copy() for i in self.items])
+        kwargs.setdefault('expenses_items',
+                          [i.copy() for i in self.expenses_items])
+        return replace(self, **kwargs)
+
     def to_dict(self):
         return asdict(self)
 
@@ -1,5 +1,6 @@
-from typing import Dict, Iterable
+from typing import Dict, Iterable, Mapping, Optional
 
+from .billofmaterials import BillOfMaterials
 from .dish import Dish
 from .inventory import Inventory
 
@@ -7,33 +8,101 @@ __all__ = ['DishMenu']
 
 
 class DishMenu(Inventory):
-    """A subclass of Inventory designed for dishes."""
+    """A subclass of Inventory designed for dishes.
+
+    The menu keeps a bill of materials of its dishes' recipes, which is
+    updated as dishes are added, replaced or removed. If a dish's items
+    are changed in place, assign the dish again to update it:
+        >>> menu[dish.name] = dish
+
+    """
     _MISSING = object()
     _INV_TYPE = Dish
     _items: Dict[str, _INV_TYPE]
+    # Compiled on first use by bill_of_materials
+    _bom: Optional[BillOfMaterials] = None
 
     def __init__(self, items: Iterable[_INV_TYPE] = ()):
         super().__init__(items)
 
+    def __delitem__(self, item):
+        super().__delitem__(item)
+        self._bom_remove(getattr(item, 'name', item))
+
+    def __setitem__(self, key, item):
+        super().__setitem__(key, item)
+        if self._bom is not None:
+            self._bom.set_dish(self._items[getattr(key, 'name', key)])
+
     def add(self, item: _INV_TYPE):
-        return super().add(item)
+        new = item.name not in self
+        result = super().add(item)
+        if new and self._bom is not None:
+            self._bom.set_dish(self._items[item.name])
+        return result
+
+    @property
+    def bill_of_materials(self) -> BillOfMaterials:
+        """The ingredient × dish matrix of the menu's recipes."""
+        if self._bom is None:
+            self._bom = BillOfMaterials(self._items.values())
+        return self._bom
+
+    def _bom_remove(self, key: str):
+        if self._bom is not None:
+            self._bom.remove_dish(key)
 
     def discard(self, key: str):
-        return super().discard(key)
+        super().discard(key)
+        self._bom_remove(getattr(key, 'name', key))
 
     def find(self, key: str, default=None) -> _INV_TYPE:
         """Find an item that fuzzy matches the given name. Similar to get()."""
         return super().find(key, default)
 
+    def fork(self):
+        new = super().fork()
+        if self._bom is not None:
+            new._bom = self._bom.copy()
+        return new
+
     def get(self, key: str, default=None) -> _INV_TYPE:
         return super().get(key, default)
 
+    def requirements(self, sales: Optional[Mapping[str, int]] = None) \
+            -> Dict[str, int]:
+        """Return the total quantity of each ingredient needed to make
+        the dishes' sales.
+
+        Args:
+            sales (Optional[Mapping[str, int]]): The number of each dish
+                to make by name. Defaults to the `sales` of each dish.
+
+        Returns:
+            Dict[str, int]
+
+        """
+        if sales is None:
+            sales = self.sales()
+        return self.bill_of_materials.requirements(sales)
+
     def pop(self, key: str, default=_MISSING) -> _INV_TYPE:
         # Can't use super for this; _MISSING is unique to this class
+        self._own(key)
+        self._bom_remove(key)
         if default is self._MISSING:
             return self._items.pop(key)
         return self._items.pop(key, default)
 
+    def remove(self, key):
+        super().remove(key)
+        self._bom_remove(getattr(key, 'name', key))
+
+    def sales(self) -> Dict[str, int]:
+        """Return the sales of each dish by name."""
+        return {name: dish.sales for name, dish in self._items.items()
+                if dish.sales}
+
     @classmethod
     def cast_to_inv_type(cls, obj) -> _INV_TYPE:
         if isinstance(obj, cls._INV_TYPE):
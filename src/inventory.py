@@ -58,7 +58,12 @@ class Inventory(InventoryBase):
         del self._items[getattr(item, 'name', item)]
 
     def __getitem__(self, item):
-        return self._items[getattr(item, 'name', item)]
+        key = getattr(item, 'name', item)
+        self._own(key)
+        return self._items[key]
+
+    def __setitem__(self, key, item):
+        super().__setitem__(getattr(key, 'name', key), item)
 
     def add(self, item: Union[_INV_TYPE, Item]):
         if item.name not in self:
@@ -74,12 +79,16 @@ class Inventory(InventoryBase):
         return self.get(search, default) if search is not None else default
 
     def get(self, key, default=None) -> _INV_TYPE:
-        return self._items.get(getattr(key, 'name', key), default)
+        key = getattr(key, 'name', key)
+        self._own(key)
+        return self._items.get(key, default)
 
     def pop(self, key, default=_MISSING) -> _INV_TYPE:
+        key = getattr(key, 'name', key)
+        self._own(key)
         if default is self._MISSING:
-            return self._items.pop(getattr(key, 'name', key))
-        return self._items.pop(getattr(key, 'name', key), default)
+            return self._items.pop(key)
+        return self._items.pop(key, default)
 
     def remove(self, key):
         del self._items[getattr(key, 'name', key)]
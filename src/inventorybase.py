@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+import copy
 from typing import Dict
 
 __all__ = ['InventoryBase']
@@ -8,6 +9,9 @@ class InventoryBase(ABC):
     _MISSING = object()
     _INV_TYPE = object
     _items: Dict[str, _INV_TYPE]
+    # Keys whose values are shared with a fork and must be copied
+    # before they are handed out (see fork())
+    _shared = frozenset()
 
     def __bool__(self):
         return bool(self._items)
@@ -19,11 +23,19 @@ class InventoryBase(ABC):
         del self._items[item]
 
     def __getitem__(self, item):
+        self._own(item)
         return self._items[item]
 
     def __iter__(self):
+        if self._shared:
+            self._own_all()
         return iter(self._items.values())
 
+    def __setitem__(self, key, item):
+        self._items[key] = self.cast_to_inv_type(item)
+        if key in self._shared:
+            self._shared.discard(key)
+
     def __len__(self):
         return len(self._items)
 
@@ -52,6 +64,23 @@ class InventoryBase(ABC):
             f'but received {obj!r} of type {type(obj).__name__}'
         )
 
+    def _own(self, key):
+        """Replace a value shared with a fork by a private copy."""
+        if key in self._shared:
+            self._shared.discard(key)
+            item = self._items.get(key)
+            if item is not None:
+                self._items[key] = item.copy()
+
+    def _own_all(self):
+        """Replace every value shared with a fork by a private copy."""
+        items = self._items
+        for key in self._shared:
+            item = items.get(key)
+            if item is not None:
+                items[key] = item.copy()
+        self._shared = frozenset()
+
     def discard(self, key):
         """Remove an item from the inventory if it exists.
 
@@ -60,18 +89,45 @@ class InventoryBase(ABC):
         """
         self._items.pop(key, None)
 
+    def fork(self):
+        """Return a copy-on-write copy of the inventory.
+
+        The fork shares its values with this inventory and only copies
+        a value when it is first accessed by either side, so creating
+        a fork costs a dictionary copy regardless of how large
+        the values are.
+
+        """
+        new = copy.copy(self)
+        new._items = self._items.copy()
+        # Every current key is now shared by both sides
+        self._shared = set(self._items)
+        new._shared = set(self._items)
+        return new
+
     def get(self, key, default=None):
         """Return the value for key if key is in the dictionary, else default."""
+        self._own(key)
         return self._items.get(key, default)
 
+    def iter_readonly(self):
+        """Iterate over the values without copying the ones shared
+        with a fork (see fork()). The values must not be modified."""
+        return iter(self._items.values())
+
     def pop(self, key, default=_MISSING):
         """Remove and return an item from the inventory.
         If key is not found, default is returned if given, else KeyError is raised.
         """
+        self._own(key)
         if default is self._MISSING:
             return self._items.pop(key)
         return self._items.pop(key, default)
 
+    def positions(self) -> Dict[str, int]:
+        """Return the position of each item in the inventory by its key."""
+        return dict(zip(self._items, range(len(self._items))))
+
     def remove(self, key):
         """Remove an item from the inventory.
 
@@ -80,5 +136,35 @@ class InventoryBase(ABC):
         """
         del self._items[key]
 
+    def reorder(self, positions: Dict[str, int]):
+        """Move items to the given positions.
+
+        The items that are not moved keep their order around them.
+
+        Args:
+            positions (Dict[str, int]): The new position of each moved
+                item by its key. Positions past the end of the inventory
+                place the item at the end.
+
+        Raises:
+            KeyError: An item does not exist in the inventory.
+
+        """
+        items = self._items
+        for key in positions:
+            items[key]
+        others = iter([k for k in items if k not in positions])
+        moved = sorted(positions, key=positions.__getitem__)
+        keys = []
+        for key in moved:
+            while len(keys) < positions[key]:
+                other = next(others, None)
+                if other is None:
+                    break
+                keys.append(other)
+            keys.append(key)
+        keys.extend(others)
+        self._items = {k: items[k] for k in keys}
+
     def to_list(self):
         return [v for v in self._items.values()]
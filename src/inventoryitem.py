@@ -1,4 +1,3 @@
-import copy
 import decimal
 from typing import List, Union, Iterable, Dict
 
@@ -19,6 +18,9 @@ class InventoryItem(InventoryBase):
 
     This object's hash uses its name.
 
+    The quantity is cached until the item is added to or subtracted from,
+    so entries should not be changed directly.
+
     Args:
         name (str)
         unit (str)
@@ -27,6 +29,8 @@ class InventoryItem(InventoryBase):
     """
     _INV_TYPE = InventoryItemEntry
     _items: Dict[decimal.Decimal, InventoryItemEntry]
+    # The sum of the entries' quantities, computed on first use
+    _quantity = None
 
     def __init__(self, name: str, unit: str,
                  items: Iterable[Union[InventoryItemEntry, Item]] = None):
@@ -65,6 +69,10 @@ class InventoryItem(InventoryBase):
             n=self.name
         )
 
+    def __delitem__(self, item):
+        super().__delitem__(item)
+        self._quantity = None
+
     def __hash__(self):
         return hash((self.__class__, self.name))
 
@@ -103,9 +111,15 @@ class InventoryItem(InventoryBase):
             )
         return self
 
+    def __setitem__(self, key, item):
+        super().__setitem__(key, item)
+        self._quantity = None
+
     @property
     def quantity(self):
-        return sum(i.quantity for i in self)
+        if self._quantity is None:
+            self._quantity = sum(i.quantity for i in self)
+        return self._quantity
 
     @property
     def price(self):
@@ -140,6 +154,7 @@ class InventoryItem(InventoryBase):
                     f'to another in {self.unit!r} units')
             _add(InventoryItemEntry.from_item(other))
         elif isinstance(other, InventoryItemEntry):
+            self._quantity = None
             current = self.get(other.price)
             if current is not None:
                 # Add to current entry
@@ -150,7 +165,8 @@ class InventoryItem(InventoryBase):
             raise exc()
 
     def copy(self):
-        return copy.deepcopy(self)
+        return self.__class__(self.name, self.unit,
+                              [e.copy() for e in self._items.values()])
 
     def cost_of(self, n: int = None, *, lowest_first=True) \
             -> decimal.Decimal:
@@ -192,6 +208,18 @@ class InventoryItem(InventoryBase):
 
         return value
 
+    def discard(self, key):
+        super().discard(key)
+        self._quantity = None
+
+    def pop(self, key, default=InventoryBase._MISSING):
+        self._quantity = None
+        return super().pop(key, default)
+
+    def remove(self, key):
+        super().remove(key)
+        self._quantity = None
+
     def subtract(self, n: int = None, lowest_first=True) -> decimal.Decimal:
         """Subtract from the item's quantity.
 
@@ -230,6 +258,7 @@ class InventoryItem(InventoryBase):
             value += entry.price * consumed
             if entry.quantity <= 0:
                 del self._items[entry.price]
+        self._quantity = None
 
         return value
 
@@ -2,10 +2,12 @@ from dataclasses import dataclass, field, replace, asdict
 import decimal
 
 from .item import Item
+from .utils import add_slots
 
 __all__ = ['InventoryItemEntry']
 
 
+@add_slots
 @dataclass
 class InventoryItemEntry:
     """An entry in InventoryItem.
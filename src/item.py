@@ -1,11 +1,12 @@
 from dataclasses import asdict, dataclass, field, replace
 import decimal
 
-from .utils import plural, round_dollars
+from .utils import add_slots, plural, round_dollars
 
 __all__ = ['Item']
 
 
+@add_slots
 @dataclass
 class Item:
     """A general purpose item, consisting of a name, quantity, unit,
@@ -0,0 +1,251 @@
+"""This provides an undo/redo journal for changes made to a business.
+
+Rather than snapshotting the entire business, each journal entry records
+only what a command changed: the balance, employee count, the
+transactions appended to the ledger, and copies of the inventory items,
+dishes or loans that were touched along with their positions, so
+undoing a removal puts the item back where it was. Apart from one pass
+over each touched container to find those positions, undoing or redoing
+an entry is therefore proportional to the size of the change."""
+import collections
+import contextlib
+from typing import Deque, List, Optional
+
+__all__ = ['Journal', 'JournalEntry']
+
+
+class JournalEntry:
+    """A reversible change made to a business.
+
+    Args:
+        description (str): A short description of the change.
+        business (Business): The business being changed.
+
+    """
+
+    def __init__(self, description: str, business):
+        self.description = description
+        self.business = business
+
+        self._ledger_start = len(business.transactions)
+        self._transactions = []
+        self._balance = (business.balance, business.balance)
+        self._employee_count = (business.employee_count,
+                                business.employee_count)
+        # [container, key, before, after], where before and after are
+        # (item, position) snapshots or None if the item did not exist
+        self._touched = []
+        self._touched_keys = set()
+        # The positions of the items in each touched container before
+        # the change, by the container's id
+        self._positions = {}
+
+    def __bool__(self):
+        """Whether the entry changed anything."""
+        return bool(self._touched or self._transactions
+                    or self._balance[0] != self._balance[1]
+                    or self._employee_count[0] != self._employee_count[1])
+
+    def __str__(self):
+        return self.description
+
+    def _restore(self, state: int):
+        """Restore the touched items to their snapshots before (0)
+        or after (1) the change."""
+        for touched in self._touched:
+            if touched[2 + state] is None:
+                touched[0].discard(touched[1])
+
+        # Items that were put back into a container by their keys
+        inserted = {}
+        for touched in self._touched:
+            container, key, snapshot = touched[0], touched[1], touched[2 + state]
+            if snapshot is None:
+                continue
+            item, position = snapshot
+            if key not in container:
+                inserted.setdefault(id(container), (container, {}))[1][key] = position
+            container[key] = item.copy()
+
+        for container, positions in inserted.values():
+            # Inserted items are added to the end, which is only
+            # where they belong if they were the last items
+            start = len(container) - len(positions)
+            if list(positions.values()) != list(range(start, len(container))):
+                container.reorder(positions)
+
+    @staticmethod
+    def _snapshot(container, key, positions):
+        item = container.get(key)
+        if item is None:
+            return None
+        return item.copy(), positions.get(key, len(container))
+
+    def commit(self):
+        """Record the state of the business after the change."""
+        business = self.business
+        self._transactions = business.transactions[self._ledger_start:]
+        self._balance = (self._balance[0], business.balance)
+        self._employee_count = (self._employee_count[0],
+                                business.employee_count)
+        positions = {}
+        for touched in self._touched:
+            container, key = touched[0], touched[1]
+            p = positions.get(id(container))
+            if p is None:
+                p = positions[id(container)] = container.positions()
+            touched[3] = self._snapshot(container, key, p)
+
+    def redo(self):
+        """Reapply the change after it has been undone."""
+        business = self.business
+        self._restore(1)
+        business.own_transactions()
+        business.transactions.extend(self._transactions)
+        business.balance = self._balance[1]
+        business.employee_count = self._employee_count[1]
+
+    def touch(self, container, key: str):
+        """Record the current state of an item before it is changed.
+
+        This must be called before modifying, adding or removing an item
+        in an inventory, dish menu or loan menu. Touching the same item
+        more than once has no effect.
+
+        Args:
+            container (InventoryBase): The inventory holding the item.
+            key (str): The name of the item.
+
+        """
+        key = getattr(key, 'name', key)
+        ident = (id(container), key)
+        if ident in self._touched_keys:
+            return
+        self._touched_keys.add(ident)
+        positions = self._positions.get(id(container))
+        if positions is None:
+            positions = self._positions[id(container)] = container.positions()
+        self._touched.append(
+            [container, key, self._snapshot(container, key, positions), None])
+
+    def undo(self):
+        """Revert the business back to its state before the change."""
+        business = self.business
+        self._restore(0)
+        business.own_transactions()
+        del business.transactions[self._ledger_start:]
+        business.balance = self._balance[0]
+        business.employee_count = self._employee_count[0]
+
+
+class Journal:
+    """Keeps track of changes that can be undone and redone.
+
+    Changes are recorded using the `record()` context manager:
+        >>> with journal.record('Buy coffee', business) as entry:
+        ...     entry.touch(business.inventory, 'Coffee')
+        ...     business.buy_item(Item('Coffee', 1, 'cup', 3))
+        >>> journal.undo()
+
+    If an exception is raised inside the context, the changes made so far
+    are rolled back. Changes made to the business outside of the journal
+    (such as stepping time) invalidate the recorded entries, so
+    `clear()` should be called afterwards.
+
+    Args:
+        maxlen (int): The maximum number of entries that can be undone.
+
+    """
+
+    def __init__(self, maxlen: int = 100):
+        self.undo_stack: Deque[JournalEntry] = collections.deque(maxlen=maxlen)
+        self.redo_stack: List[JournalEntry] = []
+        self._recording: Optional[JournalEntry] = None
+        # Incremented whenever entries are recorded, undone, redone
+        # or forgotten, so results derived from the business can tell
+        # when they are out of date
+        self.version = 0
+
+    def clear(self):
+        """Forget every recorded entry."""
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.version += 1
+
+    @contextlib.contextmanager
+    def record(self, description: str, business):
+        """Record the changes made to a business within this context.
+
+        Nested calls are merged into the outermost entry.
+
+        Yields:
+            JournalEntry: The entry used to touch items before
+                they are changed. Calling `rollback()` on the journal
+                discards the entry and reverts its changes.
+
+        """
+        if self._recording is not None:
+            yield self._recording
+            return
+
+        entry = self._recording = JournalEntry(description, business)
+        try:
+            yield entry
+        except BaseException:
+            entry.undo()
+            raise
+        else:
+            if self._recording is None:
+                # Rolled back
+                return
+            entry.commit()
+            if entry:
+                self.undo_stack.append(entry)
+                self.redo_stack.clear()
+                self.version += 1
+        finally:
+            self._recording = None
+
+    def redo(self) -> Optional[JournalEntry]:
+        """Redo the last undone entry.
+
+        Returns:
+            JournalEntry
+            None: There was nothing to redo.
+
+        """
+        if not self.redo_stack:
+            return
+        entry = self.redo_stack.pop()
+        entry.redo()
+        self.undo_stack.append(entry)
+        self.version += 1
+        return entry
+
+    def rollback(self):
+        """Revert and discard the entry currently being recorded.
+
+        Raises:
+            RuntimeError: No entry is being recorded.
+
+        """
+        if self._recording is None:
+            raise RuntimeError('No journal entry is being recorded')
+        self._recording.undo()
+        self._recording = None
+
+    def undo(self) -> Optional[JournalEntry]:
+        """Undo the last recorded entry.
+
+        Returns:
+            JournalEntry
+            None: There was nothing to undo.
+
+        """
+        if not self.undo_stack:
+            return
+        entry = self.undo_stack.pop()
+        entry.undo()
+        self.redo_stack.append(entry)
+        self.version += 1
+        return entry
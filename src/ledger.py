@@ -0,0 +1,390 @@
+"""This provides a compact, column-oriented store for a business's
+transactions."""
+import array
+import bisect
+from collections.abc import MutableSequence
+import decimal
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .transaction import Transaction
+from .transactiontype import TransactionType
+from .utils import round_dollars
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+__all__ = ['Ledger']
+
+
+class Ledger(MutableSequence):
+    """A list of transactions stored as parallel arrays.
+
+    Each transaction takes a few dozen bytes instead of a Python object
+    with its own Decimal and title. Titles are interned in a table
+    so repeated titles like "Dish Sales" are only stored once.
+    Transaction objects are created when they are accessed, so changing
+    a transaction taken from the ledger does not change the ledger.
+
+    Dollars are stored as whole cents, so amounts are rounded to
+    the nearest cent like Business.add_transaction() does.
+
+    A business can switch to a ledger by setting its COLUMNAR_LEDGER
+    class variable, by loading it with `from_file(f, columnar_ledger=True)`,
+    or by converting its transactions directly:
+        >>> business.transactions = Ledger(business.transactions)
+
+    Full-history queries (select() and total()) run on the arrays
+    and are vectorized with NumPy if it is installed.
+
+    Args:
+        transactions (Iterable[Transaction])
+
+    """
+
+    def __init__(self, transactions: Iterable[Transaction] = ()):
+        self._weeks = array.array('l')
+        self._cents = array.array('q')
+        self._types = array.array('b')
+        self._title_ids = array.array('l')
+        # The title table is only ever appended to, so it can be shared
+        # between copies without ids changing meaning
+        self._titles: List[str] = []
+        self._title_lookup: Dict[str, int] = {}
+        # Whether the weeks are known to be non-decreasing
+        self._sorted = True
+        self.extend(transactions)
+
+    def __delitem__(self, index):
+        # Removing transactions cannot unsort the remaining ones
+        del self._weeks[index]
+        del self._cents[index]
+        del self._types[index]
+        del self._title_ids[index]
+
+    def __eq__(self, other):
+        if isinstance(other, Ledger):
+            return (self._weeks == other._weeks
+                    and self._cents == other._cents
+                    and self._types == other._types
+                    and [self._titles[i] for i in self._title_ids]
+                    == [other._titles[i] for i in other._title_ids])
+        elif isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            ledger = self._empty_copy()
+            ledger._weeks = self._weeks[index]
+            ledger._cents = self._cents[index]
+            ledger._types = self._types[index]
+            ledger._title_ids = self._title_ids[index]
+            ledger._sorted = self._sorted and (index.step or 1) > 0
+            return ledger
+
+        return Transaction(
+            self._titles[self._title_ids[index]],
+            self._dollars(self._cents[index]),
+            self._weeks[index],
+            self._transaction_type(self._types[index])
+        )
+
+    def __iter__(self):
+        titles = self._titles
+        dollars = self._dollars
+        transaction_type = self._transaction_type
+        for title_id, cents, week, type_ in zip(
+                self._title_ids, self._cents, self._weeks, self._types):
+            yield Transaction(titles[title_id], dollars(cents), week,
+                              transaction_type(type_))
+
+    def __len__(self):
+        return len(self._weeks)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({list(self)!r})'
+
+    def __setitem__(self, index, transaction):
+        if isinstance(index, slice):
+            ledger = self._empty_copy()
+            ledger.extend(transaction)
+            self._weeks[index] = ledger._weeks
+            self._cents[index] = ledger._cents
+            self._types[index] = ledger._types
+            self._title_ids[index] = ledger._title_ids
+        else:
+            week, cents, type_, title_id = self._columns(transaction)
+            self._weeks[index] = week
+            self._cents[index] = cents
+            self._types[index] = type_
+            self._title_ids[index] = title_id
+        self._sorted = None
+
+    def append(self, transaction: Transaction):
+        week, cents, type_, title_id = self._columns(transaction)
+        weeks = self._weeks
+        if self._sorted and weeks and week < weeks[-1]:
+            self._sorted = False
+        weeks.append(week)
+        self._cents.append(cents)
+        self._types.append(type_)
+        self._title_ids.append(title_id)
+
+    def clear(self):
+        del self[:]
+        self._sorted = True
+
+    def _columns(self, t: Transaction) -> Tuple[int, int, int, int]:
+        """Return the values stored in each array for a transaction."""
+        return (
+            t.week,
+            int(round_dollars(t.dollars) * 100),
+            0 if t.transaction_type is None else int(t.transaction_type),
+            self._intern(t.title)
+        )
+
+    def copy(self):
+        """Return a shallow copy of the ledger."""
+        return self[:]
+
+    @staticmethod
+    def _dollars(cents: int) -> decimal.Decimal:
+        return decimal.Decimal(cents).scaleb(-2)
+
+    def _empty_copy(self):
+        """Return an empty ledger sharing this ledger's title table."""
+        ledger = self.__class__()
+        ledger._titles = self._titles
+        ledger._title_lookup = self._title_lookup
+        return ledger
+
+    def extend(self, transactions: Iterable[Transaction]):
+        if isinstance(transactions, Ledger):
+            if transactions._titles is self._titles:
+                title_ids = transactions._title_ids
+            else:
+                titles = transactions._titles
+                title_ids = array.array('l', [
+                    self._intern(titles[i]) for i in transactions._title_ids])
+            weeks = self._weeks
+            if transactions._weeks:
+                self._sorted = (self._sorted and transactions._is_sorted()
+                                and (not weeks
+                                     or weeks[-1] <= transactions._weeks[0]))
+            weeks.extend(transactions._weeks)
+            self._cents.extend(transactions._cents)
+            self._types.extend(transactions._types)
+            self._title_ids.extend(title_ids)
+            return
+
+        for t in transactions:
+            self.append(t)
+
+    def insert(self, index: int, transaction: Transaction):
+        week, cents, type_, title_id = self._columns(transaction)
+        self._weeks.insert(index, week)
+        self._cents.insert(index, cents)
+        self._types.insert(index, type_)
+        self._title_ids.insert(index, title_id)
+        self._sorted = None
+
+    def _intern(self, title: str) -> int:
+        """Return the id of a title, adding it to the title table
+        if needed."""
+        title_id = self._title_lookup.get(title)
+        if title_id is None:
+            title_id = self._title_lookup[title] = len(self._titles)
+            self._titles.append(title)
+        return title_id
+
+    def _is_sorted(self) -> bool:
+        """Check if the transactions are in chronological order."""
+        if self._sorted is None:
+            weeks = self._weeks
+            self._sorted = all(weeks[i] <= weeks[i + 1]
+                               for i in range(len(weeks) - 1))
+        return self._sorted
+
+    def select(self, *, after: int = None, type_=None) -> Sequence[int]:
+        """Return the indices of matching transactions sorted by week.
+
+        Transactions in the same week keep their order in the ledger.
+
+        Args:
+            after (Optional[int]): Only include transactions past
+                a given week (inclusive).
+            type_ (Optional[TransactionType]): Only include transactions
+                of a given type.
+
+        Returns:
+            Sequence[int]
+
+        """
+        if numpy is not None and self and (
+                type_ is not None or not self._is_sorted()):
+            return self._select_numpy(after, type_)
+
+        weeks = self._weeks
+        if self._is_sorted():
+            start = 0 if after is None else bisect.bisect_left(weeks, after)
+            indices = range(start, len(weeks))
+        else:
+            indices = sorted(range(len(weeks)), key=weeks.__getitem__)
+            if after is not None:
+                indices = [i for i in indices if weeks[i] >= after]
+
+        if type_ is not None:
+            types = self._types
+            code = int(type_)
+            return [i for i in indices if types[i] == code]
+        return indices
+
+    def _mask_numpy(self, after, type_, start=0):
+        """Return a boolean mask of matching transactions from an index,
+        or None if every transaction matches."""
+        mask = None
+        if after is not None:
+            weeks = numpy.frombuffer(self._weeks, f'i{self._weeks.itemsize}')
+            mask = weeks[start:] >= after
+        if type_ is not None:
+            types = numpy.frombuffer(self._types, 'i1')
+            matches = types[start:] == int(type_)
+            mask = matches if mask is None else mask & matches
+        return mask
+
+    def _select_numpy(self, after, type_) -> List[int]:
+        n = len(self)
+        if self._is_sorted():
+            order = numpy.arange(n)
+        else:
+            weeks = numpy.frombuffer(self._weeks, f'i{self._weeks.itemsize}')
+            order = numpy.argsort(weeks, kind='stable')
+            del weeks
+        mask = self._mask_numpy(after, type_)
+        if mask is not None:
+            order = order[mask[order]]
+        return order.tolist()
+
+    def to_list(self) -> List[dict]:
+        """Return the transactions in the same form as Transaction.to_dict()
+        without creating Transaction objects."""
+        titles = self._titles
+        dollars = self._dollars
+        transaction_type = self._transaction_type
+        return [
+            {'title': titles[title_id], 'dollars': dollars(cents),
+             'week': week, 'transaction_type': transaction_type(type_)}
+            for title_id, cents, week, type_ in zip(
+                self._title_ids, self._cents, self._weeks, self._types)
+        ]
+
+    def to_table(self) -> dict:
+        """Return the transactions in the same form as
+        Transaction.to_table() without creating Transaction objects."""
+        # The title table may be shared with other ledgers, so only
+        # the titles used by this ledger are included
+        titles = []
+        remap = {}
+        title_column = []
+        for title_id in self._title_ids:
+            new_id = remap.get(title_id)
+            if new_id is None:
+                new_id = remap[title_id] = len(titles)
+                titles.append(self._titles[title_id])
+            title_column.append(new_id)
+
+        dollars = self._dollars
+        transaction_type = self._transaction_type
+        return {
+            'titles': titles,
+            'title': title_column,
+            'dollars': [dollars(c) for c in self._cents],
+            'week': self._weeks.tolist(),
+            'transaction_type': [transaction_type(t) for t in self._types]
+        }
+
+    @classmethod
+    def from_list(cls, transactions: List[dict]):
+        """Create a ledger from a list of transaction dictionaries
+        without creating Transaction objects."""
+        ledger = cls()
+        weeks = ledger._weeks
+        cents = ledger._cents
+        types = ledger._types
+        title_ids = ledger._title_ids
+        intern = ledger._intern
+        for d in transactions:
+            type_ = d.get('transaction_type')
+            weeks.append(d['week'])
+            cents.append(int(round_dollars(d['dollars']) * 100))
+            types.append(0 if type_ is None else int(type_))
+            title_ids.append(intern(d['title']))
+        ledger._sorted = None
+        return ledger
+
+    @classmethod
+    def from_table(cls, table: dict):
+        """Create a ledger from a table made by to_table() or
+        Transaction.to_table()."""
+        ledger = cls()
+        for title in table['titles']:
+            ledger._intern(title)
+        # Duplicate titles in the table map to their first id
+        ids = [ledger._title_lookup[title] for title in table['titles']]
+        ledger._title_ids = array.array('l', [ids[i] for i in table['title']])
+        ledger._weeks = array.array('l', table['week'])
+        ledger._cents = array.array(
+            'q', [int(round_dollars(d) * 100) for d in table['dollars']])
+        ledger._types = array.array(
+            'b', [0 if t is None else int(t)
+                  for t in table['transaction_type']])
+        ledger._sorted = None
+        return ledger
+
+    def total(self, *, after: int = None, type_=None) \
+            -> Tuple[int, decimal.Decimal]:
+        """Sum the dollars of matching transactions.
+
+        Args:
+            after (Optional[int]): Only include transactions past
+                a given week (inclusive).
+            type_ (Optional[TransactionType]): Only include transactions
+                of a given type.
+
+        Returns:
+            Tuple[int, decimal.Decimal]: The number of matching transactions
+                and their total in dollars.
+
+        """
+        weeks, cents, types = self._weeks, self._cents, self._types
+        start = 0
+        if after is not None and self._is_sorted():
+            start = bisect.bisect_left(weeks, after)
+            after = None
+
+        if numpy is not None and start < len(weeks):
+            cents = numpy.frombuffer(cents, 'i8')[start:]
+            mask = self._mask_numpy(after, type_, start)
+            if mask is not None:
+                cents = cents[mask]
+            return len(cents), self._dollars(int(cents.sum()))
+
+        code = None if type_ is None else int(type_)
+
+        count = total = 0
+        for i in range(start, len(weeks)):
+            if after is not None and weeks[i] < after:
+                continue
+            elif code is not None and types[i] != code:
+                continue
+            count += 1
+            total += cents[i]
+        return count, self._dollars(total)
+
+    @staticmethod
+    def _transaction_type(code: int) -> Optional[TransactionType]:
+        return TransactionType(code) if code else None
@@ -1,11 +1,12 @@
 from dataclasses import asdict, dataclass, field, replace
 import decimal
-from typing import List, Optional
+from typing import ClassVar, Dict, FrozenSet, Iterable, List, Optional, Tuple
 
-from . import utils
+from .businessmetrics import BusinessMetrics
 from .loaninteresttype import LoanInterestType
 from .loanpaybacktype import LoanPaybackType
 from .loanrequirement import LoanRequirement
+from .loanschedule import LoanSchedule
 
 __all__ = ['Loan']
 
@@ -20,6 +21,9 @@ class Loan:
     The term and payback_type can be set to None, in which case the user
     interface should allow those attributes to be manually provided.
 
+    The payments are calculated once and kept in `schedule` until one
+    of the loan's terms changes.
+
     """
     name: str
     term: Optional[int] = None  # years
@@ -30,26 +34,32 @@ class Loan:
     payback_type: LoanPaybackType = None
     remaining_weeks: int = field(default=None, compare=False)
 
+    # The attributes the schedule is calculated from
+    _SCHEDULE_FIELDS: ClassVar[FrozenSet[str]] = frozenset({
+        'term', 'amount', 'rate', 'interest_type', 'payback_type'})
+    # Calculated on first use by the schedule property
+    _schedule = None
+
     def __post_init__(self):
         if self.remaining_weeks is None:
             self.reset_remaining_weeks()
 
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in self._SCHEDULE_FIELDS:
+            super().__setattr__('_schedule', None)
+
     def __str__(self):
         return self.name
 
     @property
     def balance(self) -> decimal.Decimal:
         """Return the sum of the amount and interest due."""
-        return self.amount + self.interest_due
+        return self.schedule.balance
 
     @property
     def interest_due(self) -> decimal.Decimal:
-        return self.calculate_interest(
-            self.amount,
-            self.rate,
-            self.interest_type,
-            self.term
-        )
+        return self.schedule.interest
 
     @property
     def is_subsidy(self):
@@ -59,19 +69,26 @@ class Loan:
     @property
     def normal_payment(self) -> decimal.Decimal:
         """The normal amount to be given per payment."""
-        if self.is_subsidy:
-            return decimal.Decimal()
-        num_payments = self.term * 48 // self.payback_type
-        return utils.round_dollars(self.balance / num_payments)
+        return self.schedule.normal_payment
 
     @property
     def final_payment(self) -> decimal.Decimal:
         """The amount to be given on the final payment
         (lower or equal to the normal payment)."""
-        if self.is_subsidy:
-            return decimal.Decimal()
-        payment = self.balance % self.normal_payment
-        return payment if payment != 0 else self.normal_payment
+        return self.schedule.final_payment
+
+    @property
+    def schedule(self) -> LoanSchedule:
+        """The loan's payment schedule.
+
+        Raises:
+            TypeError: The term is not set.
+
+        """
+        schedule = self._schedule
+        if schedule is None:
+            schedule = self._schedule = LoanSchedule.from_loan(self)
+        return schedule
 
     @staticmethod
     def calculate_interest(principal: decimal.Decimal,
@@ -123,9 +140,7 @@ class Loan:
             decimal.Decimal
 
         """
-        if self.remaining_payments < 2 - bool(after_step):
-            return self.final_payment
-        return self.normal_payment
+        return self.schedule.payment(self.remaining_payments + bool(after_step))
 
     @property
     def remaining_payments(self) -> decimal.Decimal:
@@ -152,14 +167,66 @@ class Loan:
             bool
 
         """
-        return all(req.check(business) for req in self.requirements)
+        return not self.unmet_requirements(BusinessMetrics(business))
 
     def copy(self, **kwargs):
         return replace(self, **kwargs)
 
+    def schedule_options(self, terms: Iterable[int],
+                         payback_types: Iterable[LoanPaybackType]) \
+            -> Dict[Tuple[int, LoanPaybackType], LoanSchedule]:
+        """Return the schedule of this loan for every combination
+        of term and payback type.
+
+        If the loan's term or payback type is set, only that value
+        is used. The interest is calculated once for each term and
+        shared by the payback types.
+
+        Args:
+            terms (Iterable[int]): The terms in years.
+            payback_types (Iterable[LoanPaybackType])
+
+        Returns:
+            Dict[Tuple[int, LoanPaybackType], LoanSchedule]:
+                The schedules by term and payback type, which is empty
+                for subsidies.
+
+        """
+        if self.is_subsidy:
+            return {}
+        if self.term is not None:
+            terms = (self.term,)
+        if self.payback_type is not None:
+            payback_types = (self.payback_type,)
+        payback_types = tuple(payback_types)
+
+        options = {}
+        for term in terms:
+            interest = self.calculate_interest(
+                self.amount, self.rate, self.interest_type, term)
+            for payback_type in payback_types:
+                options[term, payback_type] = LoanSchedule.calculate(
+                    self.amount, interest, term, payback_type)
+        return options
+
     def to_dict(self):
         return asdict(self)
 
+    def unmet_requirements(self, metrics: BusinessMetrics) \
+            -> List[LoanRequirement]:
+        """Return the requirements a business does not meet.
+
+        Args:
+            metrics (BusinessMetrics): The business's metrics.
+
+        Returns:
+            List[LoanRequirement]: The unmet requirements, which is empty
+                if the business qualifies for this loan.
+
+        """
+        return [req for req in self.requirements
+                if not req.check_metrics(metrics)]
+
     @staticmethod
     def _from_dict_deserialize(d: dict):
         requirements = d.get('requirements')
@@ -1,17 +1,28 @@
 import decimal
 import random
-from typing import Dict, Iterable
+from typing import Container, Dict, Iterable, List, Optional
 
+from . import utils
+from .businessmetrics import BusinessMetrics
 from .loaninteresttype import LoanInterestType
 from .loanrequirementtype import LoanRequirementType
 from .inventory import Inventory
 from .loan import Loan
+from .loanrequirement import LoanRequirement
+from .loanrequirementindex import LoanRequirementIndex
 
 __all__ = ['LoanMenu']
 
 
 class LoanMenu(Inventory):
-    """A subclass of Inventory designed for loans."""
+    """A subclass of Inventory designed for loans.
+
+    The menu keeps an index of its loans' requirements, which is updated
+    as loans are added, replaced or removed. If a loan's requirements
+    are changed in place, assign the loan again to update it:
+        >>> menu[loan.name] = loan
+
+    """
     BANKS = ['RBC', 'TD', 'Scotiabank', 'BMO', 'CIBC']
     LOAN_NAMES = {
         'startup': ('Start Up', 'Entrepreneurship', 'Foundational'),
@@ -23,29 +34,186 @@ class LoanMenu(Inventory):
     _MISSING = object()
     _INV_TYPE = Loan
     _items: Dict[str, Loan]
+    # Built on first use by requirement_index
+    _index: Optional[LoanRequirementIndex] = None
 
     def __init__(self, items: Iterable[_INV_TYPE] = ()):
         super().__init__(items)
 
+    def __delitem__(self, item):
+        super().__delitem__(item)
+        self._index_remove(getattr(item, 'name', item))
+
+    def __setitem__(self, key, item):
+        super().__setitem__(key, item)
+        if self._index is not None:
+            self._index.add(self._items[getattr(key, 'name', key)])
+
     def add(self, item: _INV_TYPE):
-        return super().add(item)
+        new = item.name not in self
+        result = super().add(item)
+        if new and self._index is not None:
+            self._index.add(self._items[item.name])
+        return result
 
     def discard(self, key: str):
-        return super().discard(key)
+        super().discard(key)
+        self._index_remove(getattr(key, 'name', key))
+
+    def evaluate(self, business) -> Dict[str, List[LoanRequirement]]:
+        """Check which loans a business qualifies for.
+
+        The business's metrics are calculated once and the failed
+        requirements are looked up in the requirement index.
+
+        Args:
+            business (Business)
+
+        Returns:
+            Dict[str, List[LoanRequirement]]: The requirements
+                the business does not meet for each loan by name.
+                A loan with no unmet requirements is available.
+
+        """
+        unmet = self.requirement_index.unmet(BusinessMetrics(business))
+        return {name: unmet.get(name, []) for name in self._items}
 
     def find(self, key: str, default=None) -> _INV_TYPE:
         """Find an item that fuzzy matches the given name. Similar to get()."""
         return super().find(key, default)
 
+    def fork(self):
+        new = super().fork()
+        if self._index is not None:
+            new._index = self._index.copy()
+        return new
+
     def get(self, key: str, default=None) -> _INV_TYPE:
         return super().get(key, default)
 
+    def _index_remove(self, key: str):
+        if self._index is not None:
+            self._index.remove(key)
+
     def pop(self, key: str, default=_MISSING) -> _INV_TYPE:
         # Can't use super for this; _MISSING is unique to this class
+        self._own(key)
+        self._index_remove(key)
         if default is self._MISSING:
             return self._items.pop(key)
         return self._items.pop(key, default)
 
+    def project_cash_flow(self, weeks: int, *, current_week: int) \
+            -> List[decimal.Decimal]:
+        """Project the loan payments due in each of the next weeks.
+
+        This follows Business.step(): each week every loan counts down
+        a week, and loans are paid in the weeks that are a multiple of
+        their payback type until their final payment. Payments are
+        assumed to succeed, so no loan is prolonged.
+
+        Loans with the same payback type are paid in the same weeks,
+        so their payments are summed with a difference array in one
+        pass over the loans and one pass over the weeks.
+
+        Args:
+            weeks (int): The number of weeks to project.
+            current_week (int): The business's total weeks. The first
+                projected week is the one after it.
+
+        Returns:
+            List[decimal.Decimal]: The total payment due in each week.
+
+        """
+        zero = decimal.Decimal()
+        flow = [zero] * weeks
+        # The change in the payment at each paying week of each type
+        deltas: Dict[int, List[decimal.Decimal]] = {}
+        for loan in self._items.values():
+            payback_type = loan.payback_type
+            if payback_type is None or loan.is_subsidy:
+                continue
+            # The first week this type is paid in, counting from 1
+            first = payback_type - current_week % payback_type
+            if first > weeks or loan.remaining_weeks < first:
+                continue
+            count = (weeks - first) // payback_type + 1
+            # The index of the final payment, which is the last paying
+            # week with remaining_weeks >= 0
+            last = (loan.remaining_weeks - first) // payback_type
+
+            delta = deltas.get(payback_type)
+            if delta is None:
+                delta = deltas[payback_type] = [zero] * (count + 1)
+            schedule = loan.schedule
+            # Payments are rounded when they are withdrawn
+            normal = utils.round_dollars(schedule.normal_payment)
+            delta[0] += normal
+            if last < count:
+                final = utils.round_dollars(schedule.final_payment)
+                delta[last] += final - normal
+                delta[last + 1] -= final
+            else:
+                delta[count] -= normal
+
+        for payback_type, delta in deltas.items():
+            first = payback_type - current_week % payback_type
+            payment = zero
+            for week, change in zip(range(first - 1, weeks, payback_type),
+                                    delta):
+                payment += change
+                flow[week] += payment
+        return flow
+
+    def qualifying(self, business) -> List[Loan]:
+        """Return the loans a business qualifies for."""
+        names = self.requirement_index.qualifying(BusinessMetrics(business))
+        return [self[name] for name in names]
+
+    def refresh(self, fraction: float, rng: random.Random = random,
+                taken: Container[str] = ()) -> List[Loan]:
+        """Replace a fraction of the loans with newly generated offers.
+
+        The expired loans are removed and the new ones are added to
+        the end of the menu, so only the changed loans are updated in
+        the requirement index.
+
+        Args:
+            fraction (float): The fraction of loans to replace.
+            rng (random.Random): The random number generator to use.
+                Defaults to the random module.
+            taken (Container[str]): Other names the new loans
+                cannot use, such as the loans the business already has.
+                The names left on the menu are never reused.
+
+        Returns:
+            List[Loan]: The loans that were added.
+
+        """
+        count = min(round(len(self) * fraction), len(self))
+        if count <= 0:
+            return []
+
+        for name in rng.sample(list(self._items), count):
+            self.remove(name)
+        taken = set(taken)
+        taken.update(self._items)
+        added = list(self.from_random(count, rng, taken=taken))
+        for loan in added:
+            self.add(loan)
+        return added
+
+    def remove(self, key):
+        super().remove(key)
+        self._index_remove(getattr(key, 'name', key))
+
+    @property
+    def requirement_index(self) -> LoanRequirementIndex:
+        """The index of the loans' requirements."""
+        if self._index is None:
+            self._index = LoanRequirementIndex(self._items.values())
+        return self._index
+
     @classmethod
     def cast_to_inv_type(cls, obj) -> _INV_TYPE:
         if isinstance(obj, cls._INV_TYPE):
@@ -56,8 +224,19 @@ class LoanMenu(Inventory):
         )
 
     @classmethod
-    def from_random(cls, length: int):
-        """Create a LoanMenu with randomly generated loans."""
+    def from_random(cls, length: int, rng: random.Random = random,
+                    taken: Container[str] = ()):
+        """Create a LoanMenu with randomly generated loans.
+
+        Args:
+            length (int): The number of loans to generate.
+            rng (random.Random): The random number generator to use.
+                Defaults to the random module.
+            taken (Container[str]): Names that cannot be used, such as
+                the loans already on another menu. Repeated names
+                are numbered.
+
+        """
         def can_use_bound(bound: str, type_, rank):
             if bound == 'lower':
                 return not any(type_ == t and rank in rank_req
@@ -68,6 +247,7 @@ class LoanMenu(Inventory):
         bank_list = cls.BANKS.copy()
         bank_ranks = {bank: [] for bank in bank_list}
         loan_names = cls.LOAN_NAMES.copy()
+        used_names: Dict[str, int] = {}
 
         no_lower_bound = ((LoanRequirementType.MONTHLY_EXPENSE, ('startup',)),
                           (LoanRequirementType.MONTHLY_REVENUE, ('startup',)))
@@ -75,23 +255,35 @@ class LoanMenu(Inventory):
 
         loans = []
         while length:
-            random.shuffle(bank_list)
+            rng.shuffle(bank_list)
             for bank in bank_list:
                 # Pick between subsidy and loan (user decides term)
-                kwargs = {'term': random.choice((0, None))}
+                kwargs = {'term': rng.choice((0, None))}
                 loan_type = 'Loan' if kwargs['term'] is None else 'Subsidy'
 
                 # Pick rank and name that hasn't been used by the bank before
-                rank, names = random.choice([
+                if len(bank_ranks[bank]) == len(loan_names):
+                    # Every rank was used, so start another round of offers
+                    bank_ranks[bank].clear()
+                rank, names = rng.choice([
                     item for item in loan_names.items()
                     if item[0] not in bank_ranks[bank]
                 ])
                 bank_ranks[bank].append(rank)
-                n = random.choice(names)
-                if random.random() < 0.3:
+                n = rng.choice(names)
+                if rng.random() < 0.3:
                     # Surround with quotes
                     n = f'"{n}"'
-                kwargs['name'] = f'{bank} {n} {loan_type}'
+                base = f'{bank} {n} {loan_type}'
+                # Number repeated names to keep them unique
+                series = used_names.get(base, 0)
+                while True:
+                    series += 1
+                    name = base if series == 1 else f'{base} #{series}'
+                    if name not in taken:
+                        break
+                used_names[base] = series
+                kwargs['name'] = name
 
                 amount = (2, 20)
                 rate = (10, 39)
@@ -105,16 +297,16 @@ class LoanMenu(Inventory):
                     amount = (4, 14)
                     rate = (10, 30)
 
-                kwargs['amount'] = decimal.Decimal(random.randint(*amount) * 5000)
+                kwargs['amount'] = decimal.Decimal(rng.randint(*amount) * 5000)
                 if kwargs['term'] is None:
-                    kwargs['rate'] = decimal.Decimal(random.randint(*rate)) / 1000
+                    kwargs['rate'] = decimal.Decimal(rng.randint(*rate)) / 1000
                     # Use annual compound interest
                     kwargs['interest_type'] = LoanInterestType.COMPOUND_ANNUALLY
                     # User can decide how frequently to pay
 
                 # Create random requirements
                 requirements = []
-                req_total = random.randint(1, len(LoanRequirementType))
+                req_total = rng.randint(1, len(LoanRequirementType))
                 if rank == 'financial need':
                     # Always check revenue
                     req_types = [LoanRequirementType.MONTHLY_REVENUE]
@@ -124,10 +316,10 @@ class LoanMenu(Inventory):
                                           if t != LoanRequirementType.EMPLOYEES]
                     number = len(req_types_economic)
                     if rank != 'financial need':
-                        number = random.randint(1, min(2, len(req_types_economic)))
-                    req_types = random.sample(req_types_economic, number)
+                        number = rng.randint(1, min(2, len(req_types_economic)))
+                    req_types = rng.sample(req_types_economic, number)
                 # Always have employee requirement for small business rank
-                if rank == 'small business' or random.randint(0, 1) and not rank == 'startup':
+                if rank == 'small business' or rng.randint(0, 1) and not rank == 'startup':
                     req_types.append(LoanRequirementType.EMPLOYEES)
 
                 for type_ in req_types:
@@ -145,27 +337,27 @@ class LoanMenu(Inventory):
                     else:
                         minimum, maximum = 2, 8
 
-                    if can_use_bound('lower', type_, rank) and random.randint(0, 1):
+                    if can_use_bound('lower', type_, rank) and rng.randint(0, 1):
                         # Add a lower bound
-                        lower = random.randint(minimum, maximum)
+                        lower = rng.randint(minimum, maximum)
                     if (lower is None or can_use_bound('upper', type_, rank)
-                            and random.randint(0, 1)):
+                            and rng.randint(0, 1)):
                         # Add an upper bound
                         if lower is not None:
                             if maximum - lower >= 10:
-                                upper = random.randint(lower + 1, maximum)
+                                upper = rng.randint(lower + 1, maximum)
                         else:
-                            upper = random.randint(
+                            upper = rng.randint(
                                 minimum + maximum // 2, maximum)
 
                     if type_ != LoanRequirementType.EMPLOYEES:
                         if lower is not None:
                             lower *= 1000
-                            if random.random() < 0.2:
+                            if rng.random() < 0.2:
                                 lower -= 500
                         if upper is not None:
                             upper *= 1000
-                            if random.random() < 0.2:
+                            if rng.random() < 0.2:
                                 upper -= 500
 
                     if lower is not None:
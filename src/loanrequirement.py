@@ -3,11 +3,13 @@ from dataclasses import dataclass, asdict
 from typing import Tuple, Optional
 
 from . import utils
+from .businessmetrics import BusinessMetrics
 from .loanrequirementtype import LoanRequirementType
 
 __all__ = ['LoanRequirement']
 
 
+@utils.add_slots
 @dataclass(frozen=True)
 class LoanRequirement:
     loan_type: LoanRequirementType
@@ -54,17 +56,25 @@ class LoanRequirement:
             bool
 
         """
-        def check_bounds(num):
-            return ((self.value[0] is None or num >= self.value[0])
-                    and (self.value[1] is None or num <= self.value[1]))
+        return self.check_metrics(BusinessMetrics(business))
 
-        if self.loan_type == LoanRequirementType.MONTHLY_REVENUE:
-            return check_bounds(business.get_monthly_revenue())
-        elif self.loan_type == LoanRequirementType.MONTHLY_EXPENSE:
-            return check_bounds(business.get_monthly_expenses())
-        elif self.loan_type == LoanRequirementType.EMPLOYEES:
-            return check_bounds(business.employee_count)
-        return False
+    def check_metrics(self, metrics: BusinessMetrics) -> bool:
+        """Check if a business meets this requirement using a snapshot
+        of its metrics.
+
+        Args:
+            metrics (BusinessMetrics)
+
+        Returns:
+            bool
+
+        """
+        try:
+            num = metrics.get(self.loan_type)
+        except ValueError:
+            return False
+        return ((self.value[0] is None or num >= self.value[0])
+                and (self.value[1] is None or num <= self.value[1]))
 
     def to_dict(self):
         return asdict(self)
@@ -0,0 +1,163 @@
+"""This provides an index of loan requirements for finding the loans
+a business qualifies for."""
+import bisect
+from typing import Dict, Iterable, List, Tuple
+
+from .businessmetrics import BusinessMetrics
+from .loan import Loan
+from .loanrequirement import LoanRequirement
+from .loanrequirementtype import LoanRequirementType
+
+__all__ = ['LoanRequirementIndex']
+
+# A bound of a requirement, which is its value, the name of its loan,
+# and its position in the loan's requirements
+_Entry = Tuple[object, str, int]
+# The sorted bounds of one type of requirement and their entries
+# in the same order
+_Bounds = Tuple[list, List[_Entry]]
+
+
+class LoanRequirementIndex:
+    """An interval index over the bounds of loan requirements.
+
+    The lower and upper bounds of each type of requirement are kept in
+    sorted lists, so the requirements a business fails are found with
+    a binary search on each of its metrics instead of checking every
+    requirement of every loan. A requirement fails if its lower bound
+    is above the metric or its upper bound is below it.
+
+    Usage:
+        >>> index = LoanRequirementIndex(loan_menu)
+        >>> index.qualifying(BusinessMetrics(business))
+        ['BMO "Start Up" Loan', 'RBC Foundational Loan']
+
+    Args:
+        loans (Iterable[Loan])
+
+    """
+
+    def __init__(self, loans: Iterable[Loan] = ()):
+        self._lower: Dict[LoanRequirementType, _Bounds] = {}
+        self._upper: Dict[LoanRequirementType, _Bounds] = {}
+        # The requirements of each loan by name
+        self._requirements: Dict[str, Tuple[LoanRequirement, ...]] = {}
+        # The number of requirements of each type, including ones
+        # without bounds
+        self._types: Dict[LoanRequirementType, int] = {}
+        for loan in loans:
+            self.add(loan)
+
+    def __contains__(self, name: str):
+        return name in self._requirements
+
+    def __len__(self):
+        return len(self._requirements)
+
+    def __repr__(self):
+        return '{}({:,} loans)'.format(
+            self.__class__.__name__, len(self._requirements))
+
+    def add(self, loan: Loan):
+        """Add a loan to the index or replace an existing loan's
+        requirements."""
+        self.remove(loan.name)
+        requirements = tuple(loan.requirements)
+        self._requirements[loan.name] = requirements
+        types = self._types
+        for i, req in enumerate(requirements):
+            types[req.loan_type] = types.get(req.loan_type, 0) + 1
+            lower, upper = req.value
+            if lower is not None:
+                self._insert(self._lower, req.loan_type, (lower, loan.name, i))
+            if upper is not None:
+                self._insert(self._upper, req.loan_type, (upper, loan.name, i))
+
+    def copy(self):
+        """Return a copy that can be changed independently."""
+        new = self.__class__()
+        new._lower = {k: (b.copy(), e.copy())
+                      for k, (b, e) in self._lower.items()}
+        new._upper = {k: (b.copy(), e.copy())
+                      for k, (b, e) in self._upper.items()}
+        new._requirements = self._requirements.copy()
+        new._types = self._types.copy()
+        return new
+
+    @staticmethod
+    def _insert(index: Dict[LoanRequirementType, _Bounds],
+                loan_type: LoanRequirementType, entry: _Entry):
+        bounds, entries = index.setdefault(loan_type, ([], []))
+        i = bisect.bisect_left(entries, entry)
+        bounds.insert(i, entry[0])
+        entries.insert(i, entry)
+
+    def qualifying(self, metrics: BusinessMetrics) -> List[str]:
+        """Return the names of the loans a business qualifies for."""
+        unmet = self.unmet(metrics)
+        return [name for name in self._requirements if name not in unmet]
+
+    def remove(self, name: str):
+        """Remove a loan from the index if it exists."""
+        requirements = self._requirements.pop(name, None)
+        if requirements is None:
+            return
+        types = self._types
+        for i, req in enumerate(requirements):
+            count = types[req.loan_type] - 1
+            if count:
+                types[req.loan_type] = count
+            else:
+                del types[req.loan_type]
+            lower, upper = req.value
+            if lower is not None:
+                self._remove_entry(self._lower[req.loan_type], (lower, name, i))
+            if upper is not None:
+                self._remove_entry(self._upper[req.loan_type], (upper, name, i))
+
+    @staticmethod
+    def _remove_entry(index: _Bounds, entry: _Entry):
+        bounds, entries = index
+        i = bisect.bisect_left(entries, entry)
+        if i < len(entries) and entries[i] == entry:
+            del bounds[i]
+            del entries[i]
+
+    def unmet(self, metrics: BusinessMetrics) \
+            -> Dict[str, List[LoanRequirement]]:
+        """Return the requirements a business does not meet.
+
+        Only the metrics used by the indexed requirements are calculated.
+        Requirements of a type the metrics do not know are never met,
+        like in LoanRequirement.check_metrics().
+
+        Args:
+            metrics (BusinessMetrics)
+
+        Returns:
+            Dict[str, List[LoanRequirement]]: The unmet requirements of
+                each loan by name in the order of the loan's requirements.
+                Loans the business qualifies for are omitted.
+
+        """
+        failed: Dict[str, set] = {}
+        for loan_type in self._types:
+            try:
+                value = metrics.get(loan_type)
+            except ValueError:
+                for name, requirements in self._requirements.items():
+                    for i, req in enumerate(requirements):
+                        if req.loan_type == loan_type:
+                            failed.setdefault(name, set()).add(i)
+                continue
+            # Lower bounds above the value
+            bounds, entries = self._lower.get(loan_type, ((), ()))
+            for _, name, i in entries[bisect.bisect_right(bounds, value):]:
+                failed.setdefault(name, set()).add(i)
+            # Upper bounds below the value
+            bounds, entries = self._upper.get(loan_type, ((), ()))
+            for _, name, i in entries[:bisect.bisect_left(bounds, value)]:
+                failed.setdefault(name, set()).add(i)
+
+        return {name: [self._requirements[name][i] for i in sorted(indices)]
+                for name, indices in failed.items()}
@@ -0,0 +1,98 @@
+"""This provides the precomputed payment schedule of a loan."""
+from dataclasses import dataclass
+import decimal
+from typing import Optional
+
+from . import utils
+
+__all__ = ['LoanSchedule']
+
+
+@utils.add_slots
+@dataclass(frozen=True)
+class LoanSchedule:
+    """The amortization schedule of a loan with fixed terms.
+
+    Every payment except the last is the normal payment, and the last
+    pays off what is left of the balance, so any payment can be looked up
+    without recalculating the interest.
+
+    Loans build their schedule when it is first needed and drop it when
+    their terms change, so this usually doesn't need to be created
+    directly:
+        >>> loan.schedule.normal_payment
+
+    Args:
+        interest (decimal.Decimal): The interest due over the term.
+        balance (decimal.Decimal): The sum of the amount and interest due.
+        num_payments (Optional[int]): The number of payments,
+            or None if the payback type is not set.
+        normal_payment (Optional[decimal.Decimal])
+        final_payment (Optional[decimal.Decimal]): The last payment,
+            which is lower or equal to the normal payment.
+
+    """
+    interest: decimal.Decimal
+    balance: decimal.Decimal
+    num_payments: Optional[int] = None
+    normal_payment: Optional[decimal.Decimal] = None
+    final_payment: Optional[decimal.Decimal] = None
+
+    def payment(self, remaining_payments: int) -> decimal.Decimal:
+        """Return the payment made when a number of payments are left,
+        counting the payment being made.
+
+        Raises:
+            ValueError: The payback type is not set.
+
+        """
+        if self.normal_payment is None:
+            raise ValueError('Cannot get payments without a payback type')
+        if remaining_payments < 2:
+            return self.final_payment
+        return self.normal_payment
+
+    @classmethod
+    def calculate(cls, amount: decimal.Decimal, interest: decimal.Decimal,
+                  term: int, payback_type: Optional[int]):
+        """Calculate the schedule of a loan from its interest.
+
+        Args:
+            amount (decimal.Decimal): The amount borrowed.
+            interest (decimal.Decimal): The interest due over the term.
+            term (int): The number of years, which is 0 for subsidies.
+            payback_type (Optional[LoanPaybackType])
+
+        """
+        if term == 0:
+            zero = decimal.Decimal()
+            return cls(zero, amount, 0, zero, zero)
+
+        balance = amount + interest
+        if payback_type is None:
+            return cls(interest, balance)
+
+        num_payments = term * 48 // payback_type
+        normal = utils.round_dollars(balance / num_payments)
+        final = balance % normal if normal else normal
+        if final == 0:
+            final = normal
+        return cls(interest, balance, num_payments, normal, final)
+
+    @classmethod
+    def from_loan(cls, loan):
+        """Calculate the schedule of a loan.
+
+        Args:
+            loan (Loan)
+
+        Raises:
+            TypeError: The loan's term is not set.
+
+        """
+        if loan.is_subsidy:
+            return cls.calculate(loan.amount, decimal.Decimal(), 0, None)
+        interest = loan.calculate_interest(
+            loan.amount, loan.rate, loan.interest_type, loan.term)
+        return cls.calculate(loan.amount, interest, loan.term,
+                             loan.payback_type)
@@ -4,15 +4,19 @@ import cmd
 import contextlib
 import decimal
 import os
+import shlex
 import traceback
-from typing import List, Union, Optional
+from typing import Callable, Iterable, List, Union, Optional
 
 from . import utils
 from .business import Business
+from .businessmetrics import BusinessMetrics
 from .cliutils import input_integer, input_money, input_boolean, is_integer, input_choice
 from .inventory import Inventory
 from .inventoryitem import InventoryItem
 from .item import Item
+from .journal import Journal
+from .ledger import Ledger
 from .loan import Loan
 from .loanmenu import LoanMenu
 from .loanpaybacktype import LoanPaybackType
@@ -23,18 +27,53 @@ __all__ = ['Manager']
 
 class Manager:
     _TYPE = Business
+    # The number of weeks to look ahead for loan payments that may be declined
+    SHORTFALL_WARNING_WEEKS = 12
 
     def __init__(self, business: Business, filepath: str = None, compressed=False):
         self.business = business
         self.filepath = filepath
         self.compressed = compressed
         self.deleted = False
+        self.journal = Journal()
+        # An optional CommandProfiler recording the latency of commands
+        self.profiler = None
+        # The state forecast_shortfall() was last computed for and its result
+        self._shortfall = None
 
     def delete_business(self):
         """Delete the business's save file and mark this as deleted."""
         os.remove(self.filepath)
         self.deleted = True
 
+    @staticmethod
+    def describe_cash_flow(payments: List[decimal.Decimal],
+                           current_week: int) -> str:
+        """Return a table of the loan payments due in each month.
+
+        Args:
+            payments (List[decimal.Decimal]): The payments due in each
+                week after the current week, as projected by
+                LoanMenu.project_cash_flow().
+            current_week (int): The business's total weeks.
+
+        Returns:
+            str
+
+        """
+        months = {}
+        for week, payment in enumerate(payments, start=current_week + 1):
+            month = 'Y{} M{}'.format(week // 48 + 1, week // 4 % 12 + 1)
+            months[month] = months.get(month, 0) + payment
+
+        rows = [('Month', 'Loan payments')]
+        rows.extend((month, utils.format_dollars(total))
+                    for month, total in months.items())
+        rows.append(('Total', utils.format_dollars(sum(payments))))
+        widths = [max(len(row[i]) for row in rows) for i in range(2)]
+        return '\n'.join(f'{month:<{widths[0]}} : {total:>{widths[1]}}'
+                         for month, total in rows)
+
     @staticmethod
     def describe_invitem(item: InventoryItem) -> str:
         """Return a string describing a given inventory item.
@@ -80,6 +119,78 @@ class Manager:
         )
         return description
 
+    @staticmethod
+    def describe_loan_options(loans: Iterable[Loan], terms: Iterable[int],
+                              payback_types: Iterable[LoanPaybackType]) -> str:
+        """Return a table comparing the payments of some loans
+        for every combination of term and payback type.
+
+        Loans with a fixed term or payback type only show that value.
+        The loan's name is only shown when comparing more than one loan.
+
+        Args:
+            loans (Iterable[Loan])
+            terms (Iterable[int]): The terms in years.
+            payback_types (Iterable[LoanPaybackType])
+
+        Returns:
+            str
+
+        """
+        loans = list(loans)
+        terms = tuple(terms)
+        payback_types = tuple(payback_types)
+
+        rows = [('Loan', 'Term', 'Frequency', 'Payments', 'Payment',
+                 'Interest', 'Total cost')]
+        for loan in loans:
+            if loan.is_subsidy:
+                rows.append((loan.name, '-', 'subsidy', '0', '-',
+                             utils.format_dollars(0), utils.format_dollars(0)))
+                continue
+            options = loan.schedule_options(terms, payback_types)
+            for (term, payback_type), schedule in options.items():
+                rows.append((
+                    loan.name,
+                    '{} {}'.format(term, utils.plural('year', term)),
+                    str(payback_type),
+                    f'{schedule.num_payments:,}',
+                    utils.format_dollars(schedule.normal_payment),
+                    utils.format_dollars(schedule.interest),
+                    utils.format_dollars(schedule.balance)
+                ))
+
+        if len(rows) == 1:
+            return 'There are no loans to compare.'
+        elif len(loans) == 1:
+            rows = [row[1:] for row in rows]
+        widths = [max(len(row[i]) for row in rows)
+                  for i in range(len(rows[0]))]
+        return '\n'.join([
+            ' : '.join([f'{row[0]:<{widths[0]}}'] + [
+                f'{v:>{w}}' for v, w in zip(row[1:], widths[1:])
+            ])
+            for row in rows
+        ])
+
+    def forecast_shortfall(self):
+        """Return Business.forecast_shortfall() over the next
+        SHORTFALL_WARNING_WEEKS.
+
+        The result is kept until the business changes, which is when
+        time steps, the balance changes or the journal records, undoes
+        or redoes an entry. Changes made to the business outside of
+        the journal should be followed by `journal.clear()`.
+
+        """
+        business = self.business
+        token = (id(business), business.total_weeks, business.balance,
+                 self.journal.version, self.SHORTFALL_WARNING_WEEKS)
+        if self._shortfall is None or self._shortfall[0] != token:
+            self._shortfall = (token, business.forecast_shortfall(
+                self.SHORTFALL_WARNING_WEEKS))
+        return self._shortfall[1]
+
     def get_invitem(self, s: Union[int, str]) -> InventoryItem:
         """Lookup an InventoryItem by index or name.
 
@@ -145,6 +256,18 @@ class Manager:
         ... """
         return {i: item for i, item in enumerate(self.business.inventory, start=1)}
 
+    def record(self, description: str):
+        """Record changes made to the business so they can be undone.
+
+        Usage:
+            >>> with manager.record('Hire employee') as entry:
+            ...     manager.business.employee_count += 1
+
+        See Journal.record() for more details.
+
+        """
+        return self.journal.record(description, self.business)
+
     def reload_business(self, filepath=None):
         """Reload the business's data from `filepath`.
         Defaults to `self.filepath` if no filepath is provided.
@@ -156,7 +279,11 @@ class Manager:
             return
 
         filepath = filepath or self.filepath
-        self.business = self._TYPE.from_file(filepath)
+        # Keep storing transactions the same way
+        columnar_ledger = isinstance(self.business.transactions, Ledger)
+        self.business = self._TYPE.from_file(filepath,
+                                             columnar_ledger=columnar_ledger)
+        self.journal.clear()
 
     def run(self):
         """Start the user interface.
@@ -165,6 +292,22 @@ class Manager:
 
         ManagerCLIMain(self).cmdloop()
 
+    def run_script(self, lines: Iterable[str]) -> int:
+        """Run commands from a script without prompting the user.
+        Override this method in a subclass to support more commands.
+
+        See ManagerScript for the commands available.
+
+        Returns:
+            int: The number of commands that were run.
+
+        Raises:
+            ValueError: A command failed. Commands before it
+                have already been run.
+
+        """
+        return ManagerScript(self).run(lines)
+
     def save_business(self, filepath=None):
         """Save the business to `filepath`.
         Defaults to `self.filepath` if no filepath is provided.
@@ -244,8 +387,10 @@ class Manager:
                 self.save_business()
 
     @classmethod
-    def from_filepath(cls, filepath, *, compressed=False):
-        business = cls._TYPE.from_file(filepath)
+    def from_filepath(cls, filepath, *, compressed=False,
+                      columnar_ledger=None):
+        business = cls._TYPE.from_file(filepath,
+                                       columnar_ledger=columnar_ledger)
         return cls(business, filepath=filepath, compressed=compressed)
 
 
@@ -310,13 +455,30 @@ class ManagerCLIBase(cmd.Cmd):
     def preloop(self):
         self.update_conditional()
 
+    def precmd(self, line):
+        """Called before a command is dispatched.
+        Starts timing the command if the manager is being profiled."""
+        if self.manager.profiler is not None:
+            self.manager.profiler.start_command(line)
+        return line
+
     def postcmd(self, stop, line):
         """Called after a command dispatch is finished.
-        Prints a message if the business's balance is negative."""
+        Prints a message if the business's balance is negative or
+        a loan payment is likely to be declined soon."""
+        if self.manager.profiler is not None:
+            self.manager.profiler.stop_command()
         balance = self.manager.business.balance
         if balance < 0:
             print("Warning: the business's balance is negative! "
                   f'({utils.format_dollars(balance)})')
+        shortfall = self.manager.forecast_shortfall()
+        if shortfall is not None:
+            week, payment, projected = shortfall
+            print('Warning: the loan payments of {} due {} may be declined! '
+                  '(projected balance: {})'.format(
+                      utils.format_dollars(payment), utils.format_date(week),
+                      utils.format_dollars(projected)))
         self.update_conditional()
         return stop
 
@@ -353,6 +515,47 @@ WIP: This currently only prints the inventory of the business."""
         else:
             print('Successfully loaded!')
 
+    def do_memory(self, arg):
+        """View how much memory each part of your business uses.
+Optionally, allocations made while stepping some number of weeks are traced
+on a copy of your business.
+Usage: memory [weeks]"""
+        arg = arg.strip()
+        weeks = None
+        if arg:
+            try:
+                weeks = int(arg)
+            except ValueError:
+                return print('Could not parse your number.')
+            if weeks < 1:
+                return print('You must trace at least one week.')
+
+        report = self.manager.business.memory_report(weeks)
+        rows = dict(report['components'], total=report['total'])
+        name_longest = max(len(name) for name in rows)
+        for name, usage in rows.items():
+            print('{:<{}} : {:>12} : {:>10,} objects'.format(
+                name.capitalize(), name_longest,
+                utils.format_bytes(usage['bytes']), usage['objects']
+            ))
+
+        step = report.get('step')
+        if step is not None:
+            print('\nAllocated while stepping {}: {}'.format(
+                utils.format_weeks(step['weeks']),
+                utils.format_bytes(step['bytes'])
+            ))
+            for site in step['top']:
+                print('{:>12} : {}'.format(
+                    utils.format_bytes(site['bytes']), site['location']))
+
+    def do_redo(self, arg):
+        """Redo the last change that was undone."""
+        entry = self.manager.journal.redo()
+        if entry is None:
+            return print('There is nothing to redo.')
+        print(f'Redone: {entry}')
+
     def do_save(self, arg):
         """Save your business's data onto disk."""
         try:
@@ -363,10 +566,41 @@ WIP: This currently only prints the inventory of the business."""
         else:
             print('Successfully saved!')
 
+    def do_stats(self, arg):
+        """View how much time is spent in each phase of stepping time.
+Usage: stats [on|off|reset]"""
+        business = self.manager.business
+        arg = arg.strip().lower()
+        if arg == 'on':
+            business.enable_stats()
+            return print('Stats are now being recorded.')
+        elif arg == 'off':
+            business.enable_stats(False)
+            return print('Stats are no longer being recorded.')
+        elif arg == 'reset':
+            business.reset_stats()
+            return print('Stats have been reset.')
+        elif arg:
+            return print('Usage: stats [on|off|reset]')
+
+        if not business.stats_enabled:
+            return print('Stats are not being recorded (type "stats on" to start).')
+        stats = business.stats()
+        if not stats:
+            return print('No stats have been recorded yet.')
+
+        name_longest = max(len(phase) for phase in stats)
+        print(f'{"Phase":<{name_longest}} : {"Calls":>8} : {"Total (ms)":>12}')
+        for phase, s in sorted(stats.items(), key=lambda x: -x[1]['seconds']):
+            print(f'{phase:<{name_longest}} : {s["calls"]:>8,} : '
+                  f'{s["seconds"] * 1000:>12,.3f}')
+
     def do_step(self, arg):
         """Go to the next month."""
         business = self.manager.business
         business.step(weeks=4)
+        # Past changes can no longer be reverted reliably
+        self.manager.journal.clear()
         print(utils.format_date(business.total_weeks))
 
     def do_time(self, arg):
@@ -374,6 +608,14 @@ WIP: This currently only prints the inventory of the business."""
         business = self.manager.business
         print('The current date is:', utils.format_date(business.total_weeks))
 
+    def do_undo(self, arg):
+        """Undo the last change made to your business since the last step.
+Changes can be redone using the redo command."""
+        entry = self.manager.journal.undo()
+        if entry is None:
+            return print('There is nothing to undo.')
+        print(f'Undone: {entry}')
+
 
 class ManagerCLIFinancesEmployees(ManagerCLISubCMDBase):
     doc_header = 'Employee Management'
@@ -418,7 +660,8 @@ Usage: decrease <number>"""
                 )
             )
 
-        self.manager.business.employee_count = new
+        with self.manager.record(f'Remove {num:,} {utils.plural("employee", num)}'):
+            self.manager.business.employee_count = new
 
         print('You have removed {} {}! Your new count is {}.'.format(
             num,
@@ -440,7 +683,8 @@ Usage: increase <number>"""
         if num < 1:
             return print('You must add at least one employee.')
 
-        self.manager.business.employee_count += num
+        with self.manager.record(f'Add {num:,} {utils.plural("employee", num)}'):
+            self.manager.business.employee_count += num
 
         print('You have added {} {}! Your new count is {}.'.format(
             num,
@@ -451,6 +695,10 @@ Usage: increase <number>"""
 
 class ManagerCLIFinancesLoans(ManagerCLISubCMDBase):
     doc_header = 'Loan Management'
+    # The terms (in years) shown when comparing negotiable loans
+    COMPARE_TERMS = (1, 2, 3, 5, 10)
+    NEGOTIABLE_PAYBACK_TYPES = (LoanPaybackType.MONTHLY,
+                                LoanPaybackType.ANNUALLY)
 
     @staticmethod
     def print_loan_not_found(arg):
@@ -535,9 +783,10 @@ Usage: apply [name_or_index]"""
 
         qualified = True
         if loan.requirements:
+            metrics = BusinessMetrics(business)
             req_str = []
             for req in loan.requirements:
-                req_check = req.check(business)
+                req_check = req.check_metrics(metrics)
                 if not req_check:
                     qualified = False
 
@@ -556,9 +805,12 @@ Usage: apply [name_or_index]"""
         negotiate_term = not loan.is_subsidy and loan.term is None
         negotiate_payback = not loan.is_subsidy and loan.payback_type is None
 
-        if any((negotiate_term, negotiate_payback)) and not input_boolean(
-                'Proceed with negotiating terms? (y/n) '):
-            return
+        if any((negotiate_term, negotiate_payback)):
+            print('Options:')
+            print(self.manager.describe_loan_options(
+                [loan], self.COMPARE_TERMS, self.NEGOTIABLE_PAYBACK_TYPES))
+            if not input_boolean('Proceed with negotiating terms? (y/n) '):
+                return
 
         loan = loan.copy()
 
@@ -576,7 +828,7 @@ Usage: apply [name_or_index]"""
             loan.reset_remaining_weeks()
 
         if negotiate_payback:
-            payback_types = (LoanPaybackType.MONTHLY, LoanPaybackType.ANNUALLY)
+            payback_types = self.NEGOTIABLE_PAYBACK_TYPES
             loan.payback_type = input_choice(
                 'How frequently do you want to pay this loan? ',
                 payback_types,
@@ -599,9 +851,12 @@ Usage: apply [name_or_index]"""
 
         if input_boolean(
                 f'Are you sure you want to apply for this {name}? (y/n) '):
-            business.apply_loan(loan, copy=False)
-            if loan.is_subsidy:
-                loan_menu.remove(loan)
+            with self.manager.record(f'Apply for {loan}') as entry:
+                entry.touch(business.loans, loan.name)
+                entry.touch(loan_menu, loan.name)
+                business.apply_loan(loan, copy=False)
+                if loan.is_subsidy:
+                    loan_menu.remove(loan)
             print(f'You have successfully applied for the {loan}!')
         else:
             return cancel()
@@ -610,11 +865,35 @@ Usage: apply [name_or_index]"""
         """View the available loans from various banks."""
         business = self.manager.business
         loan_menu = business.metadata['loan_menu']
+        unmet = loan_menu.evaluate(business)
         for i, loan in enumerate(loan_menu, start=1):
-            state = '(qualifying)' if loan.check(business) else '(unavailable)'
+            reasons = unmet[loan.name]
+            if reasons:
+                state = '(unavailable: {})'.format(
+                    '; '.join([str(req) for req in reasons]))
+            else:
+                state = '(qualifying)'
             print(f'{i:,}: {loan} {state}')
         print('Note that you can only apply for one loan at a time.')
 
+    def do_compare(self, arg):
+        """Compare the payments of the available loans for each term
+and payment frequency.
+Usage: compare [name_or_index]"""
+        loan_menu: LoanMenu = self.manager.business.metadata['loan_menu']
+
+        arg = arg.strip()
+        if arg:
+            loan = self.manager.get_loan(arg, loan_menu)
+            if loan is None:
+                return self.print_loan_not_found(arg)
+            loans = [loan]
+        else:
+            loans = loan_menu
+
+        print(self.manager.describe_loan_options(
+            loans, self.COMPARE_TERMS, self.NEGOTIABLE_PAYBACK_TYPES))
+
     def do_list(self, arg):
         """View the business's loans."""
         if not self.manager.business.loans:
@@ -735,6 +1014,17 @@ Your average expenses will only include what you have spent on inventory."""
         ManagerCLIFinancesLoans(self.manager).cmdloop()
         self.cmdqueue.append('help')
 
+    def do_projection(self, arg):
+        """View the loan payments due over the next 12 months."""
+        business = self.manager.business
+        payments = business.loans.project_cash_flow(
+            48, current_week=business.total_weeks)
+
+        if not any(payments):
+            return print('There are no loan payments due in the next 12 months.')
+
+        print(self.manager.describe_cash_flow(payments, business.total_weeks))
+
     def do_revenue(self, arg):
         """View your average revenue, along with the current and last month's income transactions."""
         business = self.manager.business
@@ -826,48 +1116,72 @@ class ManagerCLIInventory(ManagerCLISubCMDBase):
         return result
 
     def cond_buy(self, arg):
-        """Buy an item using the business's balance."""
+        """Buy one or more items using the business's balance."""
         def cancel():
             print('Cancelled purchase.')
 
         business = self.manager.business
         inv = business.inventory
 
-        name = input('What is the name of the item? ').strip()
-
-        if not name:
-            return cancel()
-
-        item = inv.get(name)
-
-        if item is not None:
-            unit = item.unit
-        else:
-            unit = input('What unit is this item measured in? (gram, millilitre, cup...) ').strip()
-            if not unit:
+        items = []
+        units = {}
+        total = decimal.Decimal()
+        prompt = 'What is the name of the item? '
+        while True:
+            name = input(prompt).strip()
+            if not name:
+                break
+
+            unit = units.get(name)
+            item = inv.get(name)
+            if unit is None and item is not None:
+                unit = item.unit
+            elif unit is None:
+                unit = input('What unit is this item measured in? (gram, millilitre, cup...) ').strip()
+                if not unit:
+                    return cancel()
+
+            quantity = input_integer('How much do you want to buy? ', minimum=0, default=0)
+            if not quantity:
                 return cancel()
 
-        quantity = input_integer('How much do you want to buy? ', minimum=0, default=0)
-        if not quantity:
+            price, is_unit = self.input_money_per(
+                'What is the cost of your purchase? (type "per" at the end if '
+                f'you are specifying the unit price)\n{self.prompt}$', minimum=0,
+                maximum=business.balance - total
+            )
+            if is_unit:
+                price *= quantity
+
+            new_item = Item(name, quantity, unit, price)
+            items.append(new_item)
+            units[name] = unit
+            total += new_item.price
+            if total >= business.balance:
+                break
+            prompt = ('What is the name of the next item? '
+                      '(type nothing to finish) ')
+
+        if not items:
             return cancel()
+        elif len(items) > 1:
+            print(f'Total cost of {len(items):,} items:',
+                  utils.format_dollars(total))
+            if not input_boolean('Do you want to buy these items? (y/n) '):
+                return cancel()
 
-        price, is_unit = self.input_money_per(
-            'What is the cost of your purchase? (type "per" at the end if '
-            f'you are specifying the unit price)\n{self.prompt}$', minimum=0,
-            maximum=business.balance
-        )
-        if is_unit:
-            price *= quantity
-
-        # Create the new item and try buying it
-        new_item = Item(name, quantity, unit, price)
-        success = business.buy_item(new_item)
-        if success:
-            print(f'{new_item} purchased!')
+        # Try buying the items
+        with self.manager.record(f'Buy {utils.human_join(items)}') as entry:
+            for item in items:
+                entry.touch(inv, item.name)
+            bought = business.buy_items(items)
+        if bought:
+            print(f'{utils.human_join(bought)} purchased!')
         else:
             # NOTE: This shouldn't occur since input_money_per sets the
             # maximum but it's best to handle it anyways
-            print('Failed to purchase item.')
+            print('Failed to purchase {}.'.format(
+                utils.plural('item', len(items))))
 
     def condhidden_buy(self, arg):
         balance = utils.format_dollars(self.manager.business.balance)
@@ -926,10 +1240,12 @@ Usage: remove [name_or_index]"""
                   f'({num / maximum:.0%})')
 
         if input_boolean(prompt):
-            if num == maximum:
-                business.inventory.remove(item)
-            else:
-                item.subtract(num)
+            with self.manager.record(f'Remove {item.name}') as entry:
+                entry.touch(business.inventory, item.name)
+                if num == maximum:
+                    business.inventory.remove(item)
+                else:
+                    item.subtract(num)
             if num == 0:
                 print('Removed item!')
             else:
@@ -960,3 +1276,274 @@ Usage: show [name_or_index]"""
 
         print(item.name)
         print(self.manager.describe_invitem(item))
+
+
+class ManagerScript:
+    """Runs the commands of a script against a manager's business
+    without prompting the user.
+
+    Each line is a command followed by its arguments, which are split
+    like a shell command so names containing spaces can be quoted.
+    Blank lines and comments starting with # are ignored:
+        setup 50000 4
+        # Buy 5 kg of coffee beans for $120
+        inventory buy "Coffee Beans" 5000 gram 120.00
+        finances employees increase 2
+        step 12
+
+    Commands are the methods named after the words of the command,
+    such as cmd_inventory_buy() for "inventory buy", which receive
+    the remaining arguments as strings. Subclasses can add commands
+    by defining more methods. Changes are recorded in the manager's
+    journal like they are in the CLI.
+
+    Args:
+        manager (Manager)
+
+    """
+
+    def __init__(self, manager: Manager):
+        self.manager = manager
+
+    @staticmethod
+    def _check_args(args: List[str], usage: str, minimum: int,
+                    maximum: int = None):
+        """Check the number of arguments given to a command.
+
+        Raises:
+            ValueError: There are too few or too many arguments.
+
+        """
+        if maximum is None:
+            maximum = minimum
+        if not minimum <= len(args) <= maximum:
+            raise ValueError(f'Usage: {usage}')
+
+    def commands(self) -> List[str]:
+        """Return the names of the available commands."""
+        return [name[4:].replace('_', ' ')
+                for name in dir(self) if name.startswith('cmd_')]
+
+    def execute(self, line: str) -> bool:
+        """Run a single line of a script.
+
+        Returns:
+            bool: Whether the line had a command.
+
+        Raises:
+            ValueError: The command is unknown or failed.
+
+        """
+        words = shlex.split(line, comments=True)
+        if not words:
+            return False
+
+        func: Optional[Callable] = None
+        # Use the longest command matching the first words
+        for i in range(len(words), 0, -1):
+            name = 'cmd_' + '_'.join(w.lower() for w in words[:i])
+            func = getattr(self, name, None)
+            if func is not None:
+                break
+        if func is None:
+            raise ValueError(f'Unknown command: {words[0]!r}')
+
+        if (self.manager.business.balance is None
+                and func != self.cmd_setup):
+            raise ValueError('The business must be set up first '
+                             '(setup <balance> <employees>)')
+        func(words[i:])
+        return True
+
+    @staticmethod
+    def _parse_integer(s: str, minimum: int = None) -> int:
+        try:
+            n = int(s.replace(',', ''))
+        except ValueError:
+            raise ValueError(f'Could not parse the number {s!r}') from None
+        if minimum is not None and n < minimum:
+            raise ValueError(f'{n:,} must be at least {minimum:,}')
+        return n
+
+    @staticmethod
+    def _parse_money(s: str) -> decimal.Decimal:
+        try:
+            dollars = utils.parse_dollars(s)
+        except ValueError:
+            raise ValueError(f'Could not parse the amount {s!r}') from None
+        if dollars < 0:
+            raise ValueError(f'{s!r} cannot be negative')
+        return dollars
+
+    def run(self, lines: Iterable[str]) -> int:
+        """Run each line of a script in order.
+
+        Returns:
+            int: The number of commands that were run.
+
+        Raises:
+            ValueError: A command failed. The message includes
+                the line number.
+
+        """
+        count = 0
+        for lineno, line in enumerate(lines, start=1):
+            try:
+                count += self.execute(line)
+            except ValueError as e:
+                raise ValueError(f'Line {lineno}: {e}') from e
+        return count
+
+    def cmd_finances_employees_decrease(self, args: List[str]):
+        """finances employees decrease <number>"""
+        self._check_args(args, 'finances employees decrease <number>', 1)
+        num = self._parse_integer(args[0], minimum=1)
+        business = self.manager.business
+        if num > business.employee_count:
+            raise ValueError(f'Cannot remove {num:,} employees '
+                             f'(the current count is {business.employee_count:,})')
+        with self.manager.record(f'Remove {num:,} {utils.plural("employee", num)}'):
+            business.employee_count -= num
+
+    def cmd_finances_employees_increase(self, args: List[str]):
+        """finances employees increase <number>"""
+        self._check_args(args, 'finances employees increase <number>', 1)
+        num = self._parse_integer(args[0], minimum=1)
+        with self.manager.record(f'Add {num:,} {utils.plural("employee", num)}'):
+            self.manager.business.employee_count += num
+
+    def cmd_finances_loans_apply(self, args: List[str]):
+        """finances loans apply <name_or_index> [term] [payback_type]
+
+        The term (in years) and payback type are only used for loans
+        where they can be negotiated.
+
+        """
+        usage = 'finances loans apply <name_or_index> [term] [payback_type]'
+        self._check_args(args, usage, 1, 3)
+        business = self.manager.business
+        if business.loans:
+            raise ValueError('The business has already applied for a loan')
+
+        loan_menu: LoanMenu = business.metadata['loan_menu']
+        loan = self.manager.get_loan(args[0], loan_menu)
+        if loan is None:
+            raise ValueError(f'Could not find the loan {args[0]!r}')
+        unmet = loan.unmet_requirements(BusinessMetrics(business))
+        if unmet:
+            raise ValueError('The business does not meet the requirements '
+                             'for {}: {}'.format(loan, '; '.join(map(str, unmet))))
+
+        loan = loan.copy()
+        if not loan.is_subsidy and loan.term is None:
+            if len(args) < 2:
+                raise ValueError(f'The term of {loan} must be given: {usage}')
+            loan.term = self._parse_integer(args[1], minimum=1)
+            loan.reset_remaining_weeks()
+        if not loan.is_subsidy and loan.payback_type is None:
+            payback_types = {str(t): t for t in
+                             ManagerCLIFinancesLoans.NEGOTIABLE_PAYBACK_TYPES}
+            if len(args) < 3:
+                raise ValueError('The payback type of {} must be one of {}: {}'.format(
+                    loan, ', '.join(payback_types), usage))
+            payback_type = payback_types.get(args[2].lower())
+            if payback_type is None:
+                raise ValueError('The payback type must be one of {}'.format(
+                    ', '.join(payback_types)))
+            loan.payback_type = payback_type
+
+        with self.manager.record(f'Apply for {loan}') as entry:
+            entry.touch(business.loans, loan.name)
+            entry.touch(loan_menu, loan.name)
+            business.apply_loan(loan, copy=False)
+            if loan.is_subsidy:
+                loan_menu.remove(loan)
+
+    def cmd_inventory_buy(self, args: List[str]):
+        """inventory buy <name> <quantity> [unit] <price>[per]
+
+        The unit can be left out if the item is in the inventory.
+        If the price ends with "per", it is the price of one unit.
+
+        """
+        usage = 'inventory buy <name> <quantity> [unit] <price>[per]'
+        self._check_args(args, usage, 3, 4)
+        business = self.manager.business
+        inv = business.inventory
+
+        name = args[0]
+        quantity = self._parse_integer(args[1], minimum=1)
+        if len(args) == 4:
+            unit = args[2]
+        else:
+            item = inv.get(name)
+            if item is None:
+                raise ValueError(f'The unit of {name!r} must be given: {usage}')
+            unit = item.unit
+
+        price = args[-1]
+        is_unit_price = price.lower().endswith('per')
+        if is_unit_price:
+            price = price[:-3]
+        price = self._parse_money(price)
+        if is_unit_price:
+            price *= quantity
+        if price > business.balance:
+            raise ValueError('Cannot afford {} with a balance of {}'.format(
+                utils.format_dollars(price),
+                utils.format_dollars(business.balance)))
+
+        item = Item(name, quantity, unit, price)
+        with self.manager.record(f'Buy {item}') as entry:
+            entry.touch(inv, name)
+            business.buy_items([item])
+
+    def cmd_inventory_remove(self, args: List[str]):
+        """inventory remove <name_or_index> [quantity]
+
+        Without a quantity, the whole item is removed.
+
+        """
+        self._check_args(args, 'inventory remove <name_or_index> [quantity]', 1, 2)
+        business = self.manager.business
+        item = self.manager.get_invitem(args[0])
+        if item is None:
+            raise ValueError(f'Could not find the item {args[0]!r}')
+        num = item.quantity
+        if len(args) == 2:
+            num = self._parse_integer(args[1], minimum=1)
+            if num > item.quantity:
+                raise ValueError(f'Cannot remove {num:,} of {item.name} '
+                                 f'({item.quantity:,} total)')
+
+        with self.manager.record(f'Remove {item.name}') as entry:
+            entry.touch(business.inventory, item.name)
+            if num == item.quantity:
+                business.inventory.remove(item)
+            else:
+                item.subtract(num)
+
+    def cmd_setup(self, args: List[str]):
+        """setup <balance> <employees>
+
+        Set up a new business, which must be done before any other
+        command. Businesses that are already set up are left as is.
+
+        """
+        self._check_args(args, 'setup <balance> <employees>', 2)
+        business = self.manager.business
+        if business.balance is None:
+            business.deposit('Initial balance', self._parse_money(args[0]))
+        if business.employee_count is None:
+            business.employee_count = self._parse_integer(args[1], minimum=1)
+        if business.inventory is None:
+            business.inventory = Inventory()
+        business.generate_metadata()
+
+    def cmd_step(self, args: List[str]):
+        """step [months]"""
+        self._check_args(args, 'step [months]', 0, 1)
+        months = self._parse_integer(args[0], minimum=1) if args else 1
+        self.manager.business.step(weeks=4 * months)
+        # Past changes can no longer be reverted reliably
+        self.manager.journal.clear()
@@ -0,0 +1,313 @@
+"""This provides a local HTTP server exposing a manager's business
+as a JSON API."""
+import decimal
+import http.server
+import json
+import threading
+import traceback
+from typing import Callable, Dict, Tuple
+import urllib.parse
+
+from . import utils
+from .item import Item
+from .jsonencoder import JSONEncoder
+
+__all__ = ['ManagerServer']
+
+
+class ManagerServer(http.server.ThreadingHTTPServer):
+    """A local HTTP server for reading and changing a manager's business
+    through JSON endpoints.
+
+    GET endpoints:
+        /balance: The balance and current date.
+        /inventory: The items in the inventory.
+        /dishes: The dishes on the menu, if the business is a restaurant.
+        /loans: The business's loans and the loan offers it can apply for.
+        /transactions?limit=50&offset=0: A page of transactions,
+            newest first.
+
+    POST endpoints, which take a JSON object as their body:
+        /buy: Buy items, given as {"items": [{"name": "Milk",
+            "quantity": 1000, "unit": "millilitre", "price": "2.50"}]}.
+            The unit can be left out for items in the inventory.
+        /step: Step some number of months, given as {"months": 1},
+            up to MAX_STEP_MONTHS.
+        /save: Save the business to the manager's file.
+
+    Requests are handled in separate threads over keep-alive
+    connections. Requests that read or change the business hold `lock`.
+    The responses of GET endpoints are cached until the next change,
+    so repeated reads are served without touching the business.
+
+    Usage:
+        >>> server = ManagerServer(manager, ('127.0.0.1', 8000))
+        >>> server.serve_forever()
+
+    Args:
+        manager (Manager)
+        address (Tuple[str, int]): The host and port to listen on.
+        verbose (bool): If True, each request is logged to stderr.
+
+    """
+    daemon_threads = True
+    # The most transactions returned by one page
+    MAX_PAGE_SIZE = 1000
+    # The most months stepped by one request, which holds the lock
+    # for the whole step
+    MAX_STEP_MONTHS = 120
+    # The most responses kept in the cache
+    CACHE_SIZE = 256
+
+    def __init__(self, manager, address: Tuple[str, int] = ('127.0.0.1', 8000),
+                 verbose=False):
+        super().__init__(address, _ManagerRequestHandler)
+        self.manager = manager
+        self.verbose = verbose
+        self.lock = threading.RLock()
+        self._cache: Dict[str, bytes] = {}
+        self.get_routes: Dict[str, Callable[[dict], object]] = {
+            '/balance': self.get_balance,
+            '/inventory': self.get_inventory,
+            '/loans': self.get_loans,
+            '/transactions': self.get_transactions,
+        }
+        if hasattr(manager.business, 'dishes'):
+            self.get_routes['/dishes'] = self.get_dishes
+        self.post_routes: Dict[str, Callable[[dict], object]] = {
+            '/buy': self.post_buy,
+            '/save': self.post_save,
+            '/step': self.post_step,
+        }
+
+    def invalidate(self):
+        """Forget the cached responses after the business changed.
+        This must be called if the business is changed outside of
+        the server's endpoints."""
+        with self.lock:
+            self._cache.clear()
+
+    @staticmethod
+    def encode(obj) -> bytes:
+        return json.dumps(obj, cls=JSONEncoder).encode('utf-8')
+
+    def handle_get(self, path: str, query: dict) -> bytes:
+        """Return the encoded response of a GET endpoint in `get_routes`.
+
+        Raises:
+            ValueError: The query is invalid.
+
+        """
+        route = self.get_routes[path]
+        key = path + '?' + urllib.parse.urlencode(sorted(query.items()))
+        body = self._cache.get(key)
+        if body is not None:
+            return body
+
+        with self.lock:
+            body = self._cache.get(key)
+            if body is None:
+                body = self.encode(route(query))
+                if len(self._cache) >= self.CACHE_SIZE:
+                    self._cache.clear()
+                self._cache[key] = body
+        return body
+
+    def handle_post(self, path: str, data: dict) -> bytes:
+        """Run a POST endpoint in `post_routes` and return its
+        encoded response.
+
+        Raises:
+            ValueError: The data is invalid.
+
+        """
+        route = self.post_routes[path]
+        with self.lock:
+            try:
+                result = route(data)
+            finally:
+                self._cache.clear()
+        return self.encode(result)
+
+    @staticmethod
+    def _get_integer(data: dict, key: str, default: int, minimum: int,
+                     maximum: int = None) -> int:
+        value = data.get(key, default)
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f'{key} must be an integer') from None
+        if value < minimum:
+            raise ValueError(f'{key} must be at least {minimum:,}')
+        elif maximum is not None and value > maximum:
+            raise ValueError(f'{key} must be at most {maximum:,}')
+        return value
+
+    def get_balance(self, query: dict) -> dict:
+        business = self.manager.business
+        return {
+            'balance': business.balance,
+            'week': business.total_weeks,
+            'date': utils.format_date(business.total_weeks)
+        }
+
+    def get_dishes(self, query: dict) -> dict:
+        return {'dishes': list(self.manager.business.dishes)}
+
+    def get_inventory(self, query: dict) -> dict:
+        inventory = self.manager.business.inventory
+        return {'items': [] if inventory is None
+                else list(inventory.iter_readonly())}
+
+    def get_loans(self, query: dict) -> dict:
+        business = self.manager.business
+        offers = []
+        loan_menu = business.metadata.get('loan_menu')
+        if loan_menu is not None:
+            unmet = loan_menu.evaluate(business)
+            for loan in loan_menu:
+                offer = loan.to_dict()
+                offer['unmet_requirements'] = [str(r) for r in unmet[loan.name]]
+                offers.append(offer)
+        return {'loans': list(business.loans), 'offers': offers}
+
+    def get_transactions(self, query: dict) -> dict:
+        limit = self._get_integer(query, 'limit', 50, 1, self.MAX_PAGE_SIZE)
+        offset = self._get_integer(query, 'offset', 0, 0)
+        transactions = self.manager.business.transactions
+        total = len(transactions)
+        stop = max(0, total - offset)
+        start = max(0, stop - limit)
+        return {
+            'total': total,
+            'offset': offset,
+            # Only the transactions on the page are created from a Ledger
+            'transactions': [transactions[i]
+                             for i in range(stop - 1, start - 1, -1)]
+        }
+
+    def post_buy(self, data: dict) -> dict:
+        manager = self.manager
+        business = manager.business
+        inv = business.inventory
+        if inv is None:
+            raise ValueError('The business has no inventory')
+        if business.balance is None:
+            raise ValueError('The business has no balance')
+        if not isinstance(data.get('items'), list) or not data['items']:
+            raise ValueError('items must be a non-empty list')
+
+        items = []
+        total = decimal.Decimal()
+        for d in data['items']:
+            if not isinstance(d, dict) or not d.get('name'):
+                raise ValueError('Each item must be an object with a name')
+            name = str(d['name'])
+            unit = d.get('unit')
+            if unit is None:
+                inv_item = inv.get(name)
+                if inv_item is None:
+                    raise ValueError(f'The unit of {name!r} must be given')
+                unit = inv_item.unit
+            quantity = self._get_integer(d, 'quantity', None, 1)
+            try:
+                price = utils.parse_dollars(str(d.get('price')))
+            except ValueError:
+                raise ValueError(f'The price of {name!r} must be '
+                                 'an amount of dollars') from None
+            if price < 0:
+                raise ValueError(f'The price of {name!r} cannot be negative')
+            items.append(Item(name, quantity, str(unit), price))
+            total += price
+
+        if total > business.balance:
+            raise ValueError('Cannot afford {} with a balance of {}'.format(
+                utils.format_dollars(total),
+                utils.format_dollars(business.balance)))
+
+        with manager.record(f'Buy {utils.human_join(items)}') as entry:
+            for item in items:
+                entry.touch(inv, item.name)
+            bought = business.buy_items(items)
+        return {'bought': bought, 'balance': business.balance}
+
+    def post_save(self, data: dict) -> dict:
+        self.manager.save_business()
+        return {'saved': self.manager.filepath}
+
+    def post_step(self, data: dict) -> dict:
+        months = self._get_integer(data, 'months', 1, 1, self.MAX_STEP_MONTHS)
+        business = self.manager.business
+        business.step(weeks=4 * months)
+        # Past changes can no longer be reverted reliably
+        self.manager.journal.clear()
+        return self.get_balance({})
+
+
+class _ManagerRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Dispatches requests to the endpoints of a ManagerServer."""
+    # Keep connections alive between requests
+    protocol_version = 'HTTP/1.1'
+    # Send the headers and body without waiting for an acknowledgement
+    disable_nagle_algorithm = True
+    server: ManagerServer
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        if url.path not in self.server.get_routes:
+            return self._respond_not_found()
+        query = dict(urllib.parse.parse_qsl(url.query))
+        self._respond(lambda: self.server.handle_get(url.path, query))
+
+    def do_POST(self):
+        url = urllib.parse.urlsplit(self.path)
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            if length < 0:
+                raise ValueError
+        except ValueError:
+            # The end of the body is unknown, so the connection
+            # cannot be reused
+            self.close_connection = True
+            return self._send(400, self.server.encode(
+                {'error': 'Content-Length must be a non-negative integer'}))
+        raw = self.rfile.read(length) if length else b''
+        if url.path not in self.server.post_routes:
+            return self._respond_not_found()
+
+        def handle():
+            try:
+                data = json.loads(raw) if raw else {}
+            except ValueError:
+                raise ValueError('The body must be JSON') from None
+            if not isinstance(data, dict):
+                raise ValueError('The body must be a JSON object')
+            return self.server.handle_post(url.path, data)
+
+        self._respond(handle)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _respond(self, handle: Callable[[], bytes]):
+        try:
+            body, status = handle(), 200
+        except ValueError as e:
+            body, status = self.server.encode({'error': str(e)}), 400
+        except Exception as e:
+            traceback.print_exception(type(e), e, e.__traceback__)
+            body, status = self.server.encode(
+                {'error': 'An error occurred while handling the request'}), 500
+        self._send(status, body)
+
+    def _respond_not_found(self):
+        self._send(404, self.server.encode(
+            {'error': f'Unknown endpoint: {self.command} {self.path}'}))
+
+    def _send(self, status: int, body: bytes):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
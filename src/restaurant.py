@@ -1,14 +1,16 @@
-import collections
+import concurrent.futures
 import decimal
 from dataclasses import dataclass, field
 import math
 import numbers
 import random
-from typing import Optional, Dict, Tuple
+from typing import ClassVar, Optional, Dict, List, Tuple, Union
 
 from .business import Business
 from .dishmenu import DishMenu
 from .dish import Dish
+from .item import Item
+from .restockpolicy import RestockPolicy
 from .transactiontype import TransactionType
 
 __all__ = ['Restaurant']
@@ -20,11 +22,26 @@ class Restaurant(Business):
     Args:
         dishes (Optional[DishMenu]):
             The list of dishes.
+        restock_policy (Optional[RestockPolicy]):
+            If provided, ingredients are bought automatically every month
+            according to this policy.
 
     """
     dishes: DishMenu = field(default_factory=DishMenu)
+    restock_policy: Optional[RestockPolicy] = None
+
+    STATS_PHASES: ClassVar[Tuple[str, ...]] = Business.STATS_PHASES + (
+        'update_sales', 'restock', 'update_expenses'
+    )
+
+    # The number of threads update_expenses() uses to sell independent
+    # groups of dishes
+    ALLOCATION_WORKERS: ClassVar[int] = 1
 
     _MISSING = object()
+    # The bill of materials, its version, the stock and the table
+    # last used by producible_table()
+    _producible_cache = None
 
     @staticmethod
     def func_popularity(dollars: numbers.Rational) -> float:
@@ -107,16 +124,187 @@ class Restaurant(Business):
             raise e
 
 
+    def _fork_fields(self) -> dict:
+        fields = super()._fork_fields()
+        fields['dishes'] = self.dishes.fork()
+        if self.restock_policy is not None:
+            fields['restock_policy'] = self.restock_policy.copy()
+        return fields
+
+    def _own_fork_fields(self):
+        super()._own_fork_fields()
+        self.dishes._own_all()
+
+    def _memory_components(self) -> dict:
+        components = super()._memory_components()
+        components['dishes'] = self.dishes
+        return components
+
     def generate_metadata(self):
         super().generate_metadata()
         if self.metadata.get('popularity') is None:
             self.update_popularity()
 
+    def max_producible(self, dish: Union[Dish, str]) -> Optional[int]:
+        """Return the number of a dish that could be made from
+        the inventory if it was the only dish made.
+
+        Args:
+            dish (Union[Dish, str]): The dish or its name.
+
+        Returns:
+            int
+            None: The dish has no ingredients.
+
+        Raises:
+            KeyError: The dish is not on the menu.
+
+        """
+        return self._producible()[getattr(dish, 'name', dish)]
+
     def on_next_month(self):
         super().on_next_month()
         self.update_sales()
+        self.restock()
         self.update_expenses()
 
+    def producible_table(self) -> Dict[str, Optional[int]]:
+        """Return the number of each dish that could be made from
+        the inventory if it was the only dish made.
+
+        The table is kept between calls and only the dishes using
+        ingredients whose quantity changed since the last call
+        are recomputed.
+
+        Returns:
+            Dict[str, Optional[int]]: The number of each dish by name,
+                or None for dishes without ingredients.
+
+        """
+        return self._producible().copy()
+
+    def _producible(self) -> Dict[str, Optional[int]]:
+        """Return producible_table() without copying it."""
+        bom = self.dishes.bill_of_materials
+        stock = {item.name: item.quantity
+                 for item in self.inventory.iter_readonly()}
+
+        cache = self._producible_cache
+        if cache is None or cache[0] is not bom or cache[1] != bom.version:
+            table = bom.max_producible(stock)
+        else:
+            table, old_stock = cache[3], cache[2]
+            if stock != old_stock:
+                changed = [name for name in old_stock.keys() | stock.keys()
+                           if old_stock.get(name) != stock.get(name)]
+                bom.update_producible(table, stock, changed)
+
+        self._producible_cache = (bom, bom.version, stock, table)
+        return table
+
+    def projected_income(self, weeks: int) -> List[decimal.Decimal]:
+        """Return the expected change in balance in each of the next
+        weeks, not counting loan payments.
+
+        Every month the current sales of each dish are expected to be
+        made, and the restock policy is expected to buy what it would
+        order right now.
+
+        """
+        income = super().projected_income(weeks)
+        monthly = sum((d.revenue for d in self.dishes if d.sales),
+                      decimal.Decimal())
+        if self.restock_policy is not None:
+            # Order from a copy so the policy doesn't remember prices
+            order = self.restock_policy.copy().order(self)
+            monthly -= sum((item.price for item in order), decimal.Decimal())
+
+        if monthly:
+            # Sales are made at the end of each month
+            for week in range(3 - self.total_weeks % 4, weeks, 4):
+                income[week] += monthly
+        return income
+
+    def restock(self) -> List[Item]:
+        """Buy ingredients according to the restock policy.
+
+        This method is called every month automatically, after
+        the sales are updated and before the dishes are made.
+
+        Returns:
+            List[Item]: The items that were bought.
+
+        """
+        if self.restock_policy is None:
+            return []
+        return self.restock_policy.restock(self)
+
+    def _sell_evenly(self, quotas: Dict[Dish, int]) \
+            -> Tuple[decimal.Decimal, decimal.Decimal, Dict[Dish, int]]:
+        """Sell up to some number of each dish, distributing
+        the ingredients evenly between them.
+
+        Args:
+            quotas (Dict[Dish, int]): The number of each dish to sell.
+
+        Returns:
+            Tuple[decimal.Decimal, decimal.Decimal, Dict[Dish, int]]:
+                The revenue, the value of the ingredients consumed,
+                and the number of each dish sold.
+
+        """
+        bom = self.dishes.bill_of_materials
+        remaining = dict(quotas)
+        sold = dict.fromkeys(quotas, 0)
+        expenses = revenue = decimal.Decimal()
+
+        # The ingredients needed for one of each remaining dish
+        per_round = bom.requirements(
+            dict.fromkeys([d.name for d in remaining], 1))
+
+        def stop(dish):
+            del remaining[dish]
+            for name, q in bom.column(dish.name).items():
+                per_round[name] -= q
+
+        def sell(dish, n):
+            nonlocal expenses, revenue
+            cost = self.sell_dish(dish, n)
+            if cost is None:
+                return False
+            expenses += cost
+            revenue += dish.price * n
+            sold[dish] += n
+            remaining[dish] -= n
+            if not remaining[dish]:
+                stop(dish)
+            return True
+
+        while remaining:
+            # Sell as many whole rounds of one of each remaining dish
+            # as the stock allows
+            rounds = min(remaining.values())
+            for name, needed in per_round.items():
+                if needed <= 0:
+                    continue
+                inv_item = self.inventory.get(name)
+                stock = 0 if inv_item is None else inv_item.quantity
+                rounds = min(rounds, max(stock, 0) // needed)
+
+            if rounds:
+                for dish in list(remaining):
+                    if not sell(dish, rounds):
+                        stop(dish)
+                continue
+
+            # Not enough for a whole round, so sell one of each dish
+            # in turn until their ingredients run out
+            for dish in list(remaining):
+                if not sell(dish, 1):
+                    stop(dish)
+
+        return revenue, expenses, sold
+
     def sell_dish(self, dish: Dish, quantity=1, *, simulate=False) \
             -> Optional[decimal.Decimal]:
         """Try subtracting a dish's items from inventory and update the
@@ -175,7 +363,8 @@ class Restaurant(Business):
         self.metadata['popularity'] = final
         return final
 
-    def update_expenses(self) -> Tuple[decimal.Decimal, decimal.Decimal]:
+    def update_expenses(self, workers: int = None) \
+            -> Tuple[decimal.Decimal, decimal.Decimal]:
         """Update the expenses of all dishes using their current sales.
 
         This method is called every month automatically, so if you need
@@ -190,6 +379,18 @@ class Restaurant(Business):
         the `sales` will be updated to match what could be sold.
         Requirements are distributed evenly across the dishes so two
         dishes with the same requirements won't cause one to have 0 sales.
+        Dishes are sold in as many whole rounds of one of each dish
+        as the inventory allows, using producible_table() to skip
+        dishes that can't be made.
+
+        Only dishes sharing ingredients compete for them, so the menu is
+        split into groups of dishes linked by shared ingredients
+        (see BillOfMaterials.components()) and each group is sold
+        separately.
+
+        Args:
+            workers (Optional[int]): The number of threads used to sell
+                the groups. Defaults to ALLOCATION_WORKERS.
 
         Returns:
             Tuple[decimal.Decimal, decimal.Decimal]:
@@ -197,30 +398,54 @@ class Restaurant(Business):
                 of the ingredients consumed.
 
         """
-        sales: Dict[Dish, int] = collections.Counter()
+        if workers is None:
+            workers = self.ALLOCATION_WORKERS
+        bom = self.dishes.bill_of_materials
+        producible = self._producible()
+
+        # Dishes that can't be made at all are skipped, and no dish
+        # can sell more than it could if it was the only dish made
+        quotas: Dict[str, int] = {}
+        dishes: Dict[str, Dish] = {}
         for d in self.dishes:
             d: Dish
-            sales[d] = d.sales
             d.expenses_items = [i.copy(quantity=0, price=0) for i in d.items]
-
+            dishes[d.name] = d
+            n = d.sales or 0
+            limit = producible[d.name]
+            if limit is not None:
+                n = min(n, limit)
+            if n > 0:
+                quotas[d.name] = n
+
+        groups = []
+        for component in bom.components():
+            group = {dishes[name]: quotas[name]
+                     for name in component if name in quotas}
+            if group:
+                groups.append(group)
+
+        if workers > 1 and len(groups) > 1:
+            # Groups share no ingredients, so they can be sold at the same
+            # time once the inventory items are no longer shared with
+            # a fork (see InventoryBase.fork())
+            for name in bom.ingredients:
+                self.inventory.get(name)
+            with concurrent.futures.ThreadPoolExecutor(workers) as pool:
+                results = list(pool.map(self._sell_evenly, groups))
+        else:
+            results = map(self._sell_evenly, groups)
+
+        sold: Dict[Dish, int] = {}
         expenses = revenue = decimal.Decimal()
-        while any(s > 0 for s in sales.values()):
-            insufficient = []
-
-            for k, v in sales.items():
-                cost = self.sell_dish(k)
+        for group_revenue, group_expenses, group_sold in results:
+            revenue += group_revenue
+            expenses += group_expenses
+            sold.update(group_sold)
 
-                if cost is not None:
-                    sales[k] -= 1
-                    expenses += cost
-                    revenue += k.price
-                else:
-                    # Cannot sell any more of this dish
-                    k.sales -= v
-                    insufficient.append(k)
-
-            for dish in insufficient:
-                del sales[dish]
+        for dish in dishes.values():
+            if dish.sales:
+                dish.sales = sold.get(dish, 0)
 
         self.deposit('Dish Sales', revenue, TransactionType.SALES)
 
@@ -247,6 +472,12 @@ class Restaurant(Business):
         num_dishes = len(self.dishes)
         randomness = random.uniform(0.81, 0.86)
 
+        # The cost of each dish at the average unit prices in inventory
+        unit_prices = {item.name: item.price / item.quantity
+                       for item in self.inventory.iter_readonly()
+                       if item.quantity}
+        costs = self.dishes.bill_of_materials.costs(unit_prices)
+
         i = 0
         dish: Dish
         for dish in self.dishes:
@@ -262,10 +493,7 @@ class Restaurant(Business):
             hour_factor = (open_hours + 171) / 180
             # Factor in the cost of the materials needed to create the item
             # with a logistic function
-            cost_price_ratio = float(
-                self.cost_of_dish(dish, 1, average=True, default=0)
-                / dish.price
-            )
+            cost_price_ratio = float((costs[dish.name] or 0) / dish.price)
             cost_factor = 0.2 / (1 + math.e ** (-20 * cost_price_ratio)) - 0.1
             # Decaying exponential function
             dish.sales = max(0, int(
@@ -279,9 +507,12 @@ class Restaurant(Business):
         return i
 
     @classmethod
-    def _from_dict_deserialize(cls, d: dict):
-        d = super()._from_dict_deserialize(d)
+    def _from_dict_deserialize(cls, d: dict, **kwargs):
+        d = super()._from_dict_deserialize(d, **kwargs)
         dishes = d.get('dishes')
         if dishes is not None:
             d['dishes'] = DishMenu.from_list(dishes)
+        restock_policy = d.get('restock_policy')
+        if restock_policy is not None:
+            d['restock_policy'] = RestockPolicy.from_dict(restock_policy)
         return d
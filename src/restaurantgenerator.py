@@ -0,0 +1,234 @@
+"""This provides a seeded generator of synthetic restaurants for load and
+scale testing."""
+from dataclasses import dataclass
+import decimal
+import random
+import sys
+from typing import List, Optional
+
+from .dish import Dish
+from .dishmenu import DishMenu
+from .inventory import Inventory
+from .inventoryitem import InventoryItem
+from .inventoryitementry import InventoryItemEntry
+from .item import Item
+from .loanmenu import LoanMenu
+from .loanpaybacktype import LoanPaybackType
+from .restaurant import Restaurant
+from .transaction import Transaction
+from .transactiontype import TransactionType
+from .utils import plural
+
+__all__ = ['RestaurantGenerator']
+
+
+@dataclass
+class RestaurantGenerator:
+    """Generates restaurants of a configurable size.
+
+    The same seed and settings always generate the same restaurant:
+        >>> gen = RestaurantGenerator(seed=1, dishes=1000, history_weeks=480)
+        >>> restaurant = gen.generate()
+        >>> gen.save('large.sav')
+
+    Ingredients are shared between dishes with a skewed distribution,
+    so a few staple ingredients are used by many dishes like in
+    a real menu.
+
+    Args:
+        seed (Optional[int]): The seed for the random number generator.
+        dishes (int): The number of dishes on the menu.
+        ingredients (Optional[int]): The number of distinct ingredients.
+            Defaults to half the number of dish ingredients in total.
+        ingredients_per_dish (int): The number of ingredients in each dish.
+        lots_per_item (int): The number of price lots for each
+            inventory item.
+        loans (int): The number of active loans.
+        loan_offers (int): The number of loans offered by banks.
+            Once every bank offers every kind of loan, the names repeat
+            with a number, so any number can be generated.
+        history_weeks (int): The number of weeks of transaction history.
+        purchases_per_month (int): The number of purchases made
+            each month of history.
+        employees (int): The number of employees.
+        balance (decimal.Decimal): The balance of the restaurant
+            before its history.
+        loan_menu_refresh (bool): Replace some of the loan offers
+            every month, seeded from the generator's seed.
+
+    """
+    seed: Optional[int] = None
+    dishes: int = 20
+    ingredients: Optional[int] = None
+    ingredients_per_dish: int = 4
+    lots_per_item: int = 3
+    loans: int = 0
+    loan_offers: int = 8
+    history_weeks: int = 0
+    purchases_per_month: int = 10
+    employees: int = 10
+    balance: decimal.Decimal = decimal.Decimal(100000)
+    loan_menu_refresh: bool = False
+
+    UNITS = ('gram', 'millilitre', 'piece')
+
+    def _generate_dishes(self, rng: random.Random,
+                         inventory: List[InventoryItem]) -> DishMenu:
+        count = len(inventory)
+        per_dish = min(self.ingredients_per_dish, count)
+        # Zipf-like weights so that low indices act as staples
+        weights = [1 / (i + 1) for i in range(count)]
+        cum_weights = []
+        total = 0
+        for w in weights:
+            total += w
+            cum_weights.append(total)
+
+        dishes = []
+        for i in range(self.dishes):
+            chosen = set()
+            while len(chosen) < per_dish:
+                chosen.update(rng.choices(range(count), cum_weights=cum_weights,
+                                          k=per_dish - len(chosen)))
+
+            items = []
+            cost = decimal.Decimal()
+            for j in sorted(chosen):
+                inv_item = inventory[j]
+                quantity = rng.randint(1, 250)
+                items.append(Item(inv_item.name, quantity, inv_item.unit))
+                cost += quantity * inv_item.price / inv_item.quantity
+
+            # Mark up the cost of ingredients by 2-4 times
+            price = cost * rng.randint(200, 400) / 100
+            price = min(max(decimal.Decimal(1), price), decimal.Decimal(200))
+            dish = Dish(f'Dish {i + 1}', items,
+                        price.quantize(decimal.Decimal('0.01')))
+            dish.sales = rng.randint(0, 50)
+            dishes.append(dish)
+
+        return DishMenu(dishes)
+
+    def _generate_history(self, rng: random.Random, restaurant: Restaurant) \
+            -> List[Transaction]:
+        cent = decimal.Decimal('0.01')
+        inventory = restaurant.inventory.to_list()
+        loans = list(restaurant.loans)
+        monthly_revenue = sum(d.price * d.sales for d in restaurant.dishes)
+
+        loan_titles = [
+            sys.intern(f'{str(loan.payback_type).capitalize()} payment for {loan}')
+            for loan in loans
+        ]
+
+        transactions = []
+        append = transactions.append
+        for week in range(1, self.history_weeks + 1):
+            for loan, title in zip(loans, loan_titles):
+                if week % loan.payback_type == 0:
+                    append(Transaction(
+                        title, -loan.normal_payment, week,
+                        TransactionType.LOAN))
+            if week % 4:
+                continue
+
+            for _ in range(self.purchases_per_month):
+                inv_item = rng.choice(inventory)
+                quantity = rng.randint(1, 100) * 100
+                price = (quantity * inv_item.price / inv_item.quantity
+                         ).quantize(cent)
+                append(Transaction(
+                    f'{quantity:,} {plural(inv_item.unit)} of {inv_item.name}',
+                    -price, week, TransactionType.PURCHASE))
+
+            revenue = monthly_revenue * rng.randint(80, 120) / 100
+            append(Transaction('Dish Sales', revenue.quantize(cent), week,
+                               TransactionType.SALES))
+
+        return transactions
+
+    def _generate_inventory(self, rng: random.Random) -> List[InventoryItem]:
+        count = self.ingredients
+        if count is None:
+            count = max(self.ingredients_per_dish,
+                        self.dishes * self.ingredients_per_dish // 2)
+
+        inventory = []
+        for i in range(count):
+            # Between $0.50 and $50 per thousand units
+            base = rng.randint(5, 500)
+            entries = {}
+            for _ in range(self.lots_per_item):
+                # Unit prices vary by up to 20% between lots
+                price = decimal.Decimal(
+                    base * rng.randint(80, 120)) / 10 ** 6
+                entry = entries.get(price)
+                quantity = rng.randint(1, 100) * 1000
+                if entry is not None:
+                    entry.quantity += quantity
+                else:
+                    entries[price] = InventoryItemEntry(quantity, price)
+            inventory.append(InventoryItem(
+                f'Ingredient {i + 1}', rng.choice(self.UNITS),
+                entries.values()
+            ))
+
+        return inventory
+
+    def _generate_loans(self, rng: random.Random) -> LoanMenu:
+        loans = []
+        for loan in LoanMenu.from_random(self.loans, rng):
+            if loan.is_subsidy:
+                loan = loan.copy(term=rng.randint(1, 10))
+            elif loan.term is None:
+                loan = loan.copy(term=rng.randint(1, 10))
+            if loan.payback_type is None:
+                loan = loan.copy(payback_type=rng.choice(
+                    (LoanPaybackType.MONTHLY, LoanPaybackType.ANNUALLY)))
+            loan.reset_remaining_weeks()
+            loan.remaining_weeks -= min(self.history_weeks,
+                                        loan.remaining_weeks - 1)
+            loans.append(loan)
+        return LoanMenu(loans)
+
+    def generate(self) -> Restaurant:
+        """Generate a new restaurant."""
+        rng = random.Random(self.seed)
+
+        inventory = self._generate_inventory(rng)
+        dishes = self._generate_dishes(rng, inventory)
+
+        restaurant = Restaurant(
+            balance=decimal.Decimal(self.balance),
+            inventory=Inventory(inventory),
+            employee_count=self.employees,
+            loans=self._generate_loans(rng),
+            total_weeks=self.history_weeks,
+            dishes=dishes
+        )
+        restaurant.metadata['loan_menu'] = LoanMenu.from_random(
+            self.loan_offers, rng)
+
+        history = self._generate_history(rng, restaurant)
+        # The transactions may be a list or a Ledger
+        restaurant.transactions.clear()
+        restaurant.transactions.append(
+            Transaction('Initial balance', restaurant.balance, 0))
+        restaurant.transactions.extend(history)
+        restaurant.balance += sum(t.dollars for t in history)
+
+        if self.loan_menu_refresh:
+            restaurant.enable_loan_menu_refresh(rng.getrandbits(32))
+        restaurant.generate_metadata()
+        return restaurant
+
+    def save(self, filepath: str, *, compressed=False) -> Restaurant:
+        """Generate a new restaurant and save it to a file.
+
+        Returns:
+            Restaurant
+
+        """
+        restaurant = self.generate()
+        restaurant.to_file(filepath, compressed=compressed)
+        return restaurant
@@ -1,4 +1,4 @@
-from typing import Optional, Union
+from typing import Iterable, List, Optional, Union
 
 from .cliutils import input_boolean, input_integer, input_money, is_integer
 from .dish import Dish
@@ -6,7 +6,7 @@ from .inventoryitem import InventoryItem
 from .item import Item
 from .inventory import Inventory
 from .manager import (Manager, ManagerCLIBase, ManagerCLIMain,
-                      ManagerCLISubCMDBase)
+                      ManagerCLISubCMDBase, ManagerScript)
 from .restaurant import Restaurant
 from . import utils
 
@@ -54,6 +54,10 @@ class RestaurantManager(Manager):
             description += "Last month's sales: N/A\n"
 
         if dish.items:
+            producible = self.business.max_producible(dish)
+            if producible is not None:
+                description += 'Can be made from inventory: {:,}\n'.format(
+                    producible)
             description += 'Ingredients:\n- ' + '\n- '.join([
                 str(i) for i in dish.items])
 
@@ -92,12 +96,16 @@ class RestaurantManager(Manager):
     def add_dish(self, *args, **kwargs) -> Dish:
         """Helper function for adding a dish."""
         dish = Dish(*args, **kwargs)
-        self.business.dishes.add(dish)
+        with self.record(f'Add {dish}') as entry:
+            entry.touch(self.business.dishes, dish.name)
+            self.business.dishes.add(dish)
         return dish
 
     def remove_dish(self, dish: Dish):
         """Remove a dish from the restaurant."""
-        self.business.dishes.remove(dish.name)
+        with self.record(f'Remove {dish}') as entry:
+            entry.touch(self.business.dishes, dish.name)
+            self.business.dishes.remove(dish.name)
 
     def get_dish(self, s: Union[int, str]) -> Dish:
         """Lookup a Dish by index or name.
@@ -127,6 +135,9 @@ class RestaurantManager(Manager):
 
         RestaurantManagerCLIMain(self).cmdloop()
 
+    def run_script(self, lines: Iterable[str]) -> int:
+        return RestaurantManagerScript(self).run(lines)
+
 
 class RestaurantManagerCLIBase(ManagerCLIBase):
     def __getattr__(self, item: str):
@@ -229,6 +240,7 @@ class RestaurantManagerCLIDishes(RestaurantManagerCLIBase, ManagerCLISubCMDBase)
                 if not unit:
                     return False
                 inv_item = Item(item_name, 0, unit)
+                entry.touch(inv, item_name)
                 inv.add(inv_item)
 
             quantity = input_integer(
@@ -243,37 +255,42 @@ class RestaurantManagerCLIDishes(RestaurantManagerCLIBase, ManagerCLISubCMDBase)
             return Item(item_name, quantity, unit)
 
         def cancel():
+            # Discard any items added to the inventory
+            self.manager.journal.rollback()
             print('Cancelled creation.')
 
         business = self.manager.business
         inv: Inventory = business.inventory
 
-        name = input('What is the name of your new dish? ').strip()
-        if not name:
-            return cancel()
-
-        # Input items
-        requirements = []
-        print('What items does your dish use?')
-        i = 1
-        item = input_item()
-        while item is not None:
-            if isinstance(item, Item):
-                requirements.append(item)
-                i += 1
-            item = input_item()
-        if item is None and i == 1:
-            return cancel()
-
-        dish = Dish(name, items=requirements)
-        cost = business.cost_of_dish(dish, 1, average=True, default=None)
-        if cost is not None:
-            print('Estimated cost of dish (based on current inventory):',
-                  utils.format_dollars(cost))
-        dish.price = input_money('How much should this dish cost? $', minimum=0)
+        with self.manager.record('Add dish') as entry:
+            name = input('What is the name of your new dish? ').strip()
+            if not name:
+                return cancel()
+            entry.description = f'Add {name}'
 
-        # Add dish
-        business.dishes.add(dish)
+            # Input items
+            requirements = []
+            print('What items does your dish use?')
+            i = 1
+            item = input_item()
+            while item is not None:
+                if isinstance(item, Item):
+                    requirements.append(item)
+                    i += 1
+                item = input_item()
+            if item is None and i == 1:
+                return cancel()
+
+            dish = Dish(name, items=requirements)
+            cost = business.cost_of_dish(dish, 1, average=True, default=None)
+            if cost is not None:
+                print('Estimated cost of dish (based on current inventory):',
+                      utils.format_dollars(cost))
+            dish.price = input_money('How much should this dish cost? $', minimum=0)
+
+            # Add dish
+            entry.touch(business.dishes, dish.name)
+            business.dishes.add(dish)
         print('Your dish has been created!')
 
     def do_list(self, arg):
@@ -335,3 +352,50 @@ Usage: show [name_or_index]"""
 
         print(dish)
         print(self.manager.describe_dish(dish))
+
+
+class RestaurantManagerScript(ManagerScript):
+    """Runs scripts against a restaurant, adding commands for dishes:
+        dishes add Latte 4.50 "Coffee Beans" 20 Milk 200
+        dishes remove Latte
+
+    """
+    manager: RestaurantManager
+
+    def cmd_dishes_add(self, args: List[str]):
+        """dishes add <name> <price> <item> <quantity> [<item> <quantity>...]
+
+        The items must already be in the inventory.
+
+        """
+        usage = ('dishes add <name> <price> <item> <quantity> '
+                 '[<item> <quantity>...]')
+        if len(args) < 4 or len(args) % 2:
+            raise ValueError(f'Usage: {usage}')
+        business = self.manager.business
+        name = args[0]
+        if name in business.dishes:
+            raise ValueError(f'The dish {name!r} already exists')
+        price = self._parse_money(args[1])
+
+        items = {}
+        for item_name, quantity in zip(args[2::2], args[3::2]):
+            inv_item = business.inventory.get(item_name)
+            if inv_item is None:
+                raise ValueError(f'{item_name!r} must be added to '
+                                 'the inventory first')
+            if item_name in items:
+                raise ValueError(f'{item_name!r} is used more than once')
+            items[item_name] = Item(
+                item_name, self._parse_integer(quantity, minimum=1),
+                inv_item.unit)
+
+        self.manager.add_dish(name, items=list(items.values()), price=price)
+
+    def cmd_dishes_remove(self, args: List[str]):
+        """dishes remove <name_or_index>"""
+        self._check_args(args, 'dishes remove <name_or_index>', 1)
+        dish = self.manager.get_dish(args[0])
+        if dish is None:
+            raise ValueError(f'Could not find the dish {args[0]!r}')
+        self.manager.remove_dish(dish)
@@ -0,0 +1,238 @@
+"""This provides policies for automatically restocking a restaurant's
+inventory every month."""
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, field, replace
+import decimal
+import math
+from typing import ClassVar, Dict, List, Tuple
+
+from .item import Item
+
+__all__ = ['ForecastPolicy', 'ReorderPointPolicy', 'RestockPolicy']
+
+
+@dataclass
+class RestockPolicy(ABC):
+    """The base class for restock policies.
+
+    A restaurant with a policy restocks every month after its sales are
+    updated and before the dishes are made, so the ingredients bought
+    can be used in the same month. Subclasses decide how much of each
+    ingredient is needed by implementing quantities().
+
+    Ingredients are bought at their average unit price in the inventory.
+    If an ingredient has run out, the last unit price seen is used.
+    Ingredients that were never seen with a quantity are priced by
+    the dishes using them, from what the ingredient cost them last month
+    or from the dish's own price for the ingredient. Ingredients without
+    any price are not bought.
+
+    Usage:
+        >>> restaurant.restock_policy = ReorderPointPolicy(target=2)
+        >>> restaurant.step(weeks=4)
+
+    Args:
+        unit_prices (Dict[str, decimal.Decimal]): The last unit price
+            seen for each ingredient.
+
+    """
+    unit_prices: Dict[str, decimal.Decimal] = field(default_factory=dict)
+
+    # The name used to identify the policy in save files
+    NAME: ClassVar[str] = None
+
+    def copy(self):
+        return replace(self, **{
+            k: v.copy() for k, v in self.__dict__.items()
+            if isinstance(v, (dict, list))
+        })
+
+    @staticmethod
+    def _dish_unit_prices(restaurant) -> Dict[str, decimal.Decimal]:
+        """Return the unit price of each ingredient according to
+        the dishes using it."""
+        prices = {}
+        for dish in restaurant.dishes.iter_readonly():
+            for item in dish.items:
+                if item.quantity > 0 and item.price > 0:
+                    prices.setdefault(item.name, item.price / item.quantity)
+        # What the ingredients cost last month takes precedence
+        for dish in restaurant.dishes.iter_readonly():
+            for item in dish.expenses_items:
+                if item.quantity > 0 and item.price > 0:
+                    prices[item.name] = item.price / item.quantity
+        return prices
+
+    def order(self, restaurant) -> List[Item]:
+        """Return the items this policy would buy for a restaurant
+        without buying them."""
+        inventory = restaurant.inventory
+        unit_prices = self.unit_prices
+        cent = decimal.Decimal('0.01')
+
+        items = []
+        dish_prices = None
+        for name, quantity in self.quantities(restaurant).items():
+            if quantity <= 0:
+                continue
+            inv_item = inventory.get(name)
+            if inv_item is None:
+                continue
+            price = unit_prices.get(name)
+            if price is None:
+                if dish_prices is None:
+                    dish_prices = self._dish_unit_prices(restaurant)
+                price = dish_prices.get(name)
+                if price is None:
+                    continue
+                unit_prices[name] = price
+            items.append(Item(name, quantity, inv_item.unit,
+                              math.ceil(price * quantity * 100) * cent))
+        return items
+
+    @abstractmethod
+    def quantities(self, restaurant) -> Dict[str, int]:
+        """Return the quantity of each ingredient to buy.
+
+        Args:
+            restaurant (Restaurant)
+
+        Returns:
+            Dict[str, int]
+
+        """
+
+    def restock(self, restaurant) -> List[Item]:
+        """Buy the items needed by a restaurant in a single purchase.
+        Items that cannot be paid for are skipped.
+
+        Returns:
+            List[Item]: The items that were bought.
+
+        """
+        items = self.order(restaurant)
+        if not items:
+            return []
+        return restaurant.buy_items(items, all_or_nothing=False)
+
+    def _stock(self, restaurant, names) -> Dict[str, int]:
+        """Return the quantity in stock of some ingredients and
+        remember their unit prices."""
+        inventory = restaurant.inventory
+        unit_prices = self.unit_prices
+
+        stock = {}
+        for name in names:
+            inv_item = inventory.get(name)
+            if inv_item is None:
+                continue
+            quantity = inv_item.quantity
+            if quantity > 0:
+                unit_prices[name] = inv_item.price / quantity
+            stock[name] = quantity
+        return stock
+
+    def to_dict(self):
+        d = asdict(self)
+        d['policy'] = self.NAME
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        """Create a policy of the type named in the dictionary."""
+        d = dict(d)
+        name = d.pop('policy', None)
+        for policy in (ForecastPolicy, ReorderPointPolicy):
+            if policy.NAME == name:
+                return policy(**d)
+        raise ValueError(f'Unknown restock policy: {name!r}')
+
+
+@dataclass
+class ReorderPointPolicy(RestockPolicy):
+    """Restocks an ingredient up to a target level once its stock falls
+    below a reorder point.
+
+    Both levels are multiples of the quantity needed for the month's
+    sales, unless an ingredient has absolute levels in `levels`.
+
+    Args:
+        reorder_point (float): Restock when the stock is below
+            this multiple of the month's requirement.
+        target (float): Restock up to this multiple of the month's
+            requirement.
+        levels (Dict[str, Tuple[int, int]]): The absolute reorder point
+            and target level of specific ingredients.
+
+    """
+    reorder_point: float = 1.
+    target: float = 1.
+    levels: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+
+    NAME: ClassVar[str] = 'reorder_point'
+
+    def quantities(self, restaurant) -> Dict[str, int]:
+        demand = restaurant.dishes.requirements()
+        names = set(demand)
+        names.update(self.levels)
+        stock = self._stock(restaurant, names)
+
+        quantities = {}
+        for name, quantity in stock.items():
+            levels = self.levels.get(name)
+            if levels is not None:
+                reorder_point, target = levels
+            else:
+                needed = demand.get(name, 0)
+                reorder_point = needed * self.reorder_point
+                target = math.ceil(needed * self.target)
+            if quantity < reorder_point and target > quantity:
+                quantities[name] = target - quantity
+        return quantities
+
+
+@dataclass
+class ForecastPolicy(RestockPolicy):
+    """Restocks ingredients to cover a forecast of their use.
+
+    The forecast is an exponential moving average of the quantity
+    of each ingredient needed by the dishes' monthly sales, so a sudden
+    change in sales is only partially followed.
+
+    Args:
+        smoothing (float): The weight of the current month's requirement
+            in the forecast, between 0 and 1.
+        safety_stock (float): The extra stock kept as a fraction
+            of the forecast.
+        forecast (Dict[str, float]): The current forecast of each
+            ingredient.
+
+    """
+    smoothing: float = .5
+    safety_stock: float = .2
+    forecast: Dict[str, float] = field(default_factory=dict)
+
+    NAME: ClassVar[str] = 'forecast'
+
+    def quantities(self, restaurant) -> Dict[str, int]:
+        demand = restaurant.dishes.requirements()
+        forecast = self.forecast
+        a = self.smoothing
+
+        for name in set(forecast).union(demand):
+            needed = demand.get(name, 0)
+            previous = forecast.get(name)
+            value = needed if previous is None else a * needed + (1 - a) * previous
+            if value < 1 and not needed:
+                # The ingredient is no longer used
+                forecast.pop(name, None)
+            else:
+                forecast[name] = value
+
+        quantities = {}
+        stock = self._stock(restaurant, forecast)
+        for name, quantity in stock.items():
+            target = math.ceil(forecast[name] * (1 + self.safety_stock))
+            if target > quantity:
+                quantities[name] = target - quantity
+        return quantities
@@ -0,0 +1,120 @@
+"""This provides a non-interactive way of stepping a restaurant forward,
+intended for projections and throughput runs."""
+import collections
+import contextlib
+import time
+from typing import Dict, Optional
+
+from . import utils
+from .restaurant import Restaurant
+from .restockpolicy import ReorderPointPolicy, RestockPolicy
+from .transactiontype import TransactionType
+
+__all__ = ['Simulation']
+
+
+class Simulation:
+    """Steps a restaurant month by month without user input.
+
+    The restaurant is run with fixed policies: prices, dishes and the
+    number of employees never change and no new loans are taken.
+    If `restock` is True, ingredients are bought every month by
+    `policy`, or by the restaurant's own restock policy if `policy`
+    is not given. A restaurant without a policy uses a ReorderPointPolicy
+    covering each month's sales. The policy in effect is kept in
+    `policy` and only used while stepping, so the restaurant's own
+    policy is left as it was.
+
+    Stats are enabled on the restaurant so the summary includes
+    the time spent in each phase of stepping.
+
+    Usage:
+        >>> sim = Simulation(restaurant)
+        >>> sim.run(months=12)
+        >>> report = sim.summary()
+
+    Args:
+        restaurant (Restaurant)
+        restock (bool): Whether to automatically restock ingredients.
+        policy (Optional[RestockPolicy]): The restock policy to use
+            instead of the restaurant's.
+
+    """
+
+    def __init__(self, restaurant: Restaurant, *, restock=True,
+                 policy: Optional[RestockPolicy] = None):
+        self.restaurant = restaurant
+        self.months = 0
+        # The cumulative wall time spent on each phase in seconds
+        self.timings: Dict[str, float] = collections.defaultdict(float)
+        restaurant.enable_stats()
+
+        if not restock:
+            policy = None
+        elif policy is None:
+            policy = restaurant.restock_policy or ReorderPointPolicy()
+        self.policy: Optional[RestockPolicy] = policy
+
+        self._start_balance = restaurant.balance
+        self._start_weeks = restaurant.total_weeks
+        self._start_transactions = len(restaurant.transactions)
+
+    @contextlib.contextmanager
+    def time(self, phase: str):
+        """Add the time spent inside the context to a phase's timing."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[phase] += time.perf_counter() - start
+
+    def run(self, months: int):
+        """Step the restaurant forward by some number of months."""
+        if months < 0:
+            raise ValueError(f'months ({months}) cannot be negative')
+
+        restaurant = self.restaurant
+        saved_policy = restaurant.restock_policy
+        restaurant.restock_policy = self.policy
+        try:
+            for _ in range(months):
+                with self.time('step'):
+                    restaurant.step(weeks=4)
+                self.months += 1
+        finally:
+            restaurant.restock_policy = saved_policy
+
+    def summary(self) -> dict:
+        """Return a JSON-serializable summary of the simulation."""
+        restaurant = self.restaurant
+        totals = collections.Counter()
+        declined = 0
+        for t in restaurant.transactions[self._start_transactions:]:
+            totals[t.transaction_type] += t.dollars
+            if t.title.startswith('Declined transaction'):
+                declined += 1
+
+        return {
+            'months': self.months,
+            'start': {
+                'date': utils.format_date(self._start_weeks),
+                'balance': str(self._start_balance)
+            },
+            'end': {
+                'date': utils.format_date(restaurant.total_weeks),
+                'balance': str(restaurant.balance)
+            },
+            'revenue': str(totals[TransactionType.SALES]),
+            'purchases': str(-totals[TransactionType.PURCHASE]),
+            'loans': str(totals[TransactionType.LOAN]),
+            'declined_transactions': declined,
+            'dishes': {
+                dish.name: {
+                    'price': str(dish.price),
+                    'sales': dish.sales,
+                    'expenses': str(dish.expenses)
+                } for dish in restaurant.dishes
+            },
+            'timings': dict(self.timings),
+            'phases': restaurant.stats()
+        }
@@ -1,5 +1,7 @@
 from dataclasses import asdict, dataclass, field
 import decimal
+import sys
+from typing import Iterable, List
 
 from . import utils
 from .transactiontype import TransactionType
@@ -7,6 +9,7 @@ from .transactiontype import TransactionType
 __all__ = ['Transaction']
 
 
+@utils.add_slots
 @dataclass
 class Transaction:
     title: str
@@ -24,8 +27,41 @@ class Transaction:
     def to_dict(self):
         return asdict(self)
 
+    @staticmethod
+    def to_table(transactions: Iterable['Transaction']) -> dict:
+        """Convert transactions into a table of columns for saving.
+
+        Each distinct title is only stored once in the "titles" column
+        and the "title" column refers to it by index.
+
+        Returns:
+            dict
+
+        """
+        titles = []
+        title_ids = {}
+        table = {'titles': titles, 'title': [], 'dollars': [],
+                 'week': [], 'transaction_type': []}
+        title_column = table['title']
+        dollars = table['dollars']
+        weeks = table['week']
+        types = table['transaction_type']
+        for t in transactions:
+            title_id = title_ids.get(t.title)
+            if title_id is None:
+                title_id = title_ids[t.title] = len(titles)
+                titles.append(t.title)
+            title_column.append(title_id)
+            dollars.append(t.dollars)
+            weeks.append(t.week)
+            types.append(t.transaction_type)
+        return table
+
     @staticmethod
     def _from_dict_deserialize(d: dict):
+        title = d.get('title')
+        if isinstance(title, str):
+            d['title'] = sys.intern(title)
         transaction_type = d.get('transaction_type')
         if transaction_type is not None:
             d['transaction_type'] = TransactionType(transaction_type)
@@ -34,3 +70,16 @@ class Transaction:
     @classmethod
     def from_dict(cls, d: dict):
         return cls(**cls._from_dict_deserialize(d))
+
+    @classmethod
+    def from_table(cls, table: dict) -> List['Transaction']:
+        """Create transactions from a table made by to_table().
+        Transactions with the same title share the same string."""
+        titles = table['titles']
+        return [
+            cls(titles[title_id], dollars, week,
+                None if type_ is None else TransactionType(type_))
+            for title_id, dollars, week, type_ in zip(
+                table['title'], table['dollars'], table['week'],
+                table['transaction_type'])
+        ]
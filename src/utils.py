@@ -1,11 +1,69 @@
+import collections
+import dataclasses
 import decimal
+import enum
+import sys
+import types
 
 __all__ = [
-    'case_preserving_replace', 'format_cents', 'format_date', 'format_dollars',
-    'format_weeks', 'fuzzy_match_word', 'human_join', 'parse_cents',
-    'parse_decimal', 'parse_dollars', 'plural', 'round_dollars'
+    'add_slots', 'case_preserving_replace', 'deep_sizeof', 'format_bytes', 'format_cents',
+    'format_date', 'format_dollars', 'format_weeks', 'fuzzy_match_word',
+    'human_join', 'parse_cents', 'parse_decimal', 'parse_dollars', 'plural',
+    'round_dollars'
 ]
 
+# Objects that are shared by the whole program and never counted
+# by deep_sizeof()
+_SIZEOF_IGNORED = (type, types.ModuleType, types.FunctionType,
+                   types.BuiltinFunctionType, types.MethodType, enum.Enum)
+
+
+def add_slots(cls):
+    """A class decorator that recreates a dataclass with __slots__.
+
+    Slotted instances have no __dict__, which makes them smaller
+    and their attributes faster to access. This does the same as
+    `dataclass(slots=True)` on Python 3.10+:
+        >>> @add_slots
+        ... @dataclass
+        ... class Point:
+        ...     x: int
+        ...     y: int = 0
+
+    Instances can no longer have attributes other than their fields.
+
+    """
+    if '__slots__' in cls.__dict__:
+        raise TypeError(f'{cls.__name__} already specifies __slots__')
+
+    cls_dict = dict(cls.__dict__)
+    field_names = tuple(f.name for f in dataclasses.fields(cls))
+    cls_dict['__slots__'] = field_names
+    for name in field_names:
+        # Defaults are stored in __init__, the class attributes
+        # would conflict with the slot descriptors
+        cls_dict.pop(name, None)
+    cls_dict.pop('__dict__', None)
+    cls_dict.pop('__weakref__', None)
+
+    new_cls = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+    new_cls.__qualname__ = cls.__qualname__
+
+    if cls.__dataclass_params__.frozen:
+        # The default pickling and copying sets attributes one by one,
+        # which frozen dataclasses do not allow
+        def __getstate__(self):
+            return [getattr(self, name) for name in field_names]
+
+        def __setstate__(self, state):
+            for name, value in zip(field_names, state):
+                object.__setattr__(self, name, value)
+
+        new_cls.__getstate__ = __getstate__
+        new_cls.__setstate__ = __setstate__
+
+    return new_cls
+
 
 def case_preserving_replace(text, target, replacement, count=None):
     """A variant of str.replace that retains casing."""
@@ -25,6 +83,69 @@ def case_preserving_replace(text, target, replacement, count=None):
     return text
 
 
+def deep_sizeof(obj, seen: set = None) -> tuple:
+    """Return the memory used by an object and everything it references.
+
+    Containers, instance dictionaries and slots are followed. Classes,
+    modules, functions and enum members are not counted since they are
+    shared by the whole program.
+
+    Args:
+        obj (object)
+        seen (Optional[set]): The ids of objects that were already counted.
+            This can be shared between calls so that objects referenced
+            from multiple places are only counted once.
+
+    Returns:
+        Tuple[int, int]: The total size in bytes and the number of objects.
+
+    """
+    if seen is None:
+        seen = set()
+
+    size = count = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen or o is None or isinstance(o, _SIZEOF_IGNORED):
+            continue
+        seen.add(id(o))
+        size += sys.getsizeof(o)
+        count += 1
+
+        if isinstance(o, (str, bytes, int, float, decimal.Decimal)):
+            continue
+        elif isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+            continue
+        elif isinstance(o, (list, tuple, set, frozenset, collections.deque)):
+            stack.extend(o)
+            continue
+
+        d = getattr(o, '__dict__', None)
+        if d is not None:
+            stack.append(d)
+        for cls in type(o).__mro__:
+            slots = cls.__dict__.get('__slots__', ())
+            if isinstance(slots, str):
+                slots = (slots,)
+            for name in slots:
+                if name not in ('__dict__', '__weakref__'):
+                    stack.append(getattr(o, name, None))
+
+    return size, count
+
+
+def format_bytes(n: int) -> str:
+    """Format a number of bytes into a human-readable string."""
+    for unit in ('B', 'KiB', 'MiB'):
+        if abs(n) < 1024:
+            return f'{n:,.1f} {unit}' if unit != 'B' else f'{n:,} {unit}'
+        n /= 1024
+    return f'{n:,.1f} GiB'
+
+
 def format_cents(cents: int):
     sign = '-' if cents < 0 else ''
     return '{}${}.{:02d}'.format(sign, abs(cents) // 100, abs(cents) % 100)
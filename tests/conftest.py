@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Import src and main from the repository like `python -m pytest` does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
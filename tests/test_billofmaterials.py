@@ -0,0 +1,118 @@
+import random
+
+import pytest
+
+from src import BillOfMaterials, Dish, Item
+from src import billofmaterials
+
+
+def make_dishes(rng, n, ingredients=15):
+    dishes = []
+    for j in range(n):
+        items = [Item(f'Ingredient {rng.randrange(ingredients)}',
+                      rng.choice((0, 1, 2, 5, 10)), 'gram')
+                 for _ in range(rng.randrange(4))]
+        dishes.append(Dish(f'Dish {j}', items))
+    return dishes
+
+
+def make_stock(rng, ingredients=15):
+    return {f'Ingredient {i}': rng.randrange(-5, 60)
+            for i in range(ingredients) if rng.random() < .9}
+
+
+def brute_force_producible(dish, stock):
+    if not any(i.quantity > 0 for i in dish.items):
+        return None
+    n = 0
+    while True:
+        needed = {}
+        for i in dish.items:
+            if i.quantity > 0:
+                needed[i.name] = needed.get(i.name, 0) + i.quantity * (n + 1)
+        if any(q > stock.get(name, 0) for name, q in needed.items()):
+            return n
+        n += 1
+
+
+def brute_force_components(dishes):
+    """Group dishes by a search over shared ingredients."""
+    names = [d.name for d in dishes]
+    ingredients = {d.name: {i.name for i in d.items} for d in dishes}
+    groups = []
+    seen = set()
+    for name in names:
+        if name in seen:
+            continue
+        group = {name}
+        frontier = [name]
+        while frontier:
+            current = frontier.pop()
+            for other in names:
+                if other not in group \
+                        and ingredients[current] & ingredients[other]:
+                    group.add(other)
+                    frontier.append(other)
+        seen |= group
+        groups.append([n for n in names if n in group])
+    return groups
+
+
+def make_bom(rng):
+    dishes = make_dishes(rng, 30)
+    bom = BillOfMaterials(dishes)
+    # Change the matrix after it was built
+    bom.components()
+    for dish in make_dishes(rng, 8):
+        bom.set_dish(dish)
+        dishes[int(dish.name.split()[1])] = dish
+    for dish in dishes[25:]:
+        bom.remove_dish(dish.name)
+    return bom, dishes[:25]
+
+
+def test_max_producible_matches_brute_force():
+    rng = random.Random(0)
+    for _ in range(30):
+        bom, dishes = make_bom(rng)
+        stock = make_stock(rng)
+        expected = {d.name: brute_force_producible(d, stock) for d in dishes}
+        assert bom.max_producible(stock) == expected
+        subset = [d.name for d in dishes[::3]]
+        assert bom.max_producible(stock, subset) \
+            == {name: expected[name] for name in subset}
+
+
+def test_components_match_brute_force():
+    rng = random.Random(1)
+    for _ in range(30):
+        bom, dishes = make_bom(rng)
+        assert sorted(bom.components()) \
+            == sorted(brute_force_components(dishes))
+
+
+def test_update_producible_matches_max_producible():
+    rng = random.Random(2)
+    bom, dishes = make_bom(rng)
+    stock = make_stock(rng)
+    table = bom.max_producible(stock)
+    for _ in range(20):
+        changed = rng.sample(sorted(stock), 3)
+        for name in changed:
+            stock[name] = rng.randrange(60)
+        bom.update_producible(table, stock, changed)
+        assert table == bom.max_producible(stock)
+
+
+def test_numpy_matches_pure_python(monkeypatch):
+    pytest.importorskip('numpy')
+    rng = random.Random(3)
+    for _ in range(20):
+        bom, dishes = make_bom(rng)
+        stock = make_stock(rng)
+        sales = {d.name: rng.randrange(10) for d in dishes}
+        vectorized = bom.max_producible(stock), bom.requirements(sales)
+        with monkeypatch.context() as m:
+            m.setattr(billofmaterials, 'numpy', None)
+            pure = bom.max_producible(stock), bom.requirements(sales)
+        assert vectorized == pure
@@ -0,0 +1,217 @@
+import decimal
+import io
+import json
+import random
+import sys
+import tracemalloc
+
+from src import (Business, Inventory, Item, JSONEncoder, Journal, Ledger,
+                 Restaurant, RestaurantGenerator, TransactionType)
+from src.inventorybase import InventoryBase
+
+
+def make_restaurant(**kwargs):
+    kwargs.setdefault('seed', 1)
+    kwargs.setdefault('dishes', 8)
+    kwargs.setdefault('history_weeks', 8)
+    return RestaurantGenerator(**kwargs).generate()
+
+
+def dump(business):
+    return json.dumps(business.to_dict(), cls=JSONEncoder, sort_keys=True)
+
+
+def test_fork_does_not_change_original():
+    restaurant = make_restaurant(loans=2)
+    before = dump(restaurant)
+
+    fork = restaurant.fork()
+    random.seed(0)
+    fork.step(weeks=12)
+    item = next(iter(fork.inventory))
+    fork.inventory.remove(item.name)
+    dish = next(iter(fork.dishes))
+    dish.price *= 2
+    fork.dishes.remove(dish.name)
+
+    assert dump(fork) != before
+    assert dump(restaurant) == before
+
+
+def test_fork_steps_like_a_copy():
+    restaurant = make_restaurant(loans=2)
+    f = io.StringIO()
+    restaurant.to_file(f)
+    f.seek(0)
+    copy = Restaurant.from_file(f)
+    copy.generate_metadata()
+
+    fork = restaurant.fork()
+    random.seed(0)
+    fork.step(weeks=12)
+    random.seed(0)
+    copy.step(weeks=12)
+    assert dump(fork) == dump(copy)
+
+
+def test_fork_shares_transactions_until_changed():
+    for ledger in (False, True):
+        restaurant = make_restaurant()
+        if ledger:
+            restaurant.transactions = Ledger(restaurant.transactions)
+        before = list(restaurant.transactions)
+
+        fork = restaurant.fork()
+        assert fork.transactions is restaurant.transactions
+        fork.deposit('Fork deposit', decimal.Decimal(10))
+        assert fork.transactions is not restaurant.transactions
+        assert list(restaurant.transactions) == before
+        assert list(fork.transactions)[:-1] == before
+
+        # The original copies its shared transactions too
+        fork = restaurant.fork()
+        restaurant.deposit('Original deposit', decimal.Decimal(10))
+        assert list(fork.transactions) == before
+        assert isinstance(fork.transactions, Ledger) is ledger
+
+
+def test_undo_on_fork_does_not_change_original():
+    restaurant = make_restaurant()
+    restaurant.deposit('Deposit', decimal.Decimal(10))
+    before = list(restaurant.transactions)
+
+    fork = restaurant.fork()
+    journal = Journal()
+    with journal.record('Deposit', restaurant):
+        restaurant.deposit('Another deposit', decimal.Decimal(10))
+    journal.undo()
+    assert list(restaurant.transactions) == before
+    assert list(fork.transactions) == before
+
+    # Undoing the fork's change must not truncate the original
+    fork = restaurant.fork()
+    with journal.record('Deposit', fork):
+        fork.deposit('Fork deposit', decimal.Decimal(10))
+    journal.undo()
+    journal.redo()
+    assert list(restaurant.transactions) == before
+
+
+def test_buy_items_matches_withdrawals():
+    items = [Item('Flour', 1000, 'gram', decimal.Decimal('12.345')),
+             Item('Milk', 2000, 'millilitre', decimal.Decimal('4.5')),
+             Item('Flour', 500, 'gram', decimal.Decimal('6'))]
+    expected = Business(balance=decimal.Decimal(100), inventory=Inventory())
+    for item in items:
+        expected.withdraw(str(item), item.price, TransactionType.PURCHASE)
+
+    business = Business(balance=decimal.Decimal(100), inventory=Inventory())
+    business.enable_stats()
+    assert business.buy_items(items) == items
+
+    assert business.balance == expected.balance
+    assert business.transactions == expected.transactions
+    assert business.transactions[0].dollars == decimal.Decimal('-12.35')
+    assert all(t.title is sys.intern(t.title) for t in business.transactions)
+    assert business.inventory['Flour'].quantity == 1500
+    assert business.stats()['buy_items']['calls'] == 1
+
+
+def test_buy_items_declined():
+    items = [Item('Flour', 1000, 'gram', decimal.Decimal(60)),
+             Item('Milk', 2000, 'millilitre', decimal.Decimal(60))]
+    business = Business(balance=decimal.Decimal(100), inventory=Inventory())
+    assert business.buy_items(items) == []
+    assert business.balance == 100 - Business.NSF_FEE
+    assert not business.inventory
+
+    business = Business(balance=decimal.Decimal(100), inventory=Inventory())
+    assert business.buy_items(items, all_or_nothing=False) == items[:1]
+    assert business.balance == 40 - Business.NSF_FEE
+    assert [t.dollars for t in business.transactions] == [-60, -Business.NSF_FEE]
+
+
+def test_forecast_shortfall_matches_declined_payment():
+    for seed in range(5):
+        loans = RestaurantGenerator(seed=seed, loans=10).generate().loans
+        business = Business(balance=decimal.Decimal(20000 * (seed + 1)),
+                            loans=loans, total_weeks=seed * 5)
+        shortfall = business.forecast_shortfall(5 * 48)
+        assert shortfall is not None
+        week, payments, balance = shortfall
+
+        fork = business.fork()
+        while not any(t.title.startswith('Declined')
+                      for t in fork.transactions):
+            fork.step(weeks=1)
+        assert fork.total_weeks == week
+        assert business.forecast_shortfall(week - business.total_weeks - 1) \
+            is None
+
+
+def test_memory_report_does_not_trace_fork_copies(monkeypatch):
+    copied_while_tracing = []
+    own, own_all = InventoryBase._own, InventoryBase._own_all
+    own_transactions = Business.own_transactions
+
+    def check(shared):
+        if shared and tracemalloc.is_tracing():
+            copied_while_tracing.append(shared)
+
+    def _own(self, key):
+        check(key in self._shared)
+        own(self, key)
+
+    def _own_all(self):
+        check(bool(self._shared))
+        own_all(self)
+
+    def _own_transactions(self):
+        check(self._transactions_shared)
+        own_transactions(self)
+
+    monkeypatch.setattr(InventoryBase, '_own', _own)
+    monkeypatch.setattr(InventoryBase, '_own_all', _own_all)
+    monkeypatch.setattr(Business, 'own_transactions', _own_transactions)
+
+    restaurant = make_restaurant(loans=2)
+    before = dump(restaurant)
+    random.seed(0)
+    report = restaurant.memory_report(step_weeks=8)
+    assert not copied_while_tracing
+    assert report['step']['weeks'] == 8
+    assert set(report['components']) \
+        == {'ledger', 'inventory', 'loans', 'metadata', 'dishes'}
+    assert dump(restaurant) == before
+
+
+def test_stats_count_phases():
+    restaurant = make_restaurant()
+    before = dump(restaurant)
+    assert restaurant.stats() == {}
+
+    restaurant.enable_stats()
+    random.seed(0)
+    restaurant.step(weeks=48)
+    stats = restaurant.stats()
+    assert stats['step']['calls'] == 1
+    assert stats['on_next_week']['calls'] == 48
+    assert stats['on_next_month']['calls'] == 12
+    assert stats['on_next_year']['calls'] == 1
+    assert stats['update_sales']['calls'] == 12
+    assert all(s['seconds'] >= 0 for s in stats.values())
+    assert stats['step']['seconds'] >= stats['on_next_month']['seconds']
+    # Forks do not inherit the timing wrappers
+    assert not restaurant.fork().stats_enabled
+
+    restaurant.reset_stats()
+    assert restaurant.stats() == {}
+    restaurant.enable_stats(False)
+    assert not restaurant.stats_enabled
+    assert not set(restaurant.STATS_PHASES) & set(vars(restaurant))
+
+    # Stepping is the same with or without stats
+    copy = make_restaurant()
+    random.seed(0)
+    copy.step(weeks=48)
+    assert dump(restaurant) == dump(copy) != before
@@ -0,0 +1,50 @@
+import pstats
+
+from src import CommandProfiler
+
+
+def busy(n):
+    return sum(i * i for i in range(n))
+
+
+def test_commands_in_sub_shells_are_named_by_their_parent():
+    profiler = CommandProfiler()
+    profiler.start_command('finances')
+    for line in ('balance', 'loans list', 'balance'):
+        profiler.start_command(line)
+        profiler.stop_command()
+    profiler.stop_command()
+    profiler.start_command('  inventory  ')
+    profiler.stop_command()
+    # Stopping without a started command is ignored
+    profiler.stop_command()
+
+    assert {name: len(times) for name, times in profiler.latencies.items()} \
+        == {'finances balance': 2, 'finances loans': 1,
+            'finances': 1, 'inventory': 1}
+    assert max(profiler.latencies['finances']) \
+        >= sum(profiler.latencies['finances balance'])
+
+
+def test_summary_and_dump(tmp_path):
+    profiler = CommandProfiler()
+    assert 'No commands were recorded.' in profiler.summary()
+
+    def session():
+        for n in (10, 100000):
+            profiler.start_command(f'busy{n}')
+            busy(n)
+            profiler.stop_command()
+
+    profiler.runcall(session)
+    summary = profiler.summary(top=1)
+    lines = summary.splitlines()
+    assert lines[0] == 'Slowest commands (top 1 by maximum latency):'
+    assert lines[2].startswith('busy100000')
+    assert 'busy10 ' not in summary
+    assert 'Slowest functions (top 1 by cumulative time):' in summary
+
+    filepath = str(tmp_path / 'session.pstats')
+    profiler.dump(filepath)
+    functions = {func for _, _, func in pstats.Stats(filepath).stats}
+    assert 'busy' in functions
@@ -0,0 +1,72 @@
+import decimal
+
+from src import Item, Journal, RestaurantGenerator
+
+
+def make_restaurant():
+    return RestaurantGenerator(seed=1, dishes=6).generate()
+
+
+def names(container):
+    return [item.name for item in container.iter_readonly()]
+
+
+def test_undo_restores_business():
+    restaurant = make_restaurant()
+    journal = Journal()
+    balance = restaurant.balance
+    transactions = len(restaurant.transactions)
+    item = Item('Journal Test Item', 5, 'gram', decimal.Decimal('1.25'))
+
+    with journal.record('Buy item', restaurant) as entry:
+        entry.touch(restaurant.inventory, item.name)
+        restaurant.buy_item(item)
+    assert item.name in restaurant.inventory
+
+    journal.undo()
+    assert item.name not in restaurant.inventory
+    assert restaurant.balance == balance
+    assert len(restaurant.transactions) == transactions
+
+    journal.redo()
+    assert restaurant.inventory[item.name].quantity == 5
+    assert restaurant.balance == balance - decimal.Decimal('1.25')
+    assert len(restaurant.transactions) == transactions + 1
+
+
+def test_undo_removal_keeps_position():
+    restaurant = make_restaurant()
+    journal = Journal()
+    dishes = restaurant.dishes
+    before = names(dishes)
+    removed = [before[1], before[3]]
+
+    with journal.record('Remove dishes', restaurant) as entry:
+        for name in removed:
+            entry.touch(dishes, name)
+            dishes.remove(name)
+    after = names(dishes)
+
+    journal.undo()
+    assert names(dishes) == before
+    journal.redo()
+    assert names(dishes) == after
+    journal.undo()
+    assert names(dishes) == before
+
+
+def test_exception_rolls_back():
+    restaurant = make_restaurant()
+    journal = Journal()
+    inventory = restaurant.inventory
+    before = names(inventory)
+
+    try:
+        with journal.record('Remove item', restaurant) as entry:
+            entry.touch(inventory, before[0])
+            inventory.remove(before[0])
+            raise RuntimeError
+    except RuntimeError:
+        pass
+    assert names(inventory) == before
+    assert journal.undo() is None
@@ -0,0 +1,103 @@
+import decimal
+import random
+
+import pytest
+
+from src import Business, Ledger, Transaction, TransactionType
+from src import ledger as ledger_module
+
+TYPES = list(TransactionType)
+
+
+def make_transactions(n, seed=0):
+    rng = random.Random(seed)
+    return [
+        Transaction(rng.choice(('Dish Sales', 'Coffee', 'Rent')),
+                    decimal.Decimal(rng.randint(-10000, 10000)) / 100,
+                    rng.randint(0, 50), rng.choice(TYPES))
+        for _ in range(n)
+    ]
+
+
+def test_ledger_acts_like_list():
+    transactions = make_transactions(200)
+    ledger = Ledger(transactions)
+    expected = list(transactions)
+    assert list(ledger) == expected
+
+    extra = make_transactions(20, seed=1)
+    ledger.append(extra[0])
+    ledger.extend(extra[1:])
+    ledger.insert(5, extra[3])
+    del ledger[10:20]
+    ledger[0] = extra[4]
+    expected.append(extra[0])
+    expected.extend(extra[1:])
+    expected.insert(5, extra[3])
+    del expected[10:20]
+    expected[0] = extra[4]
+
+    assert len(ledger) == len(expected)
+    assert list(ledger) == expected
+    assert ledger[-1] == expected[-1]
+    assert list(ledger[3:30:2]) == expected[3:30:2]
+
+
+def test_ledger_queries_match_list():
+    transactions = make_transactions(300)
+    business = Business(balance=decimal.Decimal(0),
+                        transactions=list(transactions))
+    ledger_business = Business(balance=decimal.Decimal(0),
+                               transactions=Ledger(transactions))
+
+    for kwargs in ({}, {'after': 20}, {'type_': TransactionType.PURCHASE},
+                   {'after': 10, 'type_': TransactionType.SALES,
+                    'limit': 15},
+                   {'key': lambda t: t.dollars > 0, 'limit': 40}):
+        assert (ledger_business.get_transactions(**kwargs)
+                == business.get_transactions(**kwargs))
+
+    ledger = ledger_business.transactions
+    for after, type_ in ((None, None), (25, None),
+                         (None, TransactionType.PURCHASE),
+                         (5, TransactionType.SALES)):
+        matching = [t for t in transactions
+                    if (after is None or t.week >= after)
+                    and (type_ is None or t.transaction_type == type_)]
+        assert ledger.total(after=after, type_=type_) == (
+            len(matching), sum(t.dollars for t in matching))
+
+
+def test_ledger_table_round_trip():
+    ledger = Ledger(make_transactions(100))
+    assert list(Ledger.from_table(ledger.to_table())) == list(ledger)
+    assert list(Ledger.from_list(ledger.to_list())) == list(ledger)
+
+
+def test_transaction_table_round_trip():
+    transactions = make_transactions(100)
+    table = Transaction.to_table(transactions)
+    loaded = Transaction.from_table(table)
+    assert loaded == transactions
+    # Repeated titles share one string
+    titles = {id(t.title) for t in loaded}
+    assert len(titles) == len({t.title for t in loaded})
+
+
+def test_numpy_matches_pure_python(monkeypatch):
+    pytest.importorskip('numpy')
+    unsorted = Ledger(make_transactions(300))
+    sorted_ = Ledger(sorted(make_transactions(300, seed=1),
+                            key=lambda t: t.week))
+    queries = [(None, None), (25, None), (None, TransactionType.PURCHASE),
+               (5, TransactionType.SALES), (100, None)]
+    for ledger in (unsorted, sorted_, Ledger()):
+        vectorized = [(list(ledger.select(after=after, type_=type_)),
+                       ledger.total(after=after, type_=type_))
+                      for after, type_ in queries]
+        with monkeypatch.context() as m:
+            m.setattr(ledger_module, 'numpy', None)
+            pure = [(list(ledger.select(after=after, type_=type_)),
+                     ledger.total(after=after, type_=type_))
+                    for after, type_ in queries]
+        assert vectorized == pure
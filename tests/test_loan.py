@@ -0,0 +1,128 @@
+import decimal
+import random
+
+from src import Loan, LoanInterestType, LoanPaybackType, RestaurantManager, utils
+
+
+def make_loans(n, seed=0):
+    rng = random.Random(seed)
+    return [
+        Loan(f'Loan {i}', term=rng.randint(1, 10),
+             amount=decimal.Decimal(rng.randint(1000, 500000)),
+             rate=decimal.Decimal(rng.randint(1, 150)) / 1000,
+             interest_type=rng.choice(list(LoanInterestType)),
+             payback_type=rng.choice(list(LoanPaybackType)))
+        for i in range(n)
+    ]
+
+
+def expected_payments(loan):
+    """Calculate the payments without the cached schedule."""
+    balance = loan.amount + Loan.calculate_interest(
+        loan.amount, loan.rate, loan.interest_type, loan.term)
+    num_payments = loan.term * 48 // loan.payback_type
+    normal = utils.round_dollars(balance / num_payments)
+    final = balance % normal or normal
+    return balance, normal, final
+
+
+def test_schedule_matches_loan_terms():
+    for loan in make_loans(200):
+        assert (loan.balance, loan.normal_payment, loan.final_payment) \
+            == expected_payments(loan)
+
+
+def test_schedule_follows_changed_terms():
+    for loan in make_loans(50, seed=1):
+        loan.normal_payment
+        loan.term += 1
+        loan.rate *= 2
+        loan.payback_type = LoanPaybackType.MONTHLY
+        assert (loan.balance, loan.normal_payment, loan.final_payment) \
+            == expected_payments(loan)
+
+        copy = loan.copy(amount=loan.amount * 2)
+        assert copy.balance != loan.balance
+        assert (copy.balance, copy.normal_payment, copy.final_payment) \
+            == expected_payments(copy)
+
+
+def test_setting_terms_invalidates_schedule():
+    loan = make_loans(1, seed=6)[0]
+    changes = {'term': loan.term + 1, 'amount': loan.amount * 2,
+               'rate': loan.rate * 2,
+               'interest_type': next(t for t in LoanInterestType
+                                     if t != loan.interest_type),
+               'payback_type': next(t for t in LoanPaybackType
+                                    if t != loan.payback_type)}
+    assert set(changes) == Loan._SCHEDULE_FIELDS
+    for name, value in changes.items():
+        schedule = loan.schedule
+        setattr(loan, name, value)
+        assert loan.schedule is not schedule, name
+        assert (loan.balance, loan.normal_payment, loan.final_payment) \
+            == expected_payments(loan)
+
+    schedule = loan.schedule
+    loan.remaining_weeks -= 1
+    loan.name = 'Renamed'
+    assert loan.schedule is schedule
+
+
+def test_next_payment():
+    for loan in make_loans(50, seed=2):
+        loan.reset_remaining_weeks()
+        payments = []
+        while loan.remaining_payments > 0:
+            payments.append(loan.get_next_payment())
+            loan.remaining_weeks -= loan.payback_type
+        _, normal, final = expected_payments(loan)
+        assert payments[-1] == final
+        assert all(p == normal for p in payments[:-1])
+
+
+def test_schedule_options_match_copies():
+    terms = (1, 3, 10)
+    payback_types = tuple(LoanPaybackType)
+    for loan in make_loans(20, seed=3):
+        loan.term = loan.payback_type = None
+        options = loan.schedule_options(terms, payback_types)
+        assert list(options) == [(t, p) for t in terms for p in payback_types]
+        for (term, payback_type), schedule in options.items():
+            assert schedule == loan.copy(
+                term=term, payback_type=payback_type).schedule
+
+    loan = make_loans(1, seed=4)[0]
+    assert list(loan.schedule_options(terms, payback_types)) \
+        == [(loan.term, loan.payback_type)]
+    assert loan.copy(term=0).schedule_options(terms, payback_types) == {}
+
+
+def test_describe_loan_options():
+    loans = make_loans(2, seed=5)
+    loans[0].term = loans[0].payback_type = None
+    loans[1].term = 0
+    table = RestaurantManager.describe_loan_options(
+        loans, (1, 2), (LoanPaybackType.MONTHLY, LoanPaybackType.WEEKLY))
+    lines = table.splitlines()
+    # The header, 4 options for the first loan and the subsidy
+    assert len(lines) == 6
+    assert lines[0].split(' : ')[0].strip() == 'Loan'
+    assert all(line.startswith(loans[0].name) for line in lines[1:5])
+    assert 'subsidy' in lines[5]
+    assert len({len(line) for line in lines}) == 1
+
+    table = RestaurantManager.describe_loan_options(
+        loans[:1], (1,), (LoanPaybackType.MONTHLY,))
+    header, row = table.splitlines()
+    assert not header.startswith('Loan')
+    schedule = loans[0].copy(term=1,
+                             payback_type=LoanPaybackType.MONTHLY).schedule
+    assert [v.strip() for v in row.split(' : ')] == [
+        '1 year', str(LoanPaybackType.MONTHLY), f'{schedule.num_payments:,}',
+        utils.format_dollars(schedule.normal_payment),
+        utils.format_dollars(schedule.interest),
+        utils.format_dollars(schedule.balance)]
+
+    assert RestaurantManager.describe_loan_options([], (1,), ()) \
+        == 'There are no loans to compare.'
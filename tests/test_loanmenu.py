@@ -0,0 +1,124 @@
+import decimal
+import random
+
+from src import (Business, BusinessMetrics, LoanMenu, RestaurantGenerator,
+                 TransactionType)
+
+
+def unmet(loan, business):
+    """Check a loan's requirements one by one."""
+    return [r for r in loan.requirements if not r.check(business)]
+
+
+def make_businesses():
+    for seed, employees in ((1, 0), (2, 10), (3, 200)):
+        yield RestaurantGenerator(seed=seed, dishes=5, history_weeks=16,
+                                  employees=employees).generate()
+
+
+def test_index_matches_requirement_checks():
+    menu = LoanMenu.from_random(300, random.Random(0))
+    for business in make_businesses():
+        expected = {loan.name: unmet(loan, business) for loan in menu}
+        actual = menu.evaluate(business)
+        assert {name: sorted(map(str, reqs)) for name, reqs in actual.items()} \
+            == {name: sorted(map(str, reqs)) for name, reqs in expected.items()}
+        assert [loan.name for loan in menu.qualifying(business)] \
+            == [name for name, reqs in expected.items() if not reqs]
+
+
+def test_metrics_are_calculated_once(monkeypatch):
+    calls = []
+    for name in ('get_monthly_revenue', 'get_monthly_expenses'):
+        method = getattr(Business, name)
+
+        def counted(self, method=method, name=name):
+            calls.append(name)
+            return method(self)
+
+        monkeypatch.setattr(Business, name, counted)
+
+    menu = LoanMenu.from_random(300, random.Random(2))
+    business = next(make_businesses())
+    metrics = BusinessMetrics(business)
+    expected = {loan.name: loan.unmet_requirements(metrics) for loan in menu}
+    assert sorted(calls) == ['get_monthly_expenses', 'get_monthly_revenue']
+
+    calls.clear()
+    assert menu.evaluate(business) == expected
+    assert sorted(calls) == ['get_monthly_expenses', 'get_monthly_revenue']
+
+
+def test_index_follows_menu_changes():
+    rng = random.Random(1)
+    menu = LoanMenu.from_random(100, rng)
+    menu.requirement_index
+    for loan in list(menu)[::3]:
+        menu.remove(loan.name)
+    for loan in LoanMenu.from_random(40, rng, taken=menu):
+        menu.add(loan)
+    fork = menu.fork()
+    fork.refresh(.5, rng)
+
+    for business in make_businesses():
+        for m in (menu, fork):
+            assert sorted(loan.name for loan in m.qualifying(business)) \
+                == sorted(loan.name for loan in m
+                          if not unmet(loan, business))
+
+
+def test_refresh_does_not_reuse_taken_names():
+    business = RestaurantGenerator(seed=1, dishes=5, loans=20, loan_offers=20,
+                                   loan_menu_refresh=True).generate()
+    menu = business.metadata['loan_menu']
+    taken = {loan.name for loan in business.loans}
+    for week in range(48):
+        business.total_weeks = week * 4
+        for loan in business.refresh_loan_menu():
+            assert loan.name not in taken
+        names = [loan.name for loan in menu]
+        assert len(names) == len(set(names)) == 20
+
+
+def test_loan_menu_is_only_refreshed_when_enabled():
+    business = RestaurantGenerator(seed=1, dishes=5).generate()
+    names = [loan.name for loan in business.metadata['loan_menu']]
+    assert business.refresh_loan_menu() == []
+    business.on_next_month()
+    assert [loan.name for loan in business.metadata['loan_menu']] == names
+
+    business.enable_loan_menu_refresh(0)
+    assert business.refresh_loan_menu()
+
+
+def test_refreshed_loan_menu_does_not_use_global_random():
+    menus = []
+    for _ in range(2):
+        random.seed()
+        business = RestaurantGenerator(
+            seed=1, dishes=5, loan_menu_refresh=True).generate()
+        for week in range(1, 7):
+            business.total_weeks = week * 4
+            business.refresh_loan_menu()
+        menus.append([loan.name for loan in business.metadata['loan_menu']])
+    assert menus[0] == menus[1]
+
+
+def test_cash_flow_projection_matches_payments():
+    for seed in range(5):
+        loans = RestaurantGenerator(seed=seed, loans=25,
+                                    history_weeks=seed * 7).generate().loans
+        business = Business(balance=decimal.Decimal(10 ** 9),
+                            loans=loans, total_weeks=seed * 7)
+        weeks = 3 * 48
+        projected = business.loans.project_cash_flow(
+            weeks, current_week=business.total_weeks)
+
+        paid = []
+        for _ in range(weeks):
+            start = len(business.transactions)
+            business.step(weeks=1)
+            paid.append(-sum(t.dollars for t in business.transactions[start:]
+                             if t.transaction_type == TransactionType.LOAN))
+        assert projected == paid
+        assert any(paid)
@@ -0,0 +1,76 @@
+import decimal
+import random
+
+from src import (BusinessMetrics, Loan, LoanRequirement,
+                 LoanRequirementIndex, LoanRequirementType)
+
+
+def make_metrics(revenue, expenses, employees):
+    metrics = BusinessMetrics(None)
+    metrics.monthly_revenue = decimal.Decimal(revenue)
+    metrics.monthly_expenses = decimal.Decimal(expenses)
+    metrics.employee_count = employees
+    return metrics
+
+
+def make_loans(rng, n, types=tuple(LoanRequirementType)):
+    def bound():
+        # Few distinct values so bounds often equal the metrics
+        return rng.choice((None, 0, 5, 10, 20))
+
+    loans = []
+    for i in range(n):
+        requirements = [LoanRequirement(rng.choice(types), (bound(), bound()))
+                        for _ in range(rng.randrange(4))]
+        loans.append(Loan(f'Loan {i}', 1, requirements))
+    return loans
+
+
+def expected_unmet(loans, metrics):
+    unmet = {}
+    for loan in loans:
+        reqs = [r for r in loan.requirements if not r.check_metrics(metrics)]
+        if reqs:
+            unmet[loan.name] = reqs
+    return unmet
+
+
+def test_unmet_matches_check_metrics():
+    rng = random.Random(0)
+    for _ in range(50):
+        loans = make_loans(rng, 40)
+        index = LoanRequirementIndex(loans)
+        # Replace and remove some loans after indexing
+        for loan in make_loans(rng, 10):
+            index.add(loan)
+            loans[int(loan.name.split()[1])] = loan
+        for loan in loans[30:]:
+            index.remove(loan.name)
+        loans = loans[:30]
+
+        metrics = make_metrics(*(rng.choice((0, 5, 10, 15, 20))
+                                 for _ in range(3)))
+        assert index.unmet(metrics) == expected_unmet(loans, metrics)
+        assert sorted(index.qualifying(metrics)) == sorted(
+            loan.name for loan in loans
+            if all(r.check_metrics(metrics) for r in loan.requirements))
+
+
+def test_unknown_requirement_type_is_unmet():
+    unknown = 99
+    loans = [
+        Loan('Unknown', 1, [LoanRequirement(unknown, (5, None))]),
+        Loan('Unbounded', 1, [
+            LoanRequirement(LoanRequirementType.EMPLOYEES, (1, None)),
+            LoanRequirement(unknown, (None, None))]),
+        Loan('Known', 1, [
+            LoanRequirement(LoanRequirementType.EMPLOYEES, (1, None))])
+    ]
+    index = LoanRequirementIndex(loans)
+    metrics = make_metrics(0, 0, 3)
+    assert index.unmet(metrics) == expected_unmet(loans, metrics)
+    assert index.qualifying(metrics) == ['Known']
+
+    for loan in loans[:2]:
+        index.remove(loan.name)
+    assert index.unmet(metrics) == {}
@@ -0,0 +1,26 @@
+import json
+
+import main
+from src import Restaurant
+
+
+def simulate(save, report, *args):
+    assert main.main(['simulate', '--save', str(save), '--months', '3',
+                      '--seed', '1', '--report', str(report), *args]) == 0
+    with open(report, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_simulate_columnar_ledger(tmp_path):
+    save = tmp_path / 'restaurant.sav'
+    assert main.main(['generate', str(save), '--seed', '1', '--dishes', '5',
+                      '--history', '8']) == 0
+
+    expected = simulate(save, tmp_path / 'list.json')
+    actual = simulate(save, tmp_path / 'ledger.json', '--columnar-ledger')
+    for report in (expected, actual):
+        del report['timings'], report['phases']
+    assert actual == expected
+    # The storage choice does not leak into other loads
+    assert not Restaurant.COLUMNAR_LEDGER
+    assert isinstance(Restaurant.from_file(str(save)).transactions, list)
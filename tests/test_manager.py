@@ -0,0 +1,46 @@
+import decimal
+
+import pytest
+
+from src import Restaurant, RestaurantManager
+
+SCRIPT = '''\
+setup 50000 4
+# Buy ingredients
+inventory buy "Coffee Beans" 5000 gram 120.00
+inventory buy Milk 10000 millilitre 25.50
+dishes add Latte 4.75 "Coffee Beans" 18 Milk 200
+dishes add Espresso 3.00 "Coffee Beans" 18
+finances employees increase 2
+'''
+
+
+def make_manager(tmp_path):
+    return RestaurantManager(Restaurant(),
+                             filepath=str(tmp_path / 'restaurant.sav'))
+
+
+def test_run_script(tmp_path):
+    manager = make_manager(tmp_path)
+    assert manager.run_script(SCRIPT.splitlines()) == 6
+
+    business = manager.business
+    assert business.balance == decimal.Decimal('49854.50')
+    assert business.employee_count == 6
+    assert business.inventory['Coffee Beans'].quantity == 5000
+    assert [d.name for d in business.dishes] == ['Latte', 'Espresso']
+
+    # Script changes can be undone like commands in the CLI
+    manager.journal.undo()
+    assert business.employee_count == 4
+    manager.journal.undo()
+    assert [d.name for d in business.dishes] == ['Latte']
+
+
+def test_script_errors_have_line_numbers(tmp_path):
+    manager = make_manager(tmp_path)
+    lines = SCRIPT.splitlines() + ['', 'dishes add Mocha 5 Chocolate 30']
+    with pytest.raises(ValueError, match='Line 9'):
+        manager.run_script(lines)
+    with pytest.raises(ValueError, match='Line 1'):
+        make_manager(tmp_path).run_script(['fly away'])
@@ -0,0 +1,115 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+from src import ManagerServer, RestaurantGenerator, RestaurantManager
+
+
+@pytest.fixture
+def server(tmp_path):
+    restaurant = RestaurantGenerator(seed=1, dishes=5, history_weeks=8,
+                                     loans=2).generate()
+    manager = RestaurantManager(restaurant,
+                                filepath=str(tmp_path / 'restaurant.sav'))
+    server = ManagerServer(manager, ('127.0.0.1', 0))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def request(server, method, path, data=None):
+    conn = http.client.HTTPConnection(*server.server_address[:2], timeout=10)
+    try:
+        body = None if data is None else json.dumps(data)
+        conn.request(method, path, body)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+
+def test_get_endpoints(server):
+    business = server.manager.business
+    status, data = request(server, 'GET', '/balance')
+    assert status == 200
+    assert data['balance'] == str(business.balance)
+    assert data['week'] == business.total_weeks
+
+    status, data = request(server, 'GET', '/dishes')
+    assert [d['name'] for d in data['dishes']] \
+        == [d.name for d in business.dishes]
+
+    status, data = request(server, 'GET', '/transactions?limit=3&offset=1')
+    assert data['total'] == len(business.transactions)
+    assert [t['title'] for t in data['transactions']] \
+        == [t.title for t in business.transactions[-2:-5:-1]]
+
+    status, data = request(server, 'GET', '/nothing')
+    assert status == 404
+
+
+def test_buy_and_step(server):
+    business = server.manager.business
+    item = next(iter(business.inventory))
+    quantity = item.quantity
+    status, data = request(server, 'POST', '/buy', {'items': [
+        {'name': item.name, 'quantity': 100, 'price': '5.00'}]})
+    assert status == 200
+    assert business.inventory[item.name].quantity == quantity + 100
+
+    # The cached balance is replaced after a change
+    status, before = request(server, 'GET', '/balance')
+    status, data = request(server, 'POST', '/step', {'months': 2})
+    assert status == 200
+    assert data['week'] == before['week'] + 8
+    assert request(server, 'GET', '/balance')[1] == data
+
+
+def test_invalid_requests(server):
+    week = server.manager.business.total_weeks
+    status, data = request(server, 'POST', '/step',
+                           {'months': ManagerServer.MAX_STEP_MONTHS + 1})
+    assert status == 400
+    assert 'months' in data['error']
+    assert server.manager.business.total_weeks == week
+
+    status, data = request(server, 'POST', '/buy', {'items': []})
+    assert status == 400
+    status, data = request(server, 'GET', '/transactions?limit=0')
+    assert status == 400
+
+
+def test_invalid_content_length(server):
+    for length in ('abc', '-1'):
+        conn = http.client.HTTPConnection(*server.server_address[:2],
+                                          timeout=10)
+        try:
+            conn.putrequest('POST', '/step')
+            conn.putheader('Content-Length', length)
+            conn.endheaders()
+            response = conn.getresponse()
+            assert response.status == 400
+            assert 'Content-Length' in json.loads(response.read())['error']
+        finally:
+            conn.close()
+
+
+def test_buy_without_balance(server):
+    business = server.manager.business
+    business.balance = None
+    item = next(iter(business.inventory))
+    status, data = request(server, 'POST', '/buy', {'items': [
+        {'name': item.name, 'quantity': 1, 'price': '1.00'}]})
+    assert status == 400
+    assert 'balance' in data['error']
+
+
+def test_save(server):
+    status, data = request(server, 'POST', '/save')
+    assert status == 200
+    restaurant = RestaurantManager.from_filepath(data['saved']).business
+    assert restaurant.balance == server.manager.business.balance
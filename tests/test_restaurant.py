@@ -0,0 +1,88 @@
+import collections
+import json
+
+import pytest
+
+from src import JSONEncoder, RestaurantGenerator, TransactionType
+
+
+def sell_round_robin(restaurant):
+    """Sell one of each dish in turn until their sales or ingredients
+    run out, like update_expenses() did before dishes were sold
+    in bulk rounds and groups (without selling dishes past their sales)."""
+    sales = collections.Counter()
+    for d in restaurant.dishes:
+        sales[d] = d.sales
+        d.expenses_items = [i.copy(quantity=0, price=0) for i in d.items]
+
+    revenue = 0
+    while sales:
+        finished = []
+        for dish, n in sales.items():
+            if n <= 0:
+                finished.append(dish)
+            elif restaurant.sell_dish(dish) is not None:
+                sales[dish] -= 1
+                revenue += dish.price
+            else:
+                # Cannot sell any more of this dish
+                dish.sales -= n
+                finished.append(dish)
+        for dish in finished:
+            del sales[dish]
+    restaurant.deposit('Dish Sales', revenue, TransactionType.SALES)
+
+
+def summarize(restaurant):
+    return {
+        'balance': restaurant.balance,
+        'transactions': list(restaurant.transactions),
+        'sales': {d.name: d.sales for d in restaurant.dishes},
+        # Dishes sold in bulk can take their ingredients from different
+        # price lots than when sold one at a time, so only the total
+        # cost of the ingredients is the same
+        'expenses': round(sum(d.expenses for d in restaurant.dishes), 12),
+        'inventory': json.dumps(restaurant.inventory, cls=JSONEncoder)
+    }
+
+
+@pytest.mark.parametrize('seed', range(4))
+@pytest.mark.parametrize('workers', [1, 4])
+def test_update_expenses_matches_round_robin(seed, workers):
+    restaurant = RestaurantGenerator(seed=seed, dishes=30,
+                                     ingredients_per_dish=3).generate()
+    for i, dish in enumerate(restaurant.dishes):
+        # Ask for more than the inventory has for some dishes
+        dish.sales = (i * 37 + seed) % 400
+
+    expected = restaurant.fork()
+    sell_round_robin(expected)
+    actual = restaurant.fork()
+    actual.update_expenses(workers=workers)
+
+    assert summarize(actual) == summarize(expected)
+    # Some dishes ran out of ingredients
+    assert any(d.sales < r.sales
+               for d, r in zip(actual.dishes, restaurant.dishes))
+
+
+def test_producible_table_follows_inventory():
+    restaurant = RestaurantGenerator(seed=1, dishes=20).generate()
+
+    def expected():
+        table = {}
+        for dish in restaurant.dishes:
+            counts = [restaurant.inventory[i.name].quantity // i.quantity
+                      if i.name in restaurant.inventory else 0
+                      for i in dish.items]
+            table[dish.name] = min(counts) if counts else None
+        return table
+
+    assert restaurant.producible_table() == expected()
+    for dish in list(restaurant.dishes)[:5]:
+        item = dish.items[0]
+        inv_item = restaurant.inventory[item.name]
+        inv_item.subtract(inv_item.quantity // 2)
+        assert restaurant.producible_table() == expected()
+    restaurant.inventory.remove(next(iter(restaurant.inventory)).name)
+    assert restaurant.producible_table() == expected()
@@ -0,0 +1,69 @@
+import pytest
+
+from src import (ForecastPolicy, ReorderPointPolicy, RestaurantGenerator,
+                 RestockPolicy)
+
+
+def test_policy_without_quantities_cannot_be_created():
+    class IncompletePolicy(RestockPolicy):
+        NAME = 'incomplete'
+
+    with pytest.raises(TypeError):
+        IncompletePolicy()
+
+
+def test_reorder_point_restocks_to_target():
+    restaurant = RestaurantGenerator(seed=1, dishes=8).generate()
+    levels = {item.name: (item.quantity + 1, item.quantity + 100)
+              for item in restaurant.inventory}
+    policy = ReorderPointPolicy(levels=levels)
+
+    bought = policy.restock(restaurant)
+    assert {item.name for item in bought} == set(levels)
+    for name, (reorder_point, target) in levels.items():
+        assert restaurant.inventory[name].quantity == target
+
+    assert policy.restock(restaurant) == []
+
+
+@pytest.mark.parametrize('policy', [ReorderPointPolicy(target=2),
+                                    ForecastPolicy()])
+def test_policy_round_trip(policy):
+    restaurant = RestaurantGenerator(seed=1, dishes=8).generate()
+    restaurant.restock_policy = policy
+    restaurant.step(weeks=8)
+    assert RestockPolicy.from_dict(policy.to_dict()) == policy
+
+
+def test_restock_ingredient_starting_at_zero():
+    restaurant = RestaurantGenerator(seed=1, dishes=8).generate()
+    dish = next(iter(restaurant.dishes))
+    # Sell the dish once so its expenses record what its ingredients cost
+    dish.expenses_items = [i.copy(quantity=0, price=0) for i in dish.items]
+    assert restaurant.sell_dish(dish)
+    expense = dish.expenses_items[0]
+
+    # Empty the ingredient before the policy has seen its price,
+    # like a save loaded with nothing in stock
+    restaurant.inventory[expense.name].subtract()
+    assert restaurant.inventory[expense.name].quantity == 0
+
+    policy = ReorderPointPolicy(levels={expense.name: (1, 500)})
+    bought = {i.name: i for i in policy.restock(restaurant)}
+    assert expense.name in bought
+    assert restaurant.inventory[expense.name].quantity == 500
+    assert policy.unit_prices[expense.name] \
+        == expense.price / expense.quantity
+
+
+def test_restock_ingredient_priced_by_dish():
+    restaurant = RestaurantGenerator(seed=1, dishes=8).generate()
+    item = next(iter(restaurant.dishes)).items[0]
+    restaurant.inventory[item.name].subtract()
+    policy = ReorderPointPolicy(levels={item.name: (1, 100)})
+    assert item.name not in {i.name for i in policy.order(restaurant)}
+
+    item.price = item.quantity * 2
+    bought = {i.name: i for i in policy.restock(restaurant)}
+    assert bought[item.name].price == 200
+    assert restaurant.inventory[item.name].quantity == 100
@@ -0,0 +1,26 @@
+import pytest
+
+from src import (ForecastPolicy, ReorderPointPolicy, RestaurantGenerator,
+                 Simulation)
+
+
+@pytest.mark.parametrize('kwargs', [{'restock': False},
+                                    {'policy': ForecastPolicy()}])
+def test_simulation_keeps_restaurant_policy(kwargs):
+    restaurant = RestaurantGenerator(seed=1, dishes=5).generate()
+    policy = restaurant.restock_policy = ReorderPointPolicy(target=3)
+    sim = Simulation(restaurant, **kwargs)
+    sim.run(2)
+    assert restaurant.restock_policy is policy
+    assert policy.unit_prices == {}
+    assert sim.policy is kwargs.get('policy')
+
+
+def test_simulation_uses_restaurant_policy():
+    restaurant = RestaurantGenerator(seed=1, dishes=5).generate()
+    sim = Simulation(restaurant)
+    sim.run(2)
+    # A default policy is only used for the simulation
+    assert restaurant.restock_policy is None
+    assert isinstance(sim.policy, ReorderPointPolicy)
+    assert sim.policy.unit_prices
@@ -0,0 +1,65 @@
+import copy
+from dataclasses import dataclass, field, replace
+import decimal
+import pickle
+
+import pytest
+
+from src import (Dish, InventoryItemEntry, Item, LoanRequirement,
+                 LoanRequirementType, Transaction, TransactionType, utils)
+
+
+@utils.add_slots
+@dataclass
+class Point:
+    x: int
+    y: int = 0
+    tags: list = field(default_factory=list)
+
+
+@utils.add_slots
+@dataclass(frozen=True)
+class FrozenPoint:
+    x: int
+    y: int = 0
+
+
+def test_add_slots_keeps_dataclass_behaviour():
+    p = Point(1)
+    assert (p.x, p.y, p.tags) == (1, 0, [])
+    assert Point.__slots__ == ('x', 'y', 'tags')
+    assert not hasattr(p, '__dict__')
+    with pytest.raises(AttributeError):
+        p.z = 1
+    assert replace(p, y=2) == Point(1, 2)
+    assert copy.deepcopy(p) == p
+    assert pickle.loads(pickle.dumps(p)) == p
+    # Defaults that are not given must not be shared
+    assert Point(1).tags is not p.tags
+
+
+def test_add_slots_frozen():
+    p = FrozenPoint(1, 2)
+    with pytest.raises(AttributeError):
+        p.x = 2
+    assert copy.copy(p) == p
+    assert pickle.loads(pickle.dumps(p)) == p
+    assert hash(p) == hash(FrozenPoint(1, 2))
+
+    with pytest.raises(TypeError):
+        utils.add_slots(Point)
+
+
+def test_model_classes_are_slotted():
+    item = Item('Flour', 1000, 'gram', decimal.Decimal('2.50'))
+    objects = [
+        item,
+        InventoryItemEntry.from_item(item),
+        Dish('Bread', [item], decimal.Decimal(4)),
+        LoanRequirement(LoanRequirementType.EMPLOYEES, (1, None)),
+        Transaction('Bread', decimal.Decimal(4), 3, TransactionType.SALES)
+    ]
+    for obj in objects:
+        assert not hasattr(obj, '__dict__'), type(obj).__name__
+        assert type(obj).from_dict(obj.to_dict()) == obj
+        assert pickle.loads(pickle.dumps(obj)) == obj